@@ -0,0 +1,26 @@
+from fastapi import HTTPException, status
+from pydantic import AfterValidator
+from typing_extensions import Annotated
+from app.core.config import settings
+from app.core.regions import UnknownRegionError, resolve_region
+
+
+def _validate_region(region: str) -> str:
+    resolve_region(region)  # UnknownRegionError es un ValueError; main.py lo responde con 400
+    return region
+
+
+# Campo `region` de los bodies de request
+RiotRegion = Annotated[str, AfterValidator(_validate_region)]
+
+
+def region_query(region: str = settings.DEFAULT_USER_REGION) -> str:
+    """Validate the `region` query parameter against the Riot routing table"""
+    try:
+        resolve_region(region)
+    except UnknownRegionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return region
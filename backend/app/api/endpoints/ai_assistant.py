@@ -3,8 +3,11 @@ from sqlalchemy.orm import Session
 from typing import Dict, List, Optional
 from pydantic import BaseModel
 from app.database import get_db
+from app.api.deps import RiotRegion
+from app.core.config import settings
 from app.services.claude_service import claude_service
 from app.services.riot_service import riot_service
+from app.services.resilience import UpstreamUnavailableError
 
 router = APIRouter()
 
@@ -12,7 +15,7 @@ router = APIRouter()
 class GameAnalysisRequest(BaseModel):
     match_id: str
     user_puuid: str
-    region: str = "las"
+    region: RiotRegion = settings.DEFAULT_USER_REGION
 
 class JungleSuggestionsRequest(BaseModel):
     game_time: int  # in minutes
@@ -32,7 +35,7 @@ class ChampionRecommendationRequest(BaseModel):
 class PathingAnalysisRequest(BaseModel):
     match_id: str
     user_puuid: str
-    region: str = "las"
+    region: RiotRegion = settings.DEFAULT_USER_REGION
 
 @router.post("/analyze-game")
 async def analyze_game_performance(
@@ -41,17 +44,17 @@ async def analyze_game_performance(
 ):
     """Analyze game performance using Claude AI"""
     try:
-        # Get match details from Riot API
-        match_data = await riot_service.get_match_details(request.match_id, request.region)
+        # Solo las estadísticas del jugador, sin decodificar la partida completa
+        match = await riot_service.get_jungle_stats(request.match_id, request.user_puuid, request.region)
         
-        if not match_data:
+        if not match:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Match not found"
             )
         
         # Analyze with Claude
-        analysis = await claude_service.analyze_jungle_performance(match_data, request.user_puuid)
+        analysis = await claude_service.analyze_jungle_performance(match, request.user_puuid)
         
         if not analysis:
             raise HTTPException(
@@ -62,9 +65,12 @@ async def analyze_game_performance(
         return {
             "match_id": request.match_id,
             "analysis": analysis,
-            "timestamp": match_data.get("info", {}).get("gameCreation")
+            "timestamp": match.game_creation
         }
         
+    except UpstreamUnavailableError:
+        # Riot caído o sin presupuesto: 503 del handler global, no 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -101,6 +107,8 @@ async def get_jungle_suggestions(
             "generated_at": request.game_time
         }
         
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -138,6 +146,8 @@ async def get_champion_recommendations(
             "enemy_team": request.enemy_team
         }
         
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -151,17 +161,17 @@ async def analyze_jungle_pathing(
 ):
     """Analyze jungle pathing efficiency"""
     try:
-        # Get match details from Riot API
-        match_data = await riot_service.get_match_details(request.match_id, request.region)
+        # Solo las estadísticas del jugador, sin decodificar la partida completa
+        match = await riot_service.get_jungle_stats(request.match_id, request.user_puuid, request.region)
         
-        if not match_data:
+        if not match:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Match not found"
             )
         
         # Analyze pathing with Claude
-        analysis = await claude_service.analyze_jungle_pathing(match_data, request.user_puuid)
+        analysis = await claude_service.analyze_jungle_pathing(match, request.user_puuid)
         
         if not analysis:
             raise HTTPException(
@@ -172,9 +182,11 @@ async def analyze_jungle_pathing(
         return {
             "match_id": request.match_id,
             "pathing_analysis": analysis,
-            "timestamp": match_data.get("info", {}).get("gameCreation")
+            "timestamp": match.game_creation
         }
         
+    except UpstreamUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,21 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database import get_async_db, get_db
+from app.models.game_session import GameSession, user_sessions_query
+from app.schemas.game_session import GameSessionPage, GameSessionResponse
+from app.services.match_backfill import match_backfill
+from app.utils.pagination import fetch_page
 
 router = APIRouter()
 
-@router.get("/")
-async def get_game_sessions(db: Session = Depends(get_db)):
-    """Get all game sessions"""
-    return {"message": "Game sessions endpoint - to be implemented"}
+@router.get("/", response_model=GameSessionPage)
+async def get_game_sessions(
+    user_id: int,
+    champion: Optional[str] = None,
+    objective: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a user's game sessions, newest first
+
+    `objective` (dragons, barons, heralds, objectives_stolen, turrets) keeps
+    only games where the player secured at least one. Pass `next_cursor`
+    back as `cursor` for the following page; `skip` is kept for offset
+    callers.
+    """
+    page = await fetch_page(
+        db,
+        user_sessions_query(user_id, champion, objective),
+        [GameSession.started_at, GameSession.id],
+        limit,
+        cursor=cursor,
+        skip=skip,
+        descending=True
+    )
+    return {"items": page.items, "next_cursor": page.next_cursor}
 
 @router.post("/")
 async def create_game_session(db: Session = Depends(get_db)):
     """Create a new game session"""
     return {"message": "Create game session endpoint - to be implemented"}
 
-@router.get("/{session_id}")
-async def get_game_session(session_id: int, db: Session = Depends(get_db)):
+@router.get("/{session_id}", response_model=GameSessionResponse)
+async def get_game_session(session_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get specific game session"""
-    return {"message": f"Game session {session_id} endpoint - to be implemented"} 
\ No newline at end of file
+    game_session = await db.get(GameSession, session_id)
+    if not game_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game session not found"
+        )
+    return game_session
+
+@router.post("/backfill/{user_id}", status_code=status.HTTP_202_ACCEPTED)
+async def start_match_backfill(user_id: int, max_matches: Optional[int] = None):
+    """Start backfilling a user's match history into game sessions"""
+    job = match_backfill.start(user_id, max_matches)
+    return job.progress()
+
+@router.get("/backfill/jobs/{job_id}")
+async def get_match_backfill_progress(job_id: str):
+    """Get progress and throughput of a backfill job"""
+    job = match_backfill.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Backfill job not found"
+        )
+    return job.progress()
+
+@router.post("/sync/{user_id}")
+async def sync_new_matches(user_id: int):
+    """Ingest only the matches played since the user's last sync"""
+    try:
+        return await match_backfill.sync(user_id)
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, List, Optional
+import asyncio
+import json
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from app.database import get_db
-from app.services.riot_service import riot_service
+from app.database import get_async_db
+from app.api.deps import RiotRegion, region_query
+from app.core.config import settings
 from app.services.claude_service import claude_service
+from app.services.live_game_poller import live_game_poller
+from app.services.resilience import UpstreamUnavailableError
+from app.services.champion_stats import champion_stats
+from app.services.static_data import StaticResource, static_data
+from app.services.timer_engine import next_timers_cache, timer_engine
 from app.models.user import User
 from app.models.game_session import GameSession
-from app.models.jungle_timer import JungleTimer
+from app.models.jungle_timer import JungleTimer, game_minute
+from app.schemas.jungle_timer import UTCDateTime
 
 router = APIRouter()
 
@@ -16,7 +26,7 @@ router = APIRouter()
 class ObjectiveTimer(BaseModel):
     objective_type: str  # "dragon", "baron", "herald", "gromp", etc.
     objective_name: str  # "Ocean Dragon", "Baron Nashor", etc.
-    spawn_time: datetime
+    spawn_time: UTCDateTime
     respawn_seconds: int
     team_side: str  # "blue", "red", "neutral"
 
@@ -28,56 +38,23 @@ class JunglePathSuggestion(BaseModel):
 
 class LiveGameTracking(BaseModel):
     summoner_id: str
-    region: str = "las"
+    region: RiotRegion = settings.DEFAULT_USER_REGION
 
 @router.get("/objectives-timers")
-async def get_objective_timers(db: Session = Depends(get_db)):
-    """Get standard jungle objective timers"""
-    
-    # Timers estándar de League of Legends (Season 14)
-    standard_timers = {
-        "dragons": {
-            "first_spawn": 300,  # 5:00
-            "respawn_time": 300,  # 5 minutes
-            "types": ["Ocean", "Mountain", "Cloud", "Infernal", "Hextech", "Chemtech"]
-        },
-        "baron": {
-            "first_spawn": 1200,  # 20:00
-            "respawn_time": 360   # 6 minutes
-        },
-        "herald": {
-            "first_spawn": 480,   # 8:00
-            "despawn_time": 1140, # 19:00 (despawns when Baron spawns)
-            "respawn_time": 360   # 6 minutes
-        },
-        "jungle_camps": {
-            "krugs": {"respawn": 135},      # 2:15
-            "gromp": {"respawn": 135},      # 2:15
-            "wolves": {"respawn": 135},     # 2:15
-            "raptors": {"respawn": 135},    # 2:15
-            "red_buff": {"respawn": 300},   # 5:00
-            "blue_buff": {"respawn": 300},  # 5:00
-            "scuttle": {"respawn": 150}     # 2:30
-        }
-    }
-    
-    return {
-        "timers": standard_timers,
-        "season": "14",
-        "patch": "14.24",
-        "last_updated": datetime.now().isoformat()
-    }
+async def get_objective_timers(request: Request):
+    """Get standard jungle objective timers for the current patch (ETag / 304 aware)"""
+    return static_data.response(request, static_data.snapshot.objective_timers)
 
 @router.post("/start-timer")
 async def start_objective_timer(
     timer_data: ObjectiveTimer,
     session_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Start a new objective timer"""
     
     # Verificar que la sesión existe
-    game_session = db.query(GameSession).filter(GameSession.id == session_id).first()
+    game_session = await db.get(GameSession, session_id)
     if not game_session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -94,13 +71,17 @@ async def start_objective_timer(
         objective_name=timer_data.objective_name,
         spawn_time=timer_data.spawn_time,
         respawn_time=respawn_time,
-        game_time_minutes=int((timer_data.spawn_time.timestamp() - game_session.started_at.timestamp()) / 60),
+        game_time_minutes=game_minute(game_session.started_at, timer_data.spawn_time),
         is_active=True
     )
     
     db.add(new_timer)
-    db.commit()
-    db.refresh(new_timer)
+    await db.commit()
+    await db.refresh(new_timer)
+    
+    # El motor avisa antes del respawn y marca el timer inactivo al reaparecer
+    timer_engine.schedule(new_timer)
+    next_timers_cache.invalidate(session_id)
     
     return {
         "timer": new_timer,
@@ -114,7 +95,7 @@ async def get_jungle_path_suggestions(
     game_time: int = 0,
     enemy_jungle: Optional[str] = None,
     team_state: str = "even",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get AI-powered jungle pathing suggestions"""
     
@@ -128,7 +109,10 @@ async def get_jungle_path_suggestions(
         }
         
         # Obtener sugerencias de Claude
-        suggestions = await claude_service.get_jungle_suggestions(path_context)
+        try:
+            suggestions = await claude_service.get_jungle_suggestions(path_context)
+        except UpstreamUnavailableError:
+            suggestions = None
         
         # Pathing básico por defecto si Claude no está disponible
         if not suggestions:
@@ -156,134 +140,92 @@ async def get_jungle_path_suggestions(
 async def track_live_game(
     riot_id: str,
     tag_line: str,
-    region: str = "las",
-    db: Session = Depends(get_db)
+    region: str = Depends(region_query),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Track live game for jungle analysis"""
+    """Track live game for jungle analysis (shared with the background poller)"""
     
-    try:
-        # Obtener información del summoner
-        summoner_data = await riot_service.get_summoner_by_riot_id(riot_id, tag_line, region)
-        if not summoner_data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Summoner not found"
-            )
-        
-        # Obtener detalles del summoner para tener el ID
-        puuid = summoner_data.get("puuid")
-        summoner_details = await riot_service.get_summoner_by_puuid(puuid, region)
-        
-        if not summoner_details:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Summoner details not found"
-            )
-        
-        summoner_id = summoner_details.get("id")
-        
-        # Verificar si hay una partida activa
-        current_game = await riot_service.get_current_game(summoner_id, region)
-        
-        if not current_game:
-            return {
-                "in_game": False,
-                "message": "No hay partida activa",
-                "summoner": summoner_data
-            }
-        
-        # Extraer información relevante de la partida
-        game_info = {
-            "gameId": current_game.get("gameId"),
-            "gameMode": current_game.get("gameMode"),
-            "gameLength": current_game.get("gameLength"),  # en segundos
-            "participants": []
-        }
-        
-        # Encontrar al jugador y extraer información relevante
-        player_info = None
-        for participant in current_game.get("participants", []):
-            if participant.get("puuid") == puuid:
-                player_info = {
-                    "championId": participant.get("championId"),
-                    "spell1Id": participant.get("spell1Id"),
-                    "spell2Id": participant.get("spell2Id"),
-                    "teamId": participant.get("teamId")
-                }
-            
-            game_info["participants"].append({
-                "championId": participant.get("championId"),
-                "teamId": participant.get("teamId"),
-                "puuid": participant.get("puuid") == puuid  # Mark if it's our player
-            })
-        
-        return {
-            "in_game": True,
-            "game_info": game_info,
-            "player_info": player_info,
-            "game_time_minutes": current_game.get("gameLength", 0) // 60,
-            "tracking_started": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
+    snapshot = await live_game_poller.get_snapshot(riot_id, tag_line, region)
+    
+    if snapshot.get("not_found"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=snapshot["error"]
+        )
+    if snapshot.get("error"):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error tracking live game: {str(e)}"
+            detail=snapshot["error"]
         )
+    
+    return snapshot
+
+@router.get("/live-game/{riot_id}/{tag_line}/stream")
+async def stream_live_game(
+    riot_id: str,
+    tag_line: str,
+    request: Request,
+    region: str = Depends(region_query)
+):
+    """Server-Sent Events stream of live game updates for a player"""
+    
+    async def event_stream():
+        # Se suscribe al empezar el body: si el cliente se va antes, no queda un suscriptor huérfano
+        queue = await live_game_poller.subscribe(riot_id, tag_line, region)
+        try:
+            while not await request.is_disconnected():
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comentario SSE para mantener viva la conexión
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: live-game\ndata: {json.dumps(snapshot, default=str)}\n\n"
+        finally:
+            live_game_poller.unsubscribe(riot_id, tag_line, region, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/champion-stats/{champion_name}")
 async def get_jungle_champion_stats(
     champion_name: str,
-    region: str = "las",
-    db: Session = Depends(get_db)
+    request: Request,
+    patch: Optional[str] = None,
+    region: str = Depends(region_query)
 ):
-    """Get jungle-specific stats for a champion"""
-    
-    # Stats básicos de jungla por campeón (podrías expandir esto con una API de stats)
-    jungle_stats = {
-        "graves": {
-            "clear_speed": "A+",
-            "gank_potential": "B",
-            "scaling": "A",
-            "difficulty": "Medium",
-            "recommended_build": ["Warrior", "Berserker's Greaves", "The Collector"],
-            "optimal_runes": "Fleet Footwork"
-        },
-        "kindred": {
-            "clear_speed": "B+",
-            "gank_potential": "A",
-            "scaling": "S",
-            "difficulty": "Hard",
-            "recommended_build": ["Kraken Slayer", "Berserker's Greaves", "Runaan's Hurricane"],
-            "optimal_runes": "Press the Attack"
-        },
-        "kha'zix": {
-            "clear_speed": "B",
-            "gank_potential": "A+",
-            "scaling": "A",
-            "difficulty": "Medium",
-            "recommended_build": ["Duskblade", "Ionian Boots", "Youmuu's Ghostblade"],
-            "optimal_runes": "Dark Harvest"
-        }
-    }
-    
-    champion_key = champion_name.lower().replace("'", "").replace(" ", "")
-    stats = jungle_stats.get(champion_key, {
-        "clear_speed": "Unknown",
-        "gank_potential": "Unknown", 
-        "scaling": "Unknown",
-        "difficulty": "Unknown",
-        "recommended_build": [],
-        "optimal_runes": "Unknown"
-    })
-    
-    return {
-        "champion": champion_name,
-        "jungle_stats": stats,
-        "region": region,
-        "meta_tier": "A",  # Podrías conectar esto con APIs de meta
-        "last_updated": datetime.now().isoformat()
-    }
+    """Get jungle stats for a champion computed from stored matches (newest patch by default, ETag / 304 aware)
+
+    Winrate, pick rate, jungle CS/min, objective control, kill
+    participation, takedowns before 10:00 and a clear-speed proxy (jungle
+    CS per minute before 10:00); meta_tier ranks champions of the patch by
+    winrate. Build and runes come from the static patch data.
+    """
+    snapshot = static_data.snapshot
+    champion, metadata = snapshot.champion_metadata(champion_name)
+    computed = await champion_stats.champion(champion.id if champion else None, patch)
+
+    def build() -> StaticResource:
+        return StaticResource({
+            "champion": champion.name if champion else champion_name,
+            "champion_id": champion.id if champion else None,
+            "champion_key": champion.key if champion else None,
+            "region": region,
+            "patch": computed["patch"],
+            "matches_in_patch": computed["matches_in_patch"],
+            "jungle_stats": computed["stats"],
+            "meta_tier": computed["stats"]["meta_tier"],
+            "metadata": metadata,
+            "last_updated": computed["last_updated"]
+        })
+
+    if champion is None:
+        # Nombres desconocidos no se cachean: cualquier string crearía una entrada
+        return static_data.response(request, build())
+    return static_data.response(request, champion_stats.resource(computed["patch"], (champion.id, region), snapshot, build))
 
 def get_basic_jungle_path(champion: str, game_time: int) -> str:
     """Fallback basic jungle pathing algorithm"""
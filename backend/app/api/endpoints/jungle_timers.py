@@ -1,21 +1,187 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from datetime import timedelta
+import asyncio
+import json
+from app.core.config import settings
+from app.database import get_async_db
+from app.models.game_session import GameSession
+from app.models.jungle_timer import JungleTimer, active_timers_query, game_minute
+from app.schemas.jungle_timer import (
+    JungleTimerBatch, JungleTimerBatchResult, JungleTimerCreate, JungleTimerPage, JungleTimerResponse, JungleTimerUpdate
+)
+from app.services.timer_engine import next_active_timers, next_timers_cache, timer_engine
+from app.utils.pagination import fetch_page
 
 router = APIRouter()
 
-@router.get("/")
-async def get_jungle_timers(db: Session = Depends(get_db)):
-    """Get all jungle timers"""
-    return {"message": "Jungle timers endpoint - to be implemented"}
+async def _get_session(db: AsyncSession, session_id: int) -> GameSession:
+    game_session = await db.get(GameSession, session_id)
+    if not game_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game session not found"
+        )
+    return game_session
 
-@router.post("/")
-async def create_jungle_timer(db: Session = Depends(get_db)):
+def _timer_row(game_session: GameSession, timer: JungleTimerCreate) -> Dict:
+    row = timer.model_dump(exclude={"respawn_seconds"})
+    row["game_session_id"] = game_session.id
+    if row["respawn_time"] is None and timer.respawn_seconds is not None:
+        row["respawn_time"] = timer.spawn_time + timedelta(seconds=timer.respawn_seconds)
+    if row["game_time_minutes"] is None:
+        row["game_time_minutes"] = game_minute(game_session.started_at, timer.spawn_time)
+    return row
+
+async def _insert_timers(db: AsyncSession, game_session: GameSession, timers: List[JungleTimerCreate]) -> List[JungleTimer]:
+    if not timers:
+        return []
+    # Un solo INSERT de varias filas con RETURNING (ids y created_at incluidos)
+    rows = [_timer_row(game_session, timer) for timer in timers]
+    result = await db.scalars(insert(JungleTimer).returning(JungleTimer, sort_by_parameter_order=True), rows)
+    return list(result)
+
+async def _update_timers(db: AsyncSession, session_id: int, timers: List[JungleTimerUpdate]) -> List[JungleTimer]:
+    if not timers:
+        return []
+    ids = [timer.id for timer in timers]
+    found = set(await db.scalars(
+        select(JungleTimer.id).where(JungleTimer.id.in_(ids), JungleTimer.game_session_id == session_id)
+    ))
+    missing = sorted(set(ids) - found)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Jungle timers not found in this session: {missing}"
+        )
+    # UPDATE masivo por clave primaria: una sentencia (executemany) por cada conjunto de campos
+    rows = [row for row in (timer.model_dump(exclude_unset=True) for timer in timers) if len(row) > 1]
+    if rows:
+        await db.execute(update(JungleTimer), rows)
+    result = await db.scalars(
+        select(JungleTimer).where(JungleTimer.id.in_(ids)).order_by(JungleTimer.id)
+        .execution_options(populate_existing=True)
+    )
+    return list(result)
+
+@router.get("/", response_model=JungleTimerPage)
+async def get_jungle_timers(
+    session_id: int,
+    active_only: bool = True,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a session's jungle timers
+
+    Active timers come in respawn order (those without a respawn time are
+    only listed with `active_only=false`, where every timer is listed in
+    creation order). Pass `next_cursor` back as `cursor`
+    for the following page.
+    """
+    if active_only:
+        stmt = active_timers_query(session_id)
+        keys = [JungleTimer.respawn_time, JungleTimer.id]
+    else:
+        stmt = select(JungleTimer).where(JungleTimer.game_session_id == session_id).order_by(JungleTimer.id)
+        keys = [JungleTimer.id]
+    page = await fetch_page(db, stmt, keys, limit, cursor=cursor, skip=skip)
+    return {"items": page.items, "next_cursor": page.next_cursor}
+
+@router.get("/next")
+async def get_next_timers(
+    session_id: int,
+    limit: int = Query(5, ge=1, le=settings.NEXT_TIMERS_MAX)
+):
+    """Next active timers of a session by respawn time; cached per session, safe to poll"""
+    return {"session_id": session_id, "timers": await next_active_timers(session_id, limit)}
+
+@router.post("/batch", response_model=JungleTimerBatchResult)
+async def write_jungle_timers(batch: JungleTimerBatch, db: AsyncSession = Depends(get_async_db)):
+    """Create and update many timers of a session (e.g. a full camp clear) in one transaction
+
+    New timers go in one multi-row INSERT; updates only change the fields
+    sent. Every timer is (re)scheduled in the timer engine.
+    """
+    if len(batch.create) + len(batch.update) > settings.TIMER_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.TIMER_BATCH_MAX} timers per batch"
+        )
+    game_session = await _get_session(db, batch.session_id)
+    created = await _insert_timers(db, game_session, batch.create)
+    updated = await _update_timers(db, batch.session_id, batch.update)
+    await db.commit()
+
+    for timer in created + updated:
+        timer_engine.schedule(timer)
+    next_timers_cache.invalidate(batch.session_id)
+    return {"created": created, "updated": updated}
+
+@router.get("/live")
+async def get_live_timers(session_id: int):
+    """In-memory state of a session's active timers, with seconds left to respawn"""
+    return {"session_id": session_id, "timers": timer_engine.active_timers(session_id)}
+
+@router.get("/stream")
+async def stream_timer_events(session_id: int, request: Request):
+    """Server-Sent Events stream of warning, spawn and cancelled events for a session"""
+    
+    queue = timer_engine.subscribe(session_id)
+    
+    async def event_stream():
+        try:
+            # Estado inicial: el cliente no tiene que pedir /live aparte
+            yield f"event: timers\ndata: {json.dumps(timer_engine.active_timers(session_id))}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comentario SSE para mantener viva la conexión
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: timer-{event['event']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            timer_engine.unsubscribe(session_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/{timer_id}/cancel")
+async def cancel_jungle_timer(timer_id: int):
+    """Stop an active timer (e.g. the objective was taken early); persisted with the next flush"""
+    if not timer_engine.cancel(timer_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Active timer not found"
+        )
+    return {"message": "Timer cancelled", "timer_id": timer_id}
+
+@router.post("/", response_model=JungleTimerResponse)
+async def create_jungle_timer(session_id: int, timer: JungleTimerCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new jungle timer"""
-    return {"message": "Create jungle timer endpoint - to be implemented"}
+    game_session = await _get_session(db, session_id)
+    created = await _insert_timers(db, game_session, [timer])
+    await db.commit()
+
+    timer_engine.schedule(created[0])
+    next_timers_cache.invalidate(session_id)
+    return created[0]
 
-@router.get("/{timer_id}")
-async def get_jungle_timer(timer_id: int, db: Session = Depends(get_db)):
+@router.get("/{timer_id}", response_model=JungleTimerResponse)
+async def get_jungle_timer(timer_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get specific jungle timer"""
-    return {"message": f"Jungle timer {timer_id} endpoint - to be implemented"} 
\ No newline at end of file
+    timer = await db.get(JungleTimer, timer_id)
+    if not timer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Jungle timer not found"
+        )
+    return timer 
\ No newline at end of file
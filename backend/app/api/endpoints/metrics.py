@@ -0,0 +1,102 @@
+from fastapi import APIRouter
+from typing import Dict
+from app.services.riot_service import riot_service
+from app.services.claude_service import claude_service
+from app.services.live_game_poller import live_game_poller
+from app.services.cpu_pool import cpu_pool
+from app.services.timer_engine import next_timers_cache, timer_engine
+from app.services.static_data import static_data
+from app.services.champion_stats import champion_stats
+from app.database import database_stats
+
+router = APIRouter()
+
+
+@router.get("/http-pools")
+async def get_http_pool_stats() -> Dict:
+    """Connection pool usage and reuse ratios for upstream APIs"""
+    return {
+        "riot": riot_service.http.stats(),
+        "claude": claude_service.http.stats()
+    }
+
+
+@router.get("/riot-scheduler")
+async def get_riot_scheduler_stats() -> Dict:
+    """Riot rate-limit scheduler queue depth and wait times per lane"""
+    return riot_service.scheduler.stats()
+
+
+@router.get("/match-store")
+async def get_match_store_stats() -> Dict:
+    """Match-details store hit/miss counters and memory usage"""
+    return riot_service.match_store.stats()
+
+
+@router.get("/compact-match-cache")
+async def get_compact_match_cache_stats() -> Dict:
+    """In-memory CompactMatch LRU size and hit ratio"""
+    return riot_service.compact_matches.stats()
+
+
+@router.get("/resolution-cache")
+async def get_resolution_cache_stats() -> Dict:
+    """Riot ID -> PUUID -> summoner cache hits, negative hits and coalesced lookups"""
+    return {
+        "account_by_riot_id": riot_service.account_cache.stats(),
+        "summoner_by_puuid": riot_service.summoner_cache.stats()
+    }
+
+
+@router.get("/live-game-poller")
+async def get_live_game_poller_stats() -> Dict:
+    """Tracked players, subscribers and upstream polls of the live-game poller"""
+    return live_game_poller.stats()
+
+
+@router.get("/resilience")
+async def get_resilience_stats() -> Dict:
+    """Retries, circuit breaker states and deadline misses for upstream APIs"""
+    return {
+        "riot": riot_service.resilience.stats(),
+        "claude": claude_service.resilience.stats()
+    }
+
+
+@router.get("/riot-archive")
+async def get_riot_archive_stats() -> Dict:
+    """Record/replay mode counters for the Riot API (recorded, replayed, misses, injected 429s)"""
+    stats = {"mode": riot_service.mode}
+    if riot_service.archive is not None:
+        stats.update(riot_service.archive.stats())
+    return stats
+
+
+@router.get("/cpu-pool")
+async def get_cpu_pool_stats() -> Dict:
+    """CPU worker pool load: in-flight and waiting jobs, queue wait and run times"""
+    return cpu_pool.stats()
+
+
+@router.get("/database")
+async def get_database_stats() -> Dict:
+    """Database backend plus pool usage and checkout wait times per engine"""
+    return database_stats()
+
+
+@router.get("/timer-engine")
+async def get_timer_engine_stats() -> Dict:
+    """Active objective timers, firing lag, write-behind batches and the next-timers cache"""
+    return {**timer_engine.stats(), "next_timers_cache": next_timers_cache.stats()}
+
+
+@router.get("/static-data")
+async def get_static_data_stats() -> Dict:
+    """Patch served by the static game data store, reloads, 304 revalidations and the champion index"""
+    return static_data.stats()
+
+
+@router.get("/champion-stats")
+async def get_champion_stats_engine_stats() -> Dict:
+    """Matches per patch folded into the champion stats, refreshes and rebuilt reports"""
+    return champion_stats.stats()
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Dict, List, Optional
+from app.api.deps import region_query
+from app.core.champions import champion_index
 from app.services.riot_service import riot_service
+from app.services.riot_rate_limiter import Priority, riot_priority
+from app.services.resilience import UpstreamUnavailableError
 
 router = APIRouter()
 
 
 @router.get("/summoner/{riot_id}/{tag_line}")
-async def get_summoner(riot_id: str, tag_line: str, region: str = "americas") -> Dict:
+async def get_summoner(riot_id: str, tag_line: str, region: str = Depends(region_query)) -> Dict:
     """Get summoner information by Riot ID"""
     summoner_data = await riot_service.get_summoner_by_riot_id(riot_id, tag_line, region)
 
@@ -20,7 +24,7 @@ async def get_summoner(riot_id: str, tag_line: str, region: str = "americas") ->
 
 
 @router.get("/summoner/puuid/{puuid}")
-async def get_summoner_by_puuid(puuid: str, region: str = "la1") -> Dict:
+async def get_summoner_by_puuid(puuid: str, region: str = Depends(region_query)) -> Dict:
     """Get summoner details by PUUID"""
     summoner_data = await riot_service.get_summoner_by_puuid(puuid, region)
 
@@ -37,12 +41,13 @@ async def get_summoner_by_puuid(puuid: str, region: str = "la1") -> Dict:
 async def get_complete_summoner_info(
         riot_id: str,
         tag_line: str,
-        region: str = "las"
+        region: str = Depends(region_query)
 ) -> Dict:
     """Get complete summoner information including rank and recent matches"""
 
     try:
-        complete_data = await riot_service.get_complete_summoner_info(riot_id, tag_line, region)
+        with riot_priority(Priority.INTERACTIVE):
+            complete_data = await riot_service.get_complete_summoner_info(riot_id, tag_line, region)
 
         if not complete_data:
             raise HTTPException(
@@ -74,9 +79,13 @@ async def get_complete_summoner_info(
             "profile_icon_id": complete_data["summoner"]["profileIconId"] if complete_data.get("summoner") else None,
             "rank": rank_info,
             "recent_matches_count": len(complete_data.get("recent_matches", [])),
-            "recent_match_ids": complete_data.get("recent_matches", [])[:10]
+            "recent_match_ids": complete_data.get("recent_matches", [])[:10],
+            "degraded": complete_data.get("degraded", False),
+            "errors": complete_data.get("errors", {})
         }
 
+    except (HTTPException, UpstreamUnavailableError):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -85,7 +94,7 @@ async def get_complete_summoner_info(
 
 
 @router.get("/rank/{summoner_id}")
-async def get_rank_info(summoner_id: str, region: str = "la1") -> List[Dict]:
+async def get_rank_info(summoner_id: str, region: str = Depends(region_query)) -> List[Dict]:
     """Get ranked information for a summoner"""
     rank_data = await riot_service.get_rank_info(summoner_id, region)
 
@@ -99,7 +108,7 @@ async def get_rank_info(summoner_id: str, region: str = "la1") -> List[Dict]:
 
 
 @router.get("/matches/{puuid}")
-async def get_recent_matches(puuid: str, count: int = 10, region: str = "americas") -> List[str]:
+async def get_recent_matches(puuid: str, count: int = 10, region: str = Depends(region_query)) -> List[str]:
     """Get recent match IDs for a player"""
     matches = await riot_service.get_recent_matches(puuid, count, region)
 
@@ -113,9 +122,32 @@ async def get_recent_matches(puuid: str, count: int = 10, region: str = "america
 
 
 @router.get("/match/{match_id}")
-async def get_match_details(match_id: str, region: str = "americas") -> Dict:
-    """Get detailed match information"""
-    match_data = await riot_service.get_match_details(match_id, region)
+async def get_match_details(
+        match_id: str,
+        puuid: Optional[str] = None,
+        fields: Optional[str] = None,
+        region: str = Depends(region_query)
+) -> Dict:
+    """Get detailed match information
+
+    With `puuid` only that player's participant entry is returned, limited
+    to `fields` (comma separated, dotted paths allowed) or the compact
+    jungle stats.
+    """
+    if fields and not puuid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="fields requires puuid"
+        )
+
+    if puuid and fields:
+        field_list = [f.strip() for f in fields.split(",") if f.strip()]
+        match_data = await riot_service.get_match_projection(match_id, puuid, field_list, region)
+    elif puuid:
+        match = await riot_service.get_jungle_stats(match_id, puuid, region)
+        match_data = match.to_dict() if match else None
+    else:
+        match_data = await riot_service.get_match_details(match_id, region)
 
     if not match_data:
         raise HTTPException(
@@ -123,4 +155,14 @@ async def get_match_details(match_id: str, region: str = "americas") -> Dict:
             detail="Match not found"
         )
 
+    if puuid and not match_data["info"]["participants"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Player not found in match"
+        )
+
+    # championName como nombre visible, championKey (y championId en la vista compacta); con `fields` se devuelve solo lo pedido
+    if not fields:
+        for participant in match_data["info"]["participants"]:
+            champion_index.enrich(participant)
     return match_data
\ No newline at end of file
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Optional
+from app.database import get_async_db
+from app.models.session_stats import ALL_CHAMPIONS, STAT_SUM_COLUMNS, UserStatDaily, UserStatTotal
+from app.services.session_aggregates import MAX_WINDOW_DAYS, summarize, window_start
+
+router = APIRouter()
+
+def _sums(row) -> Optional[Dict]:
+    return {column: getattr(row, column) for column in STAT_SUM_COLUMNS} if row is not None else None
+
+@router.get("/users/{user_id}")
+async def get_user_stats(user_id: int, champion: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """All-time winrate, KDA, per-minute and objective stats (one row read)"""
+    row = await db.get(UserStatTotal, (user_id, champion or ALL_CHAMPIONS))
+    return {
+        "user_id": user_id,
+        "champion": champion,
+        "stats": summarize(_sums(row)),
+        "updated_at": row.updated_at if row is not None else None
+    }
+
+@router.get("/users/{user_id}/champions")
+async def get_user_champion_stats(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """All-time stats per champion played, most played first"""
+    rows = await db.scalars(
+        select(UserStatTotal)
+        .where(UserStatTotal.user_id == user_id, UserStatTotal.champion_name != ALL_CHAMPIONS)
+        .order_by(UserStatTotal.games.desc(), UserStatTotal.champion_name)
+    )
+    return {
+        "user_id": user_id,
+        "champions": [{"champion": row.champion_name, **summarize(_sums(row))} for row in rows]
+    }
+
+@router.get("/users/{user_id}/window")
+async def get_user_window_stats(
+    user_id: int,
+    days: int = Query(7, ge=1, le=MAX_WINDOW_DAYS),
+    champion: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stats over the last `days` UTC days (reads at most `days` daily buckets)"""
+    since = window_start(days)
+    sums = (await db.execute(
+        select(*[func.coalesce(func.sum(getattr(UserStatDaily, column)), 0).label(column) for column in STAT_SUM_COLUMNS])
+        .where(
+            UserStatDaily.user_id == user_id,
+            UserStatDaily.champion_name == (champion or ALL_CHAMPIONS),
+            UserStatDaily.day >= since
+        )
+    )).one()
+    return {
+        "user_id": user_id,
+        "champion": champion,
+        "days": days,
+        "since": since.isoformat(),
+        "stats": summarize(dict(sums._mapping))
+    }
@@ -1,17 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models.user import User
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db
+from app.models.user import User, UserPreferredChampion, replace_preferred_champions_statements
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
+from app.utils.pagination import fetch_page
 
 router = APIRouter()
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new user"""
     # Check if user already exists
-    db_user = db.query(User).filter(User.riot_id == user.riot_id).first()
+    db_user = await db.scalar(select(User).where(User.riot_id == user.riot_id))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -21,20 +23,42 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     # Create new user
     db_user = User(**user.dict())
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.flush()
+    for statement in replace_preferred_champions_statements(db_user.id, db_user.preferred_jungle_champions):
+        await db.execute(statement)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all users"""
-    users = db.query(User).filter(User.is_active == True).offset(skip).limit(limit).all()
-    return users
+async def get_users(
+    response: Response,
+    champion: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all users, optionally only those with `champion` among their preferred junglers
+
+    Pages by id: the X-Next-Cursor response header holds the token for the
+    next page (absent on the last one). `skip` still works for old callers.
+    """
+    stmt = select(User).where(User.is_active == True)
+    if champion is not None:
+        stmt = stmt.where(User.id.in_(
+            select(UserPreferredChampion.user_id).where(UserPreferredChampion.champion_name == champion)
+        ))
+    stmt = stmt.order_by(User.id)
+    page = await fetch_page(db, stmt, [User.id], limit, cursor=cursor, skip=skip)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get user by ID"""
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    user = await db.scalar(select(User).where(User.id == user_id, User.is_active == True))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,9 +67,9 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
     return user
 
 @router.get("/riot/{riot_id}", response_model=UserResponse)
-async def get_user_by_riot_id(riot_id: str, db: Session = Depends(get_db)):
+async def get_user_by_riot_id(riot_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get user by Riot ID"""
-    user = db.query(User).filter(User.riot_id == riot_id, User.is_active == True).first()
+    user = await db.scalar(select(User).where(User.riot_id == riot_id, User.is_active == True))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,9 +78,9 @@ async def get_user_by_riot_id(riot_id: str, db: Session = Depends(get_db)):
     return user
 
 @router.put("/{user_id}", response_model=UserResponse)
-async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db)):
+async def update_user(user_id: int, user_update: UserUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update user information"""
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    user = await db.scalar(select(User).where(User.id == user_id, User.is_active == True))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,17 +88,21 @@ async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depen
         )
     
     # Update user fields
-    for field, value in user_update.dict(exclude_unset=True).items():
+    changes = user_update.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(user, field, value)
+    if "preferred_jungle_champions" in changes:
+        for statement in replace_preferred_champions_statements(user.id, user.preferred_jungle_champions):
+            await db.execute(statement)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 @router.delete("/{user_id}")
-async def delete_user(user_id: int, db: Session = Depends(get_db)):
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """Soft delete user"""
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    user = await db.scalar(select(User).where(User.id == user_id, User.is_active == True))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,5 +110,5 @@ async def delete_user(user_id: int, db: Session = Depends(get_db)):
         )
     
     user.is_active = False
-    db.commit()
+    await db.commit()
     return {"message": "User deleted successfully"} 
\ No newline at end of file
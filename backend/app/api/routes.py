@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import users, game_sessions, jungle_timers, riot_api, ai_assistant, jungle_specific
+from app.api.endpoints import users, game_sessions, jungle_timers, riot_api, ai_assistant, jungle_specific, metrics, stats
 
 api_router = APIRouter()
 
@@ -9,4 +9,6 @@ api_router.include_router(game_sessions.router, prefix="/game-sessions", tags=["
 api_router.include_router(jungle_timers.router, prefix="/jungle-timers", tags=["jungle-timers"])
 api_router.include_router(riot_api.router, prefix="/riot", tags=["riot-api"])
 api_router.include_router(ai_assistant.router, prefix="/ai", tags=["ai-assistant"])
-api_router.include_router(jungle_specific.router, prefix="/jungle", tags=["jungle-specific"])
\ No newline at end of file
+api_router.include_router(jungle_specific.router, prefix="/jungle", tags=["jungle-specific"])
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
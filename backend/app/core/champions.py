@@ -0,0 +1,129 @@
+import difflib
+import json
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Champion:
+    """One champion of the Data Dragon snapshot"""
+    id: int     # championId de spectator y match-v5
+    key: str    # id de Data Dragon ("MonkeyKing"): championName de match-v5 y nombre de los assets
+    name: str   # nombre visible ("Wukong")
+
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]")
+
+
+def normalize_champion_name(name: str) -> str:
+    """Lookup form of a champion name or key: "Kha'Zix" / "khazix" / "Dr. Mundo" -> "khazix" / "drmundo" """
+    return _NON_ALNUM.sub("", name.casefold())
+
+
+class ChampionIndex:
+    """Champion id / key / name lookups from a local Data Dragon champion.json
+
+    Ids and normalized names (display name and Data Dragon key) are dict
+    lookups. Names that still do not match ("kazix", "lee sen") go through
+    difflib once and the answer, hit or miss, is memoized. The snapshot is
+    read on first use.
+    """
+
+    def __init__(self, path: str, fuzzy_cutoff: float = 0.75, fuzzy_cache_size: int = 2048):
+        self.path = path
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.fuzzy_cache_size = fuzzy_cache_size
+        self.version: Optional[str] = None
+        self._by_id: Optional[Dict[int, Champion]] = None
+        self._by_name: Dict[str, Champion] = {}
+        self._fuzzy: "OrderedDict[str, Optional[Champion]]" = OrderedDict()
+
+        # Contadores
+        self.fuzzy_hits = 0
+        self.fuzzy_misses = 0
+
+    def _load(self) -> Dict[int, Champion]:
+        if self._by_id is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                # Sin snapshot las respuestas salen sin enriquecer, no fallan
+                print(f"Champion data unavailable ({self.path}): {e}")
+                snapshot = {"data": {}}
+            by_id: Dict[int, Champion] = {}
+            by_name: Dict[str, Champion] = {}
+            for entry in snapshot["data"].values():
+                champion = Champion(int(entry["key"]), entry["id"], entry["name"])
+                by_id[champion.id] = champion
+                by_name[normalize_champion_name(champion.key)] = champion
+                # "Nunu & Willump" -> nunuwillump además de nunu
+                by_name.setdefault(normalize_champion_name(champion.name), champion)
+            self.version = snapshot.get("version")
+            self._by_name = by_name
+            self._by_id = by_id
+        return self._by_id
+
+    def by_id(self, champion_id: Optional[int]) -> Optional[Champion]:
+        if champion_id is None:
+            return None
+        return self._load().get(int(champion_id))
+
+    def by_name(self, name: Optional[str], fuzzy: bool = True) -> Optional[Champion]:
+        """Champion for a display name or Data Dragon key, tolerating case, punctuation and typos"""
+        if not name:
+            return None
+        self._load()
+        normalized = normalize_champion_name(name)
+        champion = self._by_name.get(normalized)
+        if champion is not None or not fuzzy or not normalized:
+            return champion
+        if normalized in self._fuzzy:
+            self._fuzzy.move_to_end(normalized)
+            return self._fuzzy[normalized]
+
+        matches = difflib.get_close_matches(normalized, self._by_name.keys(), n=1, cutoff=self.fuzzy_cutoff)
+        champion = self._by_name[matches[0]] if matches else None
+        if champion is not None:
+            self.fuzzy_hits += 1
+        else:
+            self.fuzzy_misses += 1
+        self._fuzzy[normalized] = champion
+        while len(self._fuzzy) > self.fuzzy_cache_size:
+            self._fuzzy.popitem(last=False)
+        return champion
+
+    def enrich(self, participant: Dict) -> Dict:
+        """Set championId / championName (display name) / championKey (Data Dragon key) on a participant (in place)
+
+        match-v5 sends the Data Dragon key as championName ("MonkeyKing");
+        it is replaced by the display name ("Wukong") so the field means the
+        same in every payload, and the key stays in championKey.
+        """
+        champion = self.by_id(participant.get("championId"))
+        if champion is None:
+            # match-v5 y la caché compacta traen championName = key de Data Dragon
+            champion = self.by_name(participant.get("championName"), fuzzy=False)
+        if champion is not None:
+            participant.setdefault("championId", champion.id)
+            participant["championName"] = champion.name
+            participant["championKey"] = champion.key
+        return participant
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "champions": len(self._by_id) if self._by_id is not None else 0,
+            "names": len(self._by_name),
+            "fuzzy_cached": len(self._fuzzy),
+            "fuzzy_hits": self.fuzzy_hits,
+            "fuzzy_misses": self.fuzzy_misses
+        }
+
+
+# Singleton instance
+champion_index = ChampionIndex(settings.DDRAGON_CHAMPION_PATH)
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class RegionRoute:
+    """Riot routing hosts for one platform (shard)"""
+    platform: str   # summoner-v4, league-v4, spectator: la1, euw1, ...
+    regional: str   # match-v5: americas, europe, asia, sea
+    account: str    # account-v1: americas, europe, asia
+
+    @property
+    def platform_url(self) -> str:
+        return f"https://{self.platform}.api.riotgames.com"
+
+    @property
+    def regional_url(self) -> str:
+        return f"https://{self.regional}.api.riotgames.com"
+
+    @property
+    def account_url(self) -> str:
+        return f"https://{self.account}.api.riotgames.com"
+
+
+class UnknownRegionError(ValueError):
+    def __init__(self, region: str):
+        super().__init__(f"Unknown region '{region}'")
+        self.region = region
+
+
+# Plataforma -> routing regional de match-v5 y de account-v1 (account-v1 no acepta "sea")
+PLATFORM_ROUTES: Dict[str, RegionRoute] = {
+    "br1": RegionRoute("br1", "americas", "americas"),
+    "la1": RegionRoute("la1", "americas", "americas"),
+    "la2": RegionRoute("la2", "americas", "americas"),
+    "na1": RegionRoute("na1", "americas", "americas"),
+    "eun1": RegionRoute("eun1", "europe", "europe"),
+    "euw1": RegionRoute("euw1", "europe", "europe"),
+    "me1": RegionRoute("me1", "europe", "europe"),
+    "ru": RegionRoute("ru", "europe", "europe"),
+    "tr1": RegionRoute("tr1", "europe", "europe"),
+    "jp1": RegionRoute("jp1", "asia", "asia"),
+    "kr": RegionRoute("kr", "asia", "asia"),
+    "oc1": RegionRoute("oc1", "sea", "asia"),
+    "ph2": RegionRoute("ph2", "sea", "asia"),
+    "sg2": RegionRoute("sg2", "sea", "asia"),
+    "th2": RegionRoute("th2", "sea", "asia"),
+    "tw2": RegionRoute("tw2", "sea", "asia"),
+    "vn2": RegionRoute("vn2", "sea", "asia"),
+}
+
+# Nombres de servidor que usan los jugadores
+REGION_ALIASES: Dict[str, str] = {
+    "br": "br1",
+    "las": "la1",
+    "lan": "la2",
+    "na": "na1",
+    "eune": "eun1",
+    "euw": "euw1",
+    "me": "me1",
+    "tr": "tr1",
+    "jp": "jp1",
+    "oce": "oc1",
+    "oc": "oc1",
+    "ph": "ph2",
+    "sg": "sg2",
+    "th": "th2",
+    "tw": "tw2",
+    "vn": "vn2",
+}
+
+# Un valor regional solo no identifica plataforma; se usa la más común del cluster
+REGIONAL_DEFAULT_PLATFORMS: Dict[str, str] = {
+    "americas": "na1",
+    "europe": "euw1",
+    "asia": "kr",
+    "sea": "oc1",
+}
+
+
+def _platform_for(region: str) -> Optional[str]:
+    key = region.strip().lower()
+    if key in PLATFORM_ROUTES:
+        return key
+    return REGION_ALIASES.get(key)
+
+
+def resolve_region(region: Optional[str] = None) -> RegionRoute:
+    """Resolve a server name (las), platform (la1) or regional value (americas) to its routes"""
+    default_platform = _platform_for(settings.DEFAULT_USER_REGION) or "la1"
+    if not region:
+        return PLATFORM_ROUTES[default_platform]
+
+    platform = _platform_for(region)
+    if platform:
+        return PLATFORM_ROUTES[platform]
+
+    regional = region.strip().lower()
+    if regional in REGIONAL_DEFAULT_PLATFORMS:
+        # Compatibilidad: "americas" significaba la plataforma por defecto de la app
+        if PLATFORM_ROUTES[default_platform].regional == regional:
+            return PLATFORM_ROUTES[default_platform]
+        return PLATFORM_ROUTES[REGIONAL_DEFAULT_PLATFORMS[regional]]
+
+    raise UnknownRegionError(region)
@@ -1,20 +1,196 @@
-from sqlalchemy import create_engine
+import time
+from typing import Dict, Type
+from sqlalchemy import JSON, create_engine, event, exc
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from app.core.config import settings
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+# Driver por defecto de cada backend: (sync, async). psycopg 3 sirve para ambos en PostgreSQL
+_DRIVERS = {
+    "sqlite": ("sqlite", "sqlite+aiosqlite"),
+    "postgresql": ("postgresql+psycopg", "postgresql+psycopg"),
+}
+
+
+def _with_driver(url: str, use_async: bool) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in _DRIVERS:
+        parsed = parsed.set(drivername=_DRIVERS[backend][1 if use_async else 0])
+    return parsed.render_as_string(hide_password=False)
+
+
+def sync_database_url(url: str) -> str:
+    """DATABASE_URL through its blocking driver (postgresql -> postgresql+psycopg)"""
+    return _with_driver(url, use_async=False)
+
+
+def async_database_url(url: str) -> str:
+    """Same database through its asyncio driver (sqlite -> aiosqlite, postgresql -> psycopg async)"""
+    return _with_driver(url, use_async=True)
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+class PoolMonitor:
+    """Checkout counts and wait times for one engine's connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Engine = None
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidated = 0
+        self.timeouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def pool_class(self, base: Type[QueuePool]) -> Type[QueuePool]:
+        """`base` with its checkout timed; the class survives pool recreation on dispose()"""
+        monitor = self
+
+        class TimedPool(base):
+            def _do_get(self):
+                # Espera en la cola del pool (y conexión nueva si hay overflow)
+                started = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except exc.TimeoutError:
+                    monitor.timeouts += 1
+                    raise
+                finally:
+                    waited = time.perf_counter() - started
+                    monitor.total_wait += waited
+                    monitor.max_wait = max(monitor.max_wait, waited)
+
+        TimedPool.__name__ = f"Timed{base.__name__}"
+        return TimedPool
+
+    def attach(self, engine: Engine):
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        self.checked_out += 1
+        self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checkins += 1
+        self.checked_out = max(self.checked_out - 1, 0)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidated += 1
+
+    def stats(self) -> Dict:
+        pool: Pool = self.engine.pool if self.engine is not None else None
+        sized = isinstance(pool, QueuePool)
+        return {
+            "name": self.name,
+            "pool": type(pool).__name__ if pool is not None else None,
+            "size": pool.size() if sized else None,
+            "max_overflow": settings.DB_MAX_OVERFLOW if sized else None,
+            "checked_out": self.checked_out,
+            "idle": pool.checkedin() if sized else None,
+            "overflow": max(pool.overflow(), 0) if sized else None,
+            "max_checked_out": self.max_checked_out,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "invalidated": self.invalidated,
+            "timeouts": self.timeouts,
+            "avg_checkout_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_checkout_wait_ms": round(self.max_wait * 1000, 3)
+        }
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection (WAL lets readers proceed while one writer commits)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        # cache_size negativo = KiB
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_MB * 1024}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cursor.close()
+
+
+def _engine_options(url: str, monitor: PoolMonitor, use_async: bool) -> Dict:
+    options: Dict = {}
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        if not use_async:
+            options["connect_args"] = {"check_same_thread": False}  # Needed for SQLite
+        if _is_memory_sqlite(url):
+            # Una base en memoria existe solo dentro de su conexión: pool por defecto de SQLAlchemy
+            return options
+    else:
+        # Conexiones de red: descartar las que el servidor cerró antes de usarlas
+        options["pool_pre_ping"] = True
+    options.update(
+        poolclass=monitor.pool_class(AsyncAdaptedQueuePool if use_async else QueuePool),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    )
+    return options
+
+
+def _build_engine(url: str, monitor: PoolMonitor, use_async: bool):
+    if use_async:
+        built = create_async_engine(url, **_engine_options(url, monitor, use_async=True))
+        sync_view = built.sync_engine
+    else:
+        built = create_engine(url, **_engine_options(url, monitor, use_async=False))
+        sync_view = built
+    if sync_view.dialect.name == "sqlite" and not _is_memory_sqlite(url):
+        event.listen(sync_view, "connect", _sqlite_pragmas)
+    monitor.attach(sync_view)
+    return built
+
+
+pool_monitors = {
+    "sync": PoolMonitor("sync"),
+    "async": PoolMonitor("async")
+}
+
+# Create database engine (scripts, init_db y endpoints que todavía usan Session)
+engine = _build_engine(sync_database_url(settings.DATABASE_URL), pool_monitors["sync"], use_async=False)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine async para los endpoints: las consultas no bloquean el event loop
+async_engine = _build_engine(async_database_url(settings.DATABASE_URL), pool_monitors["async"], use_async=True)
+
+# expire_on_commit=False: los objetos siguen legibles después del commit sin otra consulta
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Create Base class for models
 Base = declarative_base()
 
+# Columnas JSON: JSONB en PostgreSQL, TEXT con funciones json_* en SQLite
+JSONColumn = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
 def get_db():
     """Dependency to get database session"""
     db = SessionLocal()
@@ -23,11 +199,28 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def database_stats() -> Dict:
+    """Backend, driver and pool usage of both engines"""
+    return {
+        "backend": engine.dialect.name,
+        "drivers": {"sync": engine.driver, "async": async_engine.sync_engine.driver},
+        "pools": {name: monitor.stats() for name, monitor in pool_monitors.items()}
+    }
+
 def init_db():
     """Initialize database tables"""
     # Import all models here to ensure they are registered
-    from app.models import user, game_session, jungle_timer
+    from app.models import user, game_session, jungle_timer, match_sync, session_stats
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
-    print("Database initialized successfully!") 
\ No newline at end of file
+    # create_all no agrega índices nuevos a tablas que ya existían
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    print("Database initialized successfully!")
\ No newline at end of file
@@ -1,5 +1,7 @@
-from .user import User
-from .game_session import GameSession
+from .user import User, UserPreferredChampion
+from .game_session import GameSession, GameSessionObjective
 from .jungle_timer import JungleTimer
+from .match_sync import MatchSyncState
+from .session_stats import UserStatTotal, UserStatDaily
 
-__all__ = ["User", "GameSession", "JungleTimer"] 
\ No newline at end of file
+__all__ = ["User", "UserPreferredChampion", "GameSession", "GameSessionObjective", "JungleTimer", "MatchSyncState", "UserStatTotal", "UserStatDaily"] 
\ No newline at end of file
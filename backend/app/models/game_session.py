@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from typing import Dict, List, Mapping, Optional
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index, Select, delete, exists, insert, select
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, JSONColumn
 
 class GameSession(Base):
     __tablename__ = "game_sessions"
+    __table_args__ = (
+        # Historial de un usuario (más reciente primero) y filtrado por campeón
+        Index("ix_game_sessions_user_started", "user_id", "started_at", "id"),
+        Index("ix_game_sessions_user_champion_started", "user_id", "champion_name", "started_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -19,8 +25,8 @@ class GameSession(Base):
     cs_score = Column(Integer, default=0)
     jungle_cs = Column(Integer, default=0)
     vision_score = Column(Integer, default=0)
-    objectives_secured = Column(Text, nullable=True)  # JSON string
-    ai_suggestions = Column(Text, nullable=True)  # JSON string of AI suggestions
+    objectives_secured = Column(JSONColumn, nullable=True)  # {"dragons": 2, "barons": 1, ...}
+    ai_suggestions = Column(JSONColumn, nullable=True)  # AI suggestions as returned by the analysis
     notes = Column(Text, nullable=True)
     started_at = Column(DateTime(timezone=True), nullable=False)
     ended_at = Column(DateTime(timezone=True), nullable=True)
@@ -30,4 +36,65 @@ class GameSession(Base):
     user = relationship("User", backref="game_sessions") 
     
     def __repr__(self):
-        return f"<GameSession(match_id='{self.match_id}', champion='{self.champion_name}')>" 
\ No newline at end of file
+        return f"<GameSession(match_id='{self.match_id}', champion='{self.champion_name}')>"
+
+
+class GameSessionObjective(Base):
+    """One row per objective type a session secured (count > 0), mirrored from objectives_secured"""
+    __tablename__ = "game_session_objectives"
+    __table_args__ = (
+        # "Partidas donde aseguré Baron" sin leer el JSON de cada sesión
+        Index("ix_game_session_objectives_type_session", "objective_type", "game_session_id"),
+    )
+
+    game_session_id = Column(Integer, ForeignKey("game_sessions.id", ondelete="CASCADE"), primary_key=True)
+    objective_type = Column(String, primary_key=True)  # dragons, barons, heralds, objectives_stolen, turrets
+    count = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<GameSessionObjective(session={self.game_session_id}, {self.objective_type}={self.count})>"
+
+
+def objective_rows(game_session_id: int, objectives: Optional[Mapping]) -> List[Dict]:
+    """game_session_objectives rows for one session's objectives_secured dict"""
+    return [
+        {"game_session_id": game_session_id, "objective_type": objective_type, "count": int(count)}
+        for objective_type, count in (objectives or {}).items()
+        if isinstance(count, (int, float)) and count > 0
+    ]
+
+
+def replace_objectives_statements(objectives_by_session: Mapping[int, Optional[Mapping]]) -> List:
+    """Statements that rewrite the objective rows of these sessions (run in the caller's transaction)"""
+    if not objectives_by_session:
+        return []
+    statements = [
+        delete(GameSessionObjective).where(GameSessionObjective.game_session_id.in_(list(objectives_by_session)))
+    ]
+    rows = [row for session_id, objectives in objectives_by_session.items() for row in objective_rows(session_id, objectives)]
+    if rows:
+        statements.append(insert(GameSessionObjective).values(rows))
+    return statements
+
+
+def user_sessions_query(
+    user_id: int,
+    champion_name: Optional[str] = None,
+    objective_type: Optional[str] = None
+) -> Select:
+    """A user's sessions, newest first (served by the user_started indexes)
+
+    `objective_type` keeps only sessions where that objective was secured,
+    probing game_session_objectives by primary key.
+    """
+    stmt = select(GameSession).where(GameSession.user_id == user_id)
+    if champion_name is not None:
+        stmt = stmt.where(GameSession.champion_name == champion_name)
+    if objective_type is not None:
+        stmt = stmt.where(
+            exists().where(
+                GameSessionObjective.game_session_id == GameSession.id,
+                GameSessionObjective.objective_type == objective_type
+            )
+        )
+    return stmt.order_by(GameSession.started_at.desc(), GameSession.id.desc())
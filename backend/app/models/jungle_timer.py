@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, Select, select
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class JungleTimer(Base):
     __tablename__ = "jungle_timers"
+    __table_args__ = (
+        # Timers activos de una partida en orden de reaparición
+        Index("ix_jungle_timers_session_active_respawn", "game_session_id", "is_active", "respawn_time", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     game_session_id = Column(Integer, ForeignKey("game_sessions.id"), nullable=False)
@@ -23,4 +28,29 @@ class JungleTimer(Base):
     game_session = relationship("GameSession", backref="jungle_timers")
     
     def __repr__(self):
-        return f"<JungleTimer(objective='{self.objective_name}', spawn_time='{self.spawn_time}')>" 
\ No newline at end of file
+        return f"<JungleTimer(objective='{self.objective_name}', spawn_time='{self.spawn_time}')>"
+
+
+def active_timers_query(game_session_id: int) -> Select:
+    """Active timers of a session, next respawn first (served by session_active_respawn)
+
+    Timers without a respawn_time never fire and are left out: they would
+    sort first on SQLite and a NULL key cannot be paged by keyset.
+    """
+    return (
+        select(JungleTimer)
+        .where(
+            JungleTimer.game_session_id == game_session_id,
+            JungleTimer.is_active == True,
+            JungleTimer.respawn_time.is_not(None)
+        )
+        .order_by(JungleTimer.respawn_time, JungleTimer.id)
+    )
+
+
+def game_minute(started_at: datetime, moment: datetime) -> int:
+    """Whole game minutes from `started_at` to `moment` (naive datetimes are UTC)"""
+    started_at, moment = (
+        value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value for value in (started_at, moment)
+    )
+    return int((moment - started_at).total_seconds() / 60)
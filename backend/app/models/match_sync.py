@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class MatchSyncState(Base):
+    __tablename__ = "user_match_sync"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_match_id = Column(String, nullable=True)  # newest match already ingested
+    last_match_start_time = Column(Integer, nullable=True)  # epoch seconds, used as match-v5 startTime
+    last_synced_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationship
+    user = relationship("User", backref="match_sync_state")
+    
+    def __repr__(self):
+        return f"<MatchSyncState(user_id={self.user_id}, last_match_id='{self.last_match_id}')>"
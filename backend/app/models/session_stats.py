@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+# champion_name de la fila que suma todos los campeones del usuario
+ALL_CHAMPIONS = ""
+
+
+class _StatSums:
+    """Additive counters shared by the totals and the daily buckets"""
+    games = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    kills = Column(Integer, nullable=False, default=0)
+    deaths = Column(Integer, nullable=False, default=0)
+    assists = Column(Integer, nullable=False, default=0)
+    cs = Column(Integer, nullable=False, default=0)
+    jungle_cs = Column(Integer, nullable=False, default=0)
+    vision_score = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(Integer, nullable=False, default=0)
+    dragons = Column(Integer, nullable=False, default=0)
+    barons = Column(Integer, nullable=False, default=0)
+    heralds = Column(Integer, nullable=False, default=0)
+    objectives_stolen = Column(Integer, nullable=False, default=0)
+    turrets = Column(Integer, nullable=False, default=0)
+
+
+STAT_SUM_COLUMNS = (
+    "games", "wins", "kills", "deaths", "assists", "cs", "jungle_cs", "vision_score",
+    "duration_seconds", "dragons", "barons", "heralds", "objectives_stolen", "turrets",
+)
+
+
+class UserStatTotal(_StatSums, Base):
+    """All-time sums per user and champion (ALL_CHAMPIONS = every champion)"""
+    __tablename__ = "user_stat_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    champion_name = Column(String, primary_key=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserStatTotal(user={self.user_id}, champion='{self.champion_name}', games={self.games})>"
+
+
+class UserStatDaily(_StatSums, Base):
+    """Sums per user, champion and UTC day; a rolling window reads at most one row per day
+
+    The primary key (user, champion, day) serves window reads for one
+    champion and, with ALL_CHAMPIONS, for every champion.
+    """
+    __tablename__ = "user_stat_daily"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    champion_name = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    def __repr__(self):
+        return f"<UserStatDaily(user={self.user_id}, champion='{self.champion_name}', day={self.day})>"
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from typing import List, Optional, Sequence
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, delete, insert
 from sqlalchemy.sql import func
-from app.database import Base
+from app.database import Base, JSONColumn
+from app.core.config import settings
 
 class User(Base):
     __tablename__ = "users"
@@ -9,14 +11,42 @@ class User(Base):
     riot_id = Column(String, unique=True, index=True, nullable=False)
     summoner_name = Column(String, index=True, nullable=False)
     tag_line = Column(String, nullable=False)
-    region = Column(String, nullable=False, default="americas")
+    region = Column(String, nullable=False, default=settings.DEFAULT_USER_REGION)
     rank_tier = Column(String, nullable=True)
     rank_division = Column(String, nullable=True)
     league_points = Column(Integer, default=0)
-    preferred_jungle_champions = Column(String, nullable=True)  # JSON string
+    preferred_jungle_champions = Column(JSONColumn, nullable=True)  # ["Graves", "Kindred", ...]
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     def __repr__(self):
-        return f"<User(riot_id='{self.riot_id}', summoner_name='{self.summoner_name}')>" 
\ No newline at end of file
+        return f"<User(riot_id='{self.riot_id}', summoner_name='{self.summoner_name}')>"
+
+
+class UserPreferredChampion(Base):
+    """One row per champion in a user's preferred_jungle_champions, in list order"""
+    __tablename__ = "user_preferred_champions"
+    __table_args__ = (
+        # "Usuarios que juegan Graves" sin leer el JSON de cada usuario
+        Index("ix_user_preferred_champions_champion", "champion_name", "user_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    champion_name = Column(String, primary_key=True)
+    position = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<UserPreferredChampion(user={self.user_id}, champion='{self.champion_name}')>"
+
+
+def replace_preferred_champions_statements(user_id: int, champions: Optional[Sequence[str]]) -> List:
+    """Statements that rewrite a user's champion rows (run in the caller's transaction)"""
+    statements = [delete(UserPreferredChampion).where(UserPreferredChampion.user_id == user_id)]
+    unique = list(dict.fromkeys(name for name in champions or [] if isinstance(name, str) and name))
+    if unique:
+        statements.append(insert(UserPreferredChampion).values([
+            {"user_id": user_id, "champion_name": name, "position": position}
+            for position, name in enumerate(unique)
+        ]))
+    return statements
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, Optional, List
+from datetime import datetime
+
+class GameSessionResponse(BaseModel):
+    id: int
+    user_id: int
+    match_id: str
+    champion_name: str
+    game_mode: str
+    game_duration: Optional[int] = None
+    won: Optional[bool] = None
+    kills: int = 0
+    deaths: int = 0
+    assists: int = 0
+    cs_score: int = 0
+    jungle_cs: int = 0
+    vision_score: int = 0
+    objectives_secured: Optional[Dict[str, int]] = None
+    ai_suggestions: Optional[Any] = None
+    notes: Optional[str] = None
+    started_at: datetime
+    ended_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class GameSessionPage(BaseModel):
+    items: List[GameSessionResponse]
+    next_cursor: Optional[str] = None  # pasar como ?cursor= para la página siguiente
@@ -0,0 +1,82 @@
+from pydantic import AfterValidator, BaseModel, ConfigDict, model_validator
+from typing import Annotated, Optional, List
+from datetime import datetime, timezone
+
+
+def _to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite guarda la hora de pared sin offset y se relee como UTC: "-03:00" se convierte antes
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+# Datetimes de entrada normalizados a UTC (sin zona = UTC)
+UTCDateTime = Annotated[datetime, AfterValidator(_to_utc)]
+
+class JungleTimerResponse(BaseModel):
+    id: int
+    game_session_id: int
+    objective_type: str
+    objective_name: str
+    spawn_time: datetime
+    respawn_time: Optional[datetime] = None
+    is_secured: Optional[bool] = False
+    secured_by_team: Optional[str] = None
+    game_time_minutes: int
+    is_active: Optional[bool] = True
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class JungleTimerPage(BaseModel):
+    items: List[JungleTimerResponse]
+    next_cursor: Optional[str] = None  # pasar como ?cursor= para la página siguiente
+
+class JungleTimerCreate(BaseModel):
+    objective_type: str
+    objective_name: str
+    spawn_time: UTCDateTime
+    respawn_time: Optional[UTCDateTime] = None
+    respawn_seconds: Optional[int] = None  # alternativa a respawn_time: spawn_time + segundos
+    game_time_minutes: Optional[int] = None  # por defecto: minutos desde el inicio de la partida
+    is_secured: bool = False
+    secured_by_team: Optional[str] = None
+    is_active: bool = True
+    notes: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _require_respawn(self):
+        # Sin reaparición el timer nunca se programa ni sale en /next
+        if self.respawn_time is None and self.respawn_seconds is None:
+            raise ValueError("respawn_time or respawn_seconds is required")
+        return self
+
+class JungleTimerUpdate(BaseModel):
+    id: int
+    objective_type: Optional[str] = None
+    objective_name: Optional[str] = None
+    spawn_time: Optional[UTCDateTime] = None
+    respawn_time: Optional[UTCDateTime] = None
+    game_time_minutes: Optional[int] = None
+    is_secured: Optional[bool] = None
+    secured_by_team: Optional[str] = None
+    is_active: Optional[bool] = None
+    notes: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _keep_respawn(self):
+        if "respawn_time" in self.model_fields_set and self.respawn_time is None:
+            raise ValueError("respawn_time cannot be cleared")
+        return self
+
+class JungleTimerBatch(BaseModel):
+    session_id: int
+    create: List[JungleTimerCreate] = []
+    update: List[JungleTimerUpdate] = []
+
+class JungleTimerBatchResult(BaseModel):
+    created: List[JungleTimerResponse]
+    updated: List[JungleTimerResponse]
@@ -1,16 +1,29 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+import json
+from pydantic import BaseModel, BeforeValidator, ConfigDict
+from typing import Annotated, Optional, List
 from datetime import datetime
+from app.core.config import settings
+
+def _champion_list(value):
+    # Clientes viejos mandan la lista como string JSON
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = [name.strip() for name in value.split(",") if name.strip()]
+    return value
+
+ChampionList = Annotated[Optional[List[str]], BeforeValidator(_champion_list)]
 
 class UserBase(BaseModel):
     riot_id: str
     summoner_name: str
     tag_line: str
-    region: str = "americas"
+    region: str = settings.DEFAULT_USER_REGION
     rank_tier: Optional[str] = None
     rank_division: Optional[str] = None
     league_points: int = 0
-    preferred_jungle_champions: Optional[str] = None  # JSON string
+    preferred_jungle_champions: ChampionList = None
 
 class UserCreate(UserBase):
     pass
@@ -22,7 +35,7 @@ class UserUpdate(BaseModel):
     rank_tier: Optional[str] = None
     rank_division: Optional[str] = None
     league_points: Optional[int] = None
-    preferred_jungle_champions: Optional[str] = None
+    preferred_jungle_champions: ChampionList = None
 
 class UserResponse(UserBase):
     id: int
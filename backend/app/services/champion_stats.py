@@ -0,0 +1,351 @@
+import asyncio
+import json
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.services.cpu_pool import cpu_pool
+from app.services.match_store import match_store
+from app.services.static_data import StaticResource
+
+JUNGLE_POSITION = "JUNGLE"
+EARLY_MINUTES = 10  # los challenges "antes de los 10 minutos" de match-v5
+TIERS = ("S", "A", "B", "C", "D")
+TIER_PERCENTILES = (0.10, 0.35, 0.65, 0.90)  # límite superior de cada tier salvo el último
+
+# Sumas por (parche, campeón); filas de la matriz de _PatchSums
+SUM_COLUMNS: Tuple[str, ...] = (
+    "games",
+    "wins",
+    "minutes",
+    "jungle_cs",          # neutralMinionsKilled
+    "takedowns",          # kills + assists
+    "team_kills",
+    "team_objectives",    # dragones + barones + heraldos + larvas del equipo
+    "enemy_objectives",
+    "early_games",        # partidas con challenges (las más viejas no los traen)
+    "early_takedowns",    # challenges.takedownsFirstXMinutes
+    "early_jungle_cs",    # challenges.jungleCsBefore10Minutes
+)
+_COLUMN = {name: index for index, name in enumerate(SUM_COLUMNS)}
+_OBJECTIVES = ("dragon", "baron", "riftHerald", "horde")
+
+
+def patch_of(game_version: str) -> Optional[str]:
+    """ "14.24.640.1234" -> "14.24" """
+    parts = (game_version or "").split(".")
+    return f"{parts[0]}.{parts[1]}" if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit() else None
+
+
+def _patch_sort_key(patch: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in patch.split("."))
+
+
+def extract_jungle_rows(blobs: List[bytes]) -> Tuple[List[str], np.ndarray, np.ndarray, Dict[str, int]]:
+    """Stored match blobs -> one row per jungler (runs on the CPU pool)
+
+    Returns the patch of every row, the champion ids, a float matrix with
+    one line per SUM_COLUMNS entry and one column per row, and the number
+    of matches per patch.
+    """
+    patches: List[str] = []
+    champions: List[int] = []
+    rows: List[List[float]] = []
+    matches: Dict[str, int] = {}
+    for blob in blobs:
+        try:
+            info = json.loads(zlib.decompress(blob)).get("info", {})
+        except (zlib.error, ValueError):
+            # Un payload dañado no frena el resto de la relectura
+            continue
+        patch = patch_of(info.get("gameVersion", ""))
+        minutes = (info.get("gameDuration") or 0) / 60
+        if patch is None or minutes <= 0:
+            continue
+        matches[patch] = matches.get(patch, 0) + 1
+
+        participants = info.get("participants", [])
+        team_kills: Dict[int, int] = {}
+        for participant in participants:
+            team_id = participant.get("teamId")
+            team_kills[team_id] = team_kills.get(team_id, 0) + (participant.get("kills") or 0)
+        team_objectives = {
+            team.get("teamId"): sum((team.get("objectives", {}).get(name) or {}).get("kills", 0) for name in _OBJECTIVES)
+            for team in info.get("teams", [])
+        }
+        total_objectives = sum(team_objectives.values())
+
+        for participant in participants:
+            if participant.get("teamPosition") != JUNGLE_POSITION or not participant.get("championId"):
+                continue
+            team_id = participant.get("teamId")
+            challenges = participant.get("challenges") or {}
+            has_early = "jungleCsBefore10Minutes" in challenges
+            own_objectives = team_objectives.get(team_id, 0)
+            patches.append(patch)
+            champions.append(int(participant["championId"]))
+            rows.append([
+                1.0,
+                1.0 if participant.get("win") else 0.0,
+                minutes,
+                participant.get("neutralMinionsKilled") or 0,
+                (participant.get("kills") or 0) + (participant.get("assists") or 0),
+                team_kills.get(team_id, 0),
+                own_objectives,
+                total_objectives - own_objectives,
+                1.0 if has_early else 0.0,
+                (challenges.get("takedownsFirstXMinutes") or 0) if has_early else 0,
+                (challenges.get("jungleCsBefore10Minutes") or 0) if has_early else 0,
+            ])
+    values = np.array(rows, dtype=np.float64).reshape(-1, len(SUM_COLUMNS)).T
+    return patches, np.array(champions, dtype=np.int64), values, matches
+
+
+class _PatchSums:
+    """Additive sums of one patch: a (len(SUM_COLUMNS), champion id) matrix"""
+    __slots__ = ("sums", "matches", "version", "updated_at")
+
+    def __init__(self):
+        self.sums = np.zeros((len(SUM_COLUMNS), 0))
+        self.matches = 0
+        self.version = 0
+        self.updated_at = 0.0
+
+    def add(self, champions: np.ndarray, values: np.ndarray, matches: int):
+        size = max(self.sums.shape[1], int(champions.max()) + 1 if champions.size else 0)
+        if size > self.sums.shape[1]:
+            self.sums = np.pad(self.sums, ((0, 0), (0, size - self.sums.shape[1])))
+        # Group-by por campeón: un bincount ponderado por columna
+        for column, weights in enumerate(values):
+            self.sums[column] += np.bincount(champions, weights=weights, minlength=size)
+        self.matches += matches
+        self.version += 1
+        self.updated_at = time.time()
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _tiers(wins: np.ndarray, games: np.ndarray, min_games: int, prior_games: int) -> np.ndarray:
+    """S..D by winrate percentile among champions with `min_games`, shrunk toward the patch average"""
+    tiers = np.full(games.shape, None, dtype=object)
+    eligible = np.flatnonzero(games >= min_games)
+    if not eligible.size:
+        return tiers
+    average = wins.sum() / games.sum()
+    # Pocas partidas tiran el winrate hacia el promedio del parche
+    score = (wins[eligible] + prior_games * average) / (games[eligible] + prior_games)
+    order = np.argsort(-score, kind="stable")
+    percentile = np.empty(eligible.size)
+    percentile[order] = (np.arange(eligible.size) + 1) / eligible.size
+    tiers[eligible] = np.array(TIERS, dtype=object)[np.searchsorted(TIER_PERCENTILES, percentile, side="left")]
+    return tiers
+
+
+def build_report(patch_sums: _PatchSums, min_games: int, prior_games: int) -> Dict[int, Dict]:
+    """Per-champion jungle metrics of one patch, all champions computed at once"""
+    s = patch_sums.sums
+    games = s[_COLUMN["games"]]
+    early_games = s[_COLUMN["early_games"]]
+    objectives = s[_COLUMN["team_objectives"]]
+    metrics = {
+        "winrate": _ratio(s[_COLUMN["wins"]], games) * 100,
+        "pick_rate": _ratio(games, np.full(games.shape, float(patch_sums.matches))) * 100,
+        "jungle_cs_per_min": _ratio(s[_COLUMN["jungle_cs"]], s[_COLUMN["minutes"]]),
+        "objective_control": _ratio(objectives, objectives + s[_COLUMN["enemy_objectives"]]) * 100,
+        "kill_participation": _ratio(s[_COLUMN["takedowns"]], s[_COLUMN["team_kills"]]) * 100,
+        "early_takedowns": _ratio(s[_COLUMN["early_takedowns"]], early_games),
+        # Proxy de velocidad de clear: CS de jungla por minuto antes del minuto 10
+        "clear_speed": _ratio(s[_COLUMN["early_jungle_cs"]], early_games * EARLY_MINUTES),
+    }
+    tiers = _tiers(s[_COLUMN["wins"]], games, min_games, prior_games)
+
+    report: Dict[int, Dict] = {}
+    for champion_id in np.flatnonzero(games):
+        entry = {"games": int(games[champion_id])}
+        for name, values in metrics.items():
+            value = values[champion_id]
+            entry[name] = None if np.isnan(value) else round(float(value), 2)
+        entry["meta_tier"] = tiers[champion_id]
+        entry["sample"] = "ok" if games[champion_id] >= min_games else "low"
+        report[int(champion_id)] = entry
+    return report
+
+
+class ChampionStatsEngine:
+    """Per-patch, per-champion jungle metrics computed from the match store
+
+    Every jungler of every stored match becomes one row of columnar arrays
+    (decoded on the CPU pool); rows are grouped by patch and folded into
+    per-champion sums with weighted bincounts, so new matches only cost
+    their own rows. Rates and tiers for a patch are derived from the sums
+    for all champions at once and cached until that patch gets new rows,
+    as are the serialized responses built from them.
+    The store is rescanned from the last seen rowid when it has new writes
+    or every `refresh_interval` seconds.
+    """
+
+    def __init__(self, refresh_interval: float, batch_size: int, min_games: int, prior_games: int):
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.min_games = min_games
+        self.prior_games = prior_games
+        self._patches: Dict[str, _PatchSums] = {}
+        self._reports: Dict[str, Tuple[int, Dict[int, Dict]]] = {}  # parche -> (versión, reporte)
+        # parche -> ((versión, datos estáticos), respuestas serializadas por clave)
+        self._resources: Dict[Optional[str], Tuple[Tuple[int, Any], Dict[Hashable, StaticResource]]] = {}
+        self._last_rowid: Optional[int] = None
+        self._seen_writes = -1
+        self._refreshed_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._warmup: Optional[asyncio.Task] = None
+
+        # Métricas
+        self.refreshes = 0
+        self.matches_scanned = 0
+        self.rows = 0
+        self.reports_built = 0
+        self.resources_built = 0
+        self.last_refresh_seconds = 0.0
+
+    def _apply(self, patches: List[str], champions: np.ndarray, values: np.ndarray, matches: Dict[str, int]):
+        if champions.size:
+            names, codes = np.unique(np.array(patches), return_inverse=True)
+            for code, patch in enumerate(names.tolist()):
+                selected = codes == code
+                self._patches.setdefault(patch, _PatchSums()).add(
+                    champions[selected], values[:, selected], matches.pop(patch, 0)
+                )
+        # Partidas sin junglas (otras colas) igual cuentan para el pick rate
+        for patch, count in matches.items():
+            self._patches.setdefault(patch, _PatchSums()).matches += count
+        self.rows += int(champions.size)
+
+    async def refresh(self) -> int:
+        """Fold every match stored since the last refresh into the sums; returns matches read"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            started = time.monotonic()
+            writes = match_store.writes
+            after = self._last_rowid or 0
+            read = 0
+            while True:
+                # Varios lotes a la vez: uno por worker del pool de CPU
+                stored = await asyncio.to_thread(match_store.scan, after, self.batch_size * cpu_pool.max_workers)
+                if not stored:
+                    break
+                chunks = [stored[i:i + self.batch_size] for i in range(0, len(stored), self.batch_size)]
+                results = await asyncio.gather(*(
+                    cpu_pool.run(extract_jungle_rows, [blob for _, blob in chunk]) for chunk in chunks
+                ))
+                for result in results:
+                    self._apply(*result)
+                after = stored[-1][0]
+                read += len(stored)
+            self._last_rowid = after
+            self._seen_writes = writes
+            self._refreshed_at = time.monotonic()
+            self.refreshes += 1
+            self.matches_scanned += read
+            self.last_refresh_seconds = round(self._refreshed_at - started, 3)
+            return read
+
+    async def open(self):
+        """Fold the stored matches in the background so the first request does not pay for it (app lifespan)"""
+        if self._warmup is None:
+            self._warmup = asyncio.create_task(self.refresh())
+
+    async def close(self):
+        if self._warmup is not None:
+            self._warmup.cancel()
+            await asyncio.gather(self._warmup, return_exceptions=True)
+            self._warmup = None
+
+    async def refresh_if_stale(self):
+        if (
+            self._last_rowid is None
+            or match_store.writes != self._seen_writes
+            or time.monotonic() - self._refreshed_at > self.refresh_interval
+        ):
+            await self.refresh()
+
+    def patches(self) -> List[str]:
+        """Patches with stored matches, newest first"""
+        return sorted(self._patches, key=_patch_sort_key, reverse=True)
+
+    def report(self, patch: str) -> Dict[int, Dict]:
+        patch_sums = self._patches.get(patch)
+        if patch_sums is None:
+            return {}
+        cached = self._reports.get(patch)
+        if cached is not None and cached[0] == patch_sums.version:
+            return cached[1]
+        report = build_report(patch_sums, self.min_games, self.prior_games)
+        self._reports[patch] = (patch_sums.version, report)
+        self.reports_built += 1
+        return report
+
+    async def champion(self, champion_id: Optional[int], patch: Optional[str] = None) -> Dict:
+        """One champion's metrics for `patch` (default: newest patch with data)"""
+        await self.refresh_if_stale()
+        if patch is None:
+            patches = self.patches()
+            patch = patches[0] if patches else None
+        patch_sums = self._patches.get(patch) if patch else None
+        stats = self.report(patch).get(champion_id) if patch_sums is not None and champion_id is not None else None
+        return {
+            "patch": patch,
+            "matches_in_patch": patch_sums.matches if patch_sums is not None else 0,
+            "stats": stats or {"games": 0, "meta_tier": None, "sample": "none"},
+            "last_updated": (
+                datetime.fromtimestamp(patch_sums.updated_at, tz=timezone.utc).isoformat()
+                if patch_sums is not None and patch_sums.updated_at else None
+            )
+        }
+
+    def resource(self, patch: Optional[str], key: Hashable, static: Any, build: Callable[[], StaticResource]) -> StaticResource:
+        """Serialized response for `key` in `patch`, rebuilt only when the patch sums or `static` change
+
+        `static` identifies the static data the response embeds (compared
+        by identity, e.g. the static data snapshot), so a hot reload also
+        drops the patch's responses.
+        """
+        patch_sums = self._patches.get(patch) if patch else None
+        generation = (patch_sums.version if patch_sums is not None else 0, static)
+        cached = self._resources.get(patch)
+        if cached is None or cached[0][0] != generation[0] or cached[0][1] is not static:
+            cached = (generation, {})
+            self._resources[patch] = cached
+        resource = cached[1].get(key)
+        if resource is None:
+            resource = build()
+            cached[1][key] = resource
+            self.resources_built += 1
+        return resource
+
+    def stats(self) -> Dict:
+        return {
+            "patches": {patch: self._patches[patch].matches for patch in self.patches()},
+            "last_rowid": self._last_rowid,
+            "refreshes": self.refreshes,
+            "matches_scanned": self.matches_scanned,
+            "jungle_rows": self.rows,
+            "reports_built": self.reports_built,
+            "resources_cached": sum(len(resources) for _, resources in self._resources.values()),
+            "resources_built": self.resources_built,
+            "last_refresh_seconds": self.last_refresh_seconds
+        }
+
+
+# Singleton instance
+champion_stats = ChampionStatsEngine(
+    refresh_interval=settings.CHAMPION_STATS_REFRESH_INTERVAL,
+    batch_size=settings.CHAMPION_STATS_BATCH,
+    min_games=settings.CHAMPION_STATS_MIN_GAMES,
+    prior_games=settings.CHAMPION_STATS_PRIOR_GAMES
+)
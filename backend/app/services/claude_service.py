@@ -2,6 +2,9 @@ import httpx
 import json
 from typing import Dict, List, Optional
 from app.core.config import settings
+from app.services.http_pool import PooledHTTPClient
+from app.services.compact_match import CompactMatch
+from app.services.resilience import UpstreamResilience, UpstreamUnavailableError
 
 
 class ClaudeAPIService:
@@ -13,6 +16,31 @@ class ClaudeAPIService:
             "Content-Type": "application/json",
             "anthropic-version": "2023-06-01"
         }
+        self.http = PooledHTTPClient(
+            "claude",
+            max_connections=settings.CLAUDE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.CLAUDE_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.CLAUDE_HTTP_KEEPALIVE_EXPIRY,
+            timeout=settings.CLAUDE_HTTP_TIMEOUT,
+            http2=settings.HTTP2_ENABLED,
+            headers=self.headers
+        )
+        self.resilience = UpstreamResilience(
+            "claude",
+            max_attempts=settings.UPSTREAM_MAX_ATTEMPTS,
+            backoff_base=settings.UPSTREAM_BACKOFF_BASE,
+            backoff_max=settings.UPSTREAM_BACKOFF_MAX,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_SECONDS
+        )
+
+    async def open(self):
+        """Open the shared Claude connection pool"""
+        await self.http.open()
+
+    async def close(self):
+        """Close the shared Claude connection pool"""
+        await self.http.close()
 
     async def _make_request(self, messages: List[Dict], system_prompt: str = None) -> Optional[str]:
         """Make request to Claude API"""
@@ -25,28 +53,30 @@ class ClaudeAPIService:
         if system_prompt:
             data["system"] = system_prompt
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/v1/messages",
-                    headers=self.headers,
-                    json=data
-                )
-                response.raise_for_status()
-                result = response.json()
-                return result["content"][0]["text"]
-            except httpx.HTTPStatusError as e:
-                return None
-            except Exception as e:
-                return None
-
-    async def analyze_jungle_performance(self, match_data: Dict, user_puuid: str) -> Optional[str]:
+        url = f"{self.base_url}/v1/messages"
+
+        async def send(budget: Optional[float]) -> httpx.Response:
+            timeout = settings.CLAUDE_HTTP_TIMEOUT if budget is None else min(settings.CLAUDE_HTTP_TIMEOUT, budget)
+            return await self.http.post(url, json=data, timeout=timeout)
+
+        try:
+            response = await self.resilience.execute(httpx.URL(url).host, send)
+            response.raise_for_status()
+            result = response.json()
+            return result["content"][0]["text"]
+        except UpstreamUnavailableError:
+            # Circuito abierto o deadline agotado: el handler global responde 503
+            raise
+        except httpx.HTTPStatusError as e:
+            print(f"Claude API error: {e}")
+            return None
+        except Exception as e:
+            print(f"Claude API unavailable: {e}")
+            return None
+
+    async def analyze_jungle_performance(self, match: CompactMatch, user_puuid: str) -> Optional[str]:
         """Analyze jungle performance from match data"""
-        player_data = None
-        for participant in match_data.get("info", {}).get("participants", []):
-            if participant.get("puuid") == user_puuid:
-                player_data = participant
-                break
+        player_data = match.participant(user_puuid)
 
         if not player_data:
             return None
@@ -56,17 +86,17 @@ class ClaudeAPIService:
         consejos específicos y constructivos en español."""
 
         match_summary = {
-            "champion": player_data.get("championName"),
-            "position": player_data.get("teamPosition"),
-            "gameResult": "Victoria" if player_data.get("win") else "Derrota",
-            "kda": f"{player_data.get('kills', 0)}/{player_data.get('deaths', 0)}/{player_data.get('assists', 0)}",
-            "cs": player_data.get("totalMinionsKilled", 0),
-            "jungleCS": player_data.get("neutralMinionsKilled", 0),
-            "visionScore": player_data.get("visionScore", 0),
-            "gameDuration": match_data.get("info", {}).get("gameDuration", 0) // 60,
-            "dragons": player_data.get("dragonKills", 0),
-            "barons": player_data.get("baronKills", 0),
-            "objectives": player_data.get("objectivesStolen", 0),
+            "champion": player_data.champion_name,
+            "position": player_data.team_position,
+            "gameResult": "Victoria" if player_data.win else "Derrota",
+            "kda": f"{player_data.kills}/{player_data.deaths}/{player_data.assists}",
+            "cs": player_data.total_minions_killed,
+            "jungleCS": player_data.neutral_minions_killed,
+            "visionScore": player_data.vision_score,
+            "gameDuration": match.game_duration // 60,
+            "dragons": player_data.dragon_kills,
+            "barons": player_data.baron_kills,
+            "objectives": player_data.objectives_stolen,
         }
 
         messages = [
@@ -148,33 +178,28 @@ Mantén las recomendaciones actualizadas con el meta actual."""
 
         return await self._make_request(messages, system_prompt)
 
-    async def analyze_jungle_pathing(self, match_data: Dict, user_puuid: str) -> Optional[str]:
+    async def analyze_jungle_pathing(self, match: CompactMatch, user_puuid: str) -> Optional[str]:
         """Analyze jungle pathing efficiency"""
         system_prompt = """Eres un coach experto en pathing de jungla. Analiza la eficiencia 
         del recorrido de jungla y proporciona consejos específicos para optimizar el claro."""
 
-        player_data = None
-        for participant in match_data.get("info", {}).get("participants", []):
-            if participant.get("puuid") == user_puuid:
-                player_data = participant
-                break
+        player_data = match.participant(user_puuid)
 
         if not player_data:
             return None
 
-        cs_per_min = player_data.get("neutralMinionsKilled", 0) / (
-                    match_data.get("info", {}).get("gameDuration", 1) / 60)
+        cs_per_min = player_data.neutral_minions_killed / ((match.game_duration or 1) / 60)
 
         messages = [
             {
                 "role": "user",
                 "content": f"""Analiza la eficiencia de jungla:
 
-Champion: {player_data.get('championName')}
-CS de jungla: {player_data.get('neutralMinionsKilled', 0)}
+Champion: {player_data.champion_name}
+CS de jungla: {player_data.neutral_minions_killed}
 CS por minuto: {cs_per_min:.1f}
-Duración de partida: {match_data.get("info", {}).get("gameDuration", 0) // 60} minutos
-Nivel final: {player_data.get('champLevel', 0)}
+Duración de partida: {match.game_duration // 60} minutos
+Nivel final: {player_data.champ_level}
 
 Proporciona consejos específicos sobre:
 1. Eficiencia del claro de jungla
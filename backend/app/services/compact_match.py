@@ -0,0 +1,213 @@
+import json
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple
+from app.services.match_projection import JUNGLE_STAT_FIELDS, project_match
+from app.services.match_store import is_finished_match
+
+# Atributo -> ruta en el participante de match-v5 (igual que JUNGLE_STAT_FIELDS)
+_PARTICIPANT_PATHS: Dict[str, str] = {
+    "puuid": "puuid",
+    "champion_name": "championName",
+    "team_position": "teamPosition",
+    "win": "win",
+    "kills": "kills",
+    "deaths": "deaths",
+    "assists": "assists",
+    "total_minions_killed": "totalMinionsKilled",
+    "neutral_minions_killed": "neutralMinionsKilled",
+    "vision_score": "visionScore",
+    "dragon_kills": "dragonKills",
+    "baron_kills": "baronKills",
+    "objectives_stolen": "objectivesStolen",
+    "turret_kills": "turretKills",
+    "champ_level": "champLevel",
+    "rift_herald_takedowns": "challenges.riftHeraldTakedowns",
+}
+
+# Strings muy repetidos entre partidas: una sola copia en memoria
+_INTERNED = {"puuid", "champion_name", "team_position"}
+
+
+def _lookup(source: Dict, path: str):
+    for key in path.split("."):
+        source = source.get(key) if isinstance(source, dict) else None
+    return source
+
+
+@dataclass(frozen=True, slots=True)
+class ParticipantStats:
+    """The per-player fields the services read, without the ~250 other keys"""
+    puuid: str
+    champion_name: str
+    team_position: str
+    win: bool
+    kills: int
+    deaths: int
+    assists: int
+    total_minions_killed: int
+    neutral_minions_killed: int
+    vision_score: int
+    dragon_kills: int
+    baron_kills: int
+    objectives_stolen: int
+    turret_kills: int
+    champ_level: int
+    rift_herald_takedowns: int
+
+    @classmethod
+    def from_participant(cls, participant: Dict) -> "ParticipantStats":
+        values = {}
+        for name, path in _PARTICIPANT_PATHS.items():
+            value = _lookup(participant, path)
+            if name in _INTERNED:
+                value = sys.intern(value or "")
+            elif name == "win":
+                value = bool(value)
+            else:
+                value = value or 0
+            values[name] = value
+        return cls(**values)
+
+    def interned(self) -> "ParticipantStats":
+        return replace(self, **{name: sys.intern(getattr(self, name)) for name in _INTERNED})
+
+    def to_dict(self) -> Dict:
+        """match-v5 participant shape (camelCase, challenges nested)"""
+        result: Dict = {}
+        for name, path in _PARTICIPANT_PATHS.items():
+            if "." in path:
+                parent, leaf = path.split(".")
+                result.setdefault(parent, {})[leaf] = getattr(self, name)
+            else:
+                result[path] = getattr(self, name)
+        return result
+
+
+@dataclass(frozen=True, slots=True)
+class CompactMatch:
+    """Compact, immutable view of a match-v5 payload for caching and analysis"""
+    match_id: str
+    game_creation: int
+    game_start: Optional[int]
+    game_end: Optional[int]
+    game_duration: int
+    game_mode: str
+    game_version: str
+    finished: bool
+    participants: Tuple[ParticipantStats, ...]
+
+    @classmethod
+    def _from_info(cls, match_id: str, info: Dict) -> "CompactMatch":
+        return cls(
+            match_id=match_id,
+            game_creation=info.get("gameCreation") or 0,
+            game_start=info.get("gameStartTimestamp"),
+            game_end=info.get("gameEndTimestamp"),
+            game_duration=info.get("gameDuration") or 0,
+            game_mode=sys.intern(info.get("gameMode") or "CLASSIC"),
+            game_version=sys.intern(info.get("gameVersion") or ""),
+            finished=is_finished_match({"info": info}),
+            participants=tuple(ParticipantStats.from_participant(p) for p in info.get("participants", []))
+        )
+
+    @classmethod
+    def from_match(cls, match_data: Dict) -> "CompactMatch":
+        """Build from a full match-v5 payload"""
+        return cls._from_info(match_data.get("metadata", {}).get("matchId", ""), match_data.get("info", {}))
+
+    @classmethod
+    def from_projection(cls, match_id: str, projection: Dict) -> "CompactMatch":
+        """Build from a match_projection result (a single participant)"""
+        return cls._from_info(match_id, projection.get("info", {}))
+
+    def interned(self) -> "CompactMatch":
+        """The same match with its repeated strings interned in this process
+
+        sys.intern does not survive pickling, so a match decoded on a
+        process-pool worker comes back with private copies of every
+        puuid, champion name and position.
+        """
+        return replace(
+            self,
+            game_mode=sys.intern(self.game_mode),
+            game_version=sys.intern(self.game_version),
+            participants=tuple(p.interned() for p in self.participants)
+        )
+
+    def participant(self, puuid: str) -> Optional[ParticipantStats]:
+        for participant in self.participants:
+            if participant.puuid == puuid:
+                return participant
+        return None
+
+    def only(self, puuid: str) -> "CompactMatch":
+        """The same match restricted to one player (empty if they did not play)"""
+        player = self.participant(puuid)
+        return CompactMatch(
+            self.match_id, self.game_creation, self.game_start, self.game_end,
+            self.game_duration, self.game_mode, self.game_version, self.finished,
+            (player,) if player is not None else ()
+        )
+
+    def to_dict(self) -> Dict:
+        """match-v5 shape with only the compact fields"""
+        return {
+            "metadata": {"matchId": self.match_id},
+            "info": {
+                "gameCreation": self.game_creation,
+                "gameStartTimestamp": self.game_start,
+                "gameEndTimestamp": self.game_end,
+                "gameDuration": self.game_duration,
+                "gameMode": self.game_mode,
+                "gameVersion": self.game_version,
+                "participants": [p.to_dict() for p in self.participants]
+            }
+        }
+
+
+def decode_compact_match(raw: bytes) -> CompactMatch:
+    """Raw match-v5 JSON -> CompactMatch (runs on the CPU pool)"""
+    return CompactMatch.from_match(json.loads(raw))
+
+
+def project_compact_match(match_id: str, raw: bytes, puuid: str) -> CompactMatch:
+    """Raw match-v5 JSON -> CompactMatch with only `puuid` (cheap enough to run in-process)"""
+    return CompactMatch.from_projection(match_id, project_match(raw, puuid, JUNGLE_STAT_FIELDS))
+
+
+class CompactMatchCache:
+    """Count-bounded LRU of CompactMatch objects keyed by match ID"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CompactMatch]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, match_id: str) -> Optional[CompactMatch]:
+        match = self._entries.get(match_id)
+        if match is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(match_id)
+        self.hits += 1
+        return match
+
+    def put(self, match: CompactMatch):
+        self._entries[match.match_id] = match
+        self._entries.move_to_end(match.match_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
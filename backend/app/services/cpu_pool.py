@@ -0,0 +1,137 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+from app.core.config import settings
+
+T = TypeVar("T")
+
+CPU_POOL_MODES = ("process", "thread", "inline")
+
+
+class CPUWorkerPool:
+    """Bounded executor for CPU-heavy steps (match decoding, projection, aggregation)
+
+    Work runs off the event loop in a process pool (or threads). At most
+    `max_pending` jobs are submitted at once; further callers wait on a
+    semaphore instead of piling up in the executor queue, which is what
+    provides back-pressure. Functions and arguments must be picklable in
+    process mode, so only module-level functions are submitted.
+    """
+
+    def __init__(self, name: str, mode: str, max_workers: int, max_pending: int):
+        if mode not in CPU_POOL_MODES:
+            raise ValueError(f"CPU pool mode must be one of {CPU_POOL_MODES}, got '{mode}'")
+        self.name = name
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max(max_pending, self.max_workers)
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Métricas de cola
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.broken = 0
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _build_executor(self) -> Optional[Executor]:
+        if self.mode == "process":
+            # spawn: los workers no heredan hilos ni conexiones del proceso del servidor
+            return ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        if self.mode == "thread":
+            return ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+        return None
+
+    async def open(self):
+        """Start the workers (called from the app lifespan)"""
+        if self._executor is None:
+            self._executor = self._build_executor()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+
+    async def close(self):
+        """Stop the workers, dropping jobs that never started"""
+        executor, self._executor = self._executor, None
+        self._semaphore = None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run `fn(*args)` on a worker and await its result"""
+        # Scripts como setup_user.py no pasan por el lifespan de FastAPI
+        await self.open()
+        self.submitted += 1
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        queued_at = time.monotonic()
+        acquired = False
+        try:
+            async with self._semaphore:
+                acquired = True
+                self.waiting -= 1
+                started = time.monotonic()
+                wait = started - queued_at
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.in_flight += 1
+                try:
+                    if self._executor is None:
+                        result = fn(*args)
+                    else:
+                        result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+                except BrokenExecutor:
+                    # Un worker murió (p. ej. OOM): el próximo job arranca un pool nuevo
+                    self.failed += 1
+                    self.broken += 1
+                    self._executor = None
+                    raise
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.in_flight -= 1
+                    self.total_run += time.monotonic() - started
+        finally:
+            if not acquired:
+                # Cancelado mientras esperaba turno
+                self.waiting -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> Dict:
+        started = self.completed + self.failed + self.in_flight
+        return {
+            "name": self.name,
+            "mode": self.mode,
+            "open": self._executor is not None or (self.mode == "inline" and self._semaphore is not None),
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pool_restarts": self.broken,
+            "avg_wait_ms": round(self.total_wait / started * 1000, 2) if started else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "avg_run_ms": round(self.total_run / started * 1000, 2) if started else 0.0
+        }
+
+
+# Singleton instance
+cpu_pool = CPUWorkerPool(
+    "cpu",
+    mode=settings.CPU_POOL_MODE,
+    max_workers=settings.CPU_POOL_WORKERS,
+    max_pending=settings.CPU_POOL_MAX_PENDING
+)
@@ -0,0 +1,170 @@
+import httpx
+from typing import Callable, Dict, Optional
+
+try:
+    import h2  # noqa: F401  -- instalado con httpx[http2]
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class PooledHTTPClient:
+    """Long-lived keep-alive httpx client with connection reuse statistics"""
+
+    def __init__(
+        self,
+        name: str,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        timeout: float,
+        http2: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        wrap_transport: Optional[Callable[[Callable[[], httpx.AsyncBaseTransport]], httpx.AsyncBaseTransport]] = None
+    ):
+        self.name = name
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.headers = headers or {}
+        # Permite interponer un transporte (p. ej. grabación/replay de respuestas); recibe
+        # una fábrica del transporte real para no abrir uno que el replay nunca usa
+        self.wrap_transport = wrap_transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Estadísticas de reutilización
+        self.requests = 0
+        self.connections_opened = 0
+        self.errors = 0
+
+    def _build_client(self) -> httpx.AsyncClient:
+        if self.wrap_transport is not None:
+            transport = self.wrap_transport(lambda: httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2))
+            return httpx.AsyncClient(transport=transport, timeout=self.timeout, headers=self.headers)
+        return httpx.AsyncClient(
+            limits=self.limits,
+            timeout=self.timeout,
+            http2=self.http2,
+            headers=self.headers
+        )
+
+    async def open(self):
+        """Open the connection pool (called from the app lifespan)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def close(self):
+        """Close every pooled connection"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Scripts como setup_user.py no pasan por el lifespan de FastAPI
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def _trace(self, event_name: str, info: Dict):
+        """httpcore trace hook, fires once per newly opened TCP connection"""
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared pool"""
+        self.requests += 1
+        extensions = kwargs.pop("extensions", {})
+        extensions["trace"] = self._trace
+        try:
+            return await self.client.request(method, url, extensions=extensions, **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict:
+        """Pool configuration and reuse ratio"""
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "name": self.name,
+            "open": self._client is not None and not self._client.is_closed,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "timeout": self.timeout.read,
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "errors": self.errors,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0
+        }
+
+
+class HostPoolGroup:
+    """One PooledHTTPClient per routing host, so a slow shard never blocks another"""
+
+    def __init__(
+        self,
+        name: str,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        timeout: float,
+        http2: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        wrap_transport: Optional[Callable[[Callable[[], httpx.AsyncBaseTransport]], httpx.AsyncBaseTransport]] = None
+    ):
+        self.name = name
+        self._config = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+            "timeout": timeout,
+            "http2": http2,
+            "headers": headers,
+            "wrap_transport": wrap_transport
+        }
+        self.pools: Dict[str, PooledHTTPClient] = {}
+
+    def pool(self, host: str) -> PooledHTTPClient:
+        pool = self.pools.get(host)
+        if pool is None:
+            pool = self.pools[host] = PooledHTTPClient(f"{self.name}:{host}", **self._config)
+        return pool
+
+    async def open(self, hosts: Optional[list] = None):
+        """Open the pools for `hosts` up front (others open on first use)"""
+        for host in hosts or []:
+            await self.pool(host).open()
+
+    async def close(self):
+        for pool in self.pools.values():
+            await pool.close()
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.pool(httpx.URL(url).host).request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def stats(self) -> Dict:
+        pools = {host: pool.stats() for host, pool in self.pools.items()}
+        requests = sum(p["requests"] for p in pools.values())
+        opened = sum(p["connections_opened"] for p in pools.values())
+        return {
+            "name": self.name,
+            "requests": requests,
+            "connections_opened": opened,
+            "reuse_ratio": round(max(requests - opened, 0) / requests, 3) if requests else 0.0,
+            "hosts": pools
+        }
@@ -0,0 +1,236 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+from app.core.champions import champion_index
+from app.core.config import settings
+from app.core.regions import resolve_region
+from app.services.riot_service import riot_service
+from app.services.riot_rate_limiter import Priority, riot_priority
+from app.services.resilience import clear_deadline
+
+
+class SummonerNotFoundError(LookupError):
+    """The Riot ID or its summoner could not be resolved"""
+
+
+async def fetch_live_game_snapshot(riot_id: str, tag_line: str, region: str = "las") -> Dict:
+    """Resolve the summoner and build the live-game payload served by /jungle/live-game"""
+    # Las consultas en vivo van por el carril interactivo del scheduler
+    with riot_priority(Priority.INTERACTIVE):
+        # Obtener información del summoner
+        summoner_data = await riot_service.get_summoner_by_riot_id(riot_id, tag_line, region)
+        if not summoner_data:
+            raise SummonerNotFoundError("Summoner not found")
+
+        # Obtener detalles del summoner para tener el ID
+        puuid = summoner_data.get("puuid")
+        summoner_details = await riot_service.get_summoner_by_puuid(puuid, region)
+        if not summoner_details:
+            raise SummonerNotFoundError("Summoner details not found")
+
+        # Verificar si hay una partida activa
+        current_game = await riot_service.get_current_game(summoner_details.get("id"), region)
+
+    if not current_game:
+        return {
+            "in_game": False,
+            "message": "No hay partida activa",
+            "summoner": summoner_data
+        }
+
+    # Extraer información relevante de la partida
+    game_info = {
+        "gameId": current_game.get("gameId"),
+        "gameMode": current_game.get("gameMode"),
+        "gameLength": current_game.get("gameLength"),  # en segundos
+        "participants": []
+    }
+
+    # Encontrar al jugador y extraer información relevante
+    player_info = None
+    for participant in current_game.get("participants", []):
+        if participant.get("puuid") == puuid:
+            player_info = champion_index.enrich({
+                "championId": participant.get("championId"),
+                "spell1Id": participant.get("spell1Id"),
+                "spell2Id": participant.get("spell2Id"),
+                "teamId": participant.get("teamId")
+            })
+
+        # championName / championKey desde el índice local: el cliente no resuelve ids
+        game_info["participants"].append(champion_index.enrich({
+            "championId": participant.get("championId"),
+            "teamId": participant.get("teamId"),
+            "puuid": participant.get("puuid") == puuid  # Mark if it's our player
+        }))
+
+    return {
+        "in_game": True,
+        "game_info": game_info,
+        "player_info": player_info,
+        "game_time_minutes": current_game.get("gameLength", 0) // 60,
+        "tracking_started": datetime.now().isoformat()
+    }
+
+
+class _TrackedSummoner:
+    def __init__(self, riot_id: str, tag_line: str, region: str):
+        self.riot_id = riot_id
+        self.tag_line = tag_line
+        self.region = region
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.latest: Optional[Dict] = None
+        self.updated_at = 0.0
+        self.idle_since: Optional[float] = None
+        self.first_result = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+class LiveGamePoller:
+    """One background poller per tracked summoner, shared by every subscriber
+
+    Upstream cost is one live-game check per tracked player per tick no matter
+    how many dashboards watch it. The cadence adapts: slow out of game, fast
+    around game start and end, normal in between.
+    """
+
+    def __init__(
+        self,
+        idle_interval: float,
+        in_game_interval: float,
+        transition_interval: float,
+        late_game_seconds: int,
+        linger_seconds: float
+    ):
+        self.idle_interval = idle_interval
+        self.in_game_interval = in_game_interval
+        self.transition_interval = transition_interval
+        self.late_game_seconds = late_game_seconds
+        self.linger_seconds = linger_seconds
+        self._tracked: Dict[Tuple[str, str, str], _TrackedSummoner] = {}
+        self.upstream_polls = 0
+
+    @staticmethod
+    def _key(riot_id: str, tag_line: str, region: str) -> Tuple[str, str, str]:
+        return resolve_region(region).platform, riot_id.strip().lower(), tag_line.strip().lower()
+
+    def _track(self, riot_id: str, tag_line: str, region: str) -> _TrackedSummoner:
+        key = self._key(riot_id, tag_line, region)
+        tracked = self._tracked.get(key)
+        if tracked is None or tracked.task is None or tracked.task.done():
+            tracked = _TrackedSummoner(riot_id, tag_line, region)
+            tracked.task = asyncio.create_task(self._run(key, tracked))
+            self._tracked[key] = tracked
+        return tracked
+
+    def next_interval(self, previous: Optional[Dict], snapshot: Dict) -> float:
+        """Poll faster around game start/end, slower while the player is idle"""
+        in_game = snapshot.get("in_game", False)
+        if previous is not None and previous.get("in_game", False) != in_game:
+            return self.transition_interval
+        if not in_game:
+            return self.idle_interval
+        game_length = snapshot.get("game_info", {}).get("gameLength") or 0
+        if game_length < 180 or game_length >= self.late_game_seconds:
+            return self.transition_interval
+        return self.in_game_interval
+
+    def _publish(self, tracked: _TrackedSummoner, snapshot: Dict):
+        tracked.latest = snapshot
+        tracked.updated_at = time.monotonic()
+        tracked.first_result.set()
+        for queue in tracked.subscribers:
+            if queue.full():
+                # Un cliente lento solo necesita el estado más reciente
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
+
+    async def _run(self, key: Tuple[str, str, str], tracked: _TrackedSummoner):
+        clear_deadline()
+        try:
+            while True:
+                previous = tracked.latest
+                self.upstream_polls += 1
+                try:
+                    snapshot = await fetch_live_game_snapshot(tracked.riot_id, tracked.tag_line, tracked.region)
+                except SummonerNotFoundError as e:
+                    snapshot = {"in_game": False, "error": str(e), "not_found": True}
+                except Exception as e:
+                    snapshot = {"in_game": False, "error": f"Error tracking live game: {e}"}
+                snapshot["updated_at"] = datetime.now().isoformat()
+                self._publish(tracked, snapshot)
+
+                if snapshot.get("not_found"):
+                    interval = self.idle_interval
+                else:
+                    interval = self.next_interval(previous, snapshot)
+                await asyncio.sleep(interval)
+
+                if not tracked.subscribers:
+                    if tracked.idle_since is None:
+                        tracked.idle_since = time.monotonic()
+                    if time.monotonic() - tracked.idle_since >= self.linger_seconds:
+                        break
+                else:
+                    tracked.idle_since = None
+        finally:
+            if self._tracked.get(key) is tracked:
+                del self._tracked[key]
+
+    async def subscribe(self, riot_id: str, tag_line: str, region: str = "las") -> asyncio.Queue:
+        """Register a subscriber; the current state (if any) is delivered immediately"""
+        tracked = self._track(riot_id, tag_line, region)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        tracked.subscribers.add(queue)
+        tracked.idle_since = None
+        if tracked.latest is not None:
+            queue.put_nowait(tracked.latest)
+        return queue
+
+    def unsubscribe(self, riot_id: str, tag_line: str, region: str, queue: asyncio.Queue):
+        tracked = self._tracked.get(self._key(riot_id, tag_line, region))
+        if tracked is not None:
+            tracked.subscribers.discard(queue)
+
+    async def get_snapshot(self, riot_id: str, tag_line: str, region: str = "las") -> Dict:
+        """Latest shared state for a player, starting its poller if needed"""
+        tracked = self._track(riot_id, tag_line, region)
+        tracked.idle_since = None
+        if tracked.latest is None:
+            await tracked.first_result.wait()
+        return tracked.latest
+
+    async def close(self):
+        tasks = [t.task for t in self._tracked.values() if t.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tracked.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "tracked_summoners": len(self._tracked),
+            "subscribers": sum(len(t.subscribers) for t in self._tracked.values()),
+            "upstream_polls": self.upstream_polls,
+            "players": [
+                {
+                    "riot_id": f"{t.riot_id}#{t.tag_line}",
+                    "region": t.region,
+                    "subscribers": len(t.subscribers),
+                    "in_game": (t.latest or {}).get("in_game"),
+                    "age_seconds": round(time.monotonic() - t.updated_at, 1) if t.latest else None
+                }
+                for t in self._tracked.values()
+            ]
+        }
+
+
+# Singleton instance
+live_game_poller = LiveGamePoller(
+    idle_interval=settings.LIVE_GAME_IDLE_INTERVAL,
+    in_game_interval=settings.LIVE_GAME_IN_GAME_INTERVAL,
+    transition_interval=settings.LIVE_GAME_TRANSITION_INTERVAL,
+    late_game_seconds=settings.LIVE_GAME_LATE_GAME_SECONDS,
+    linger_seconds=settings.LIVE_GAME_LINGER_SECONDS
+)
@@ -0,0 +1,396 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.game_session import GameSession, replace_objectives_statements
+from app.models.match_sync import MatchSyncState
+from app.services.riot_service import riot_service
+from app.services.compact_match import CompactMatch
+from app.services.session_aggregates import apply_session_changes, stored_session_rows
+from app.services.riot_rate_limiter import Priority, riot_priority
+from app.services.resilience import clear_deadline
+
+
+def _timestamp(ms: Optional[int]) -> Optional[datetime]:
+    if not ms:
+        return None
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def extract_session_row(match: CompactMatch, puuid: str, user_id: int, jungle_only: bool = True) -> Optional[Dict]:
+    """Build a game_sessions row from the player's participant in a match"""
+    player = match.participant(puuid)
+
+    if not player:
+        return None
+    if jungle_only and player.team_position != "JUNGLE":
+        return None
+
+    objectives = {
+        "dragons": player.dragon_kills,
+        "barons": player.baron_kills,
+        "heralds": player.rift_herald_takedowns,
+        "objectives_stolen": player.objectives_stolen,
+        "turrets": player.turret_kills
+    }
+
+    return {
+        "user_id": user_id,
+        "match_id": match.match_id,
+        "champion_name": player.champion_name,
+        "game_mode": match.game_mode,
+        "game_duration": match.game_duration,
+        "won": player.win,
+        "kills": player.kills,
+        "deaths": player.deaths,
+        "assists": player.assists,
+        "cs_score": player.total_minions_killed + player.neutral_minions_killed,
+        "jungle_cs": player.neutral_minions_killed,
+        "vision_score": player.vision_score,
+        "objectives_secured": objectives,
+        "started_at": _timestamp(match.game_start or match.game_creation),
+        "ended_at": _timestamp(match.game_end)
+    }
+
+
+def upsert_game_sessions(db: Session, rows: List[Dict]) -> int:
+    """Insert or update many game sessions in one statement, keyed on match_id"""
+    if not rows:
+        return 0
+
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    # Versión previa de las sesiones que se actualizan, para mover los agregados
+    previous = {row["match_id"]: row for row in stored_session_rows(db, [row["match_id"] for row in rows])}
+
+    stmt = insert(GameSession).values(rows)
+    # notes y ai_suggestions no vienen de Riot: no se pisan
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["match_id"],
+        set_={column: stmt.excluded[column] for column in rows[0] if column != "match_id"}
+    ).returning(GameSession.id, GameSession.match_id)
+    session_ids = dict((match_id, session_id) for session_id, match_id in db.execute(stmt))
+
+    # Tabla indexada de objetivos, en la misma transacción que las sesiones
+    objectives = {session_ids[row["match_id"]]: row.get("objectives_secured") for row in rows}
+    for statement in replace_objectives_statements(objectives):
+        db.execute(statement)
+
+    # Los upserts masivos no disparan eventos ORM: agregados actualizados acá
+    apply_session_changes(
+        db,
+        previous.values(),
+        [{**previous.get(row["match_id"], {}), **row} for row in rows]
+    )
+    return len(rows)
+
+
+def _existing_match_ids(match_ids: List[str]) -> Set[str]:
+    db = SessionLocal()
+    try:
+        rows = db.query(GameSession.match_id).filter(GameSession.match_id.in_(match_ids)).all()
+        return {row[0] for row in rows}
+    finally:
+        db.close()
+
+
+def _write_rows(rows: List[Dict]) -> int:
+    db = SessionLocal()
+    try:
+        written = upsert_game_sessions(db, rows)
+        db.commit()
+        return written
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _load_user(user_id: int) -> Optional[Dict]:
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+        if not user:
+            return None
+        return {"id": user.id, "riot_id": user.riot_id, "tag_line": user.tag_line, "region": user.region}
+    finally:
+        db.close()
+
+
+def _load_watermark(user_id: int) -> Optional[Dict]:
+    db = SessionLocal()
+    try:
+        state = db.get(MatchSyncState, user_id)
+        if not state or not state.last_match_id:
+            return None
+        return {
+            "last_match_id": state.last_match_id,
+            "last_match_start_time": state.last_match_start_time,
+            "last_synced_at": state.last_synced_at
+        }
+    finally:
+        db.close()
+
+
+def _save_watermark(user_id: int, match_id: Optional[str], start_time: Optional[int]):
+    """Move the watermark forward (never backwards) and stamp the sync time"""
+    db = SessionLocal()
+    try:
+        state = db.get(MatchSyncState, user_id)
+        if state is None:
+            state = MatchSyncState(user_id=user_id)
+            db.add(state)
+        if match_id and start_time is not None and (state.last_match_start_time or 0) <= start_time:
+            state.last_match_id = match_id
+            state.last_match_start_time = start_time
+        state.last_synced_at = datetime.now(timezone.utc)
+        db.commit()
+    finally:
+        db.close()
+
+
+class BackfillJob:
+    """Progress of one user's match-history backfill"""
+
+    def __init__(self, user_id: int, max_matches: int):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.max_matches = max_matches
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.pages = 0
+        self.match_ids_seen = 0
+        self.already_stored = 0
+        self.downloaded = 0
+        self.upserted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.new_match_ids: List[str] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def progress(self) -> Dict:
+        elapsed = 0.0
+        if self.started_at:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return {
+            "job_id": self.id,
+            "user_id": self.user_id,
+            "status": self.status,
+            "error": self.error,
+            "max_matches": self.max_matches,
+            "pages": self.pages,
+            "match_ids_seen": self.match_ids_seen,
+            "already_stored": self.already_stored,
+            "downloaded": self.downloaded,
+            "upserted": self.upserted,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "new_match_ids": self.new_match_ids,
+            "elapsed_seconds": round(elapsed, 2),
+            "matches_per_second": round(self.downloaded / elapsed, 2) if elapsed else 0.0
+        }
+
+
+class MatchBackfillService:
+    """Pages through a user's match history and bulk-upserts it into game_sessions
+
+    Idempotent (upsert on match_id) and resumable: re-running a job skips the
+    matches that are already stored, so an interrupted backfill picks up where
+    it stopped without re-downloading anything.
+    """
+
+    def __init__(self, concurrency: int, page_size: int, max_matches: int):
+        self.concurrency = concurrency
+        self.page_size = page_size
+        self.max_matches = max_matches
+        self.jobs: Dict[str, BackfillJob] = {}
+
+    def start(self, user_id: int, max_matches: Optional[int] = None) -> BackfillJob:
+        """Start (or return the already running) backfill for a user"""
+        for job in self.jobs.values():
+            if job.user_id == user_id and job.status in ("pending", "running"):
+                return job
+
+        job = BackfillJob(user_id, max_matches or self.max_matches)
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self.run(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[BackfillJob]:
+        return self.jobs.get(job_id)
+
+    async def _download_rows(
+            self,
+            job: BackfillJob,
+            match_ids: List[str],
+            puuid: str,
+            user_id: int,
+            region: str
+    ) -> List[Dict]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(match_id: str) -> Optional[Dict]:
+            async with semaphore:
+                try:
+                    # La decodificación corre en el pool de CPU, no en el event loop
+                    match = await riot_service.get_compact_match(match_id, region)
+                except Exception as e:
+                    print(f"Error downloading match {match_id}: {e}")
+                    match = None
+            if not match:
+                job.failed += 1
+                return None
+            job.downloaded += 1
+            row = extract_session_row(match, puuid, user_id)
+            if row is None:
+                job.skipped += 1
+            return row
+
+        rows = await asyncio.gather(*(fetch(match_id) for match_id in match_ids))
+        return [row for row in rows if row]
+
+    async def _advance_watermark(self, user_id: int, match_id: str, region: str):
+        """Record the newest ingested match as the user's sync watermark"""
+        match = await riot_service.get_compact_match(match_id, region)
+        start_ms = match.game_start if match else None
+        start_time = start_ms // 1000 if start_ms else None
+        await asyncio.to_thread(_save_watermark, user_id, match_id, start_time)
+
+    async def run(self, job: BackfillJob):
+        clear_deadline()
+        job.status = "running"
+        job.started_at = time.monotonic()
+        try:
+            user = await asyncio.to_thread(_load_user, job.user_id)
+            if not user:
+                raise LookupError("User not found")
+
+            # El backfill es trabajo de fondo: nunca adelanta a las consultas interactivas
+            with riot_priority(Priority.BACKGROUND):
+                account = await riot_service.get_summoner_by_riot_id(user["riot_id"], user["tag_line"], user["region"])
+                if not account:
+                    raise LookupError("Summoner not found")
+                puuid = account["puuid"]
+
+                newest_match_id = None
+                start = 0
+                while start < job.max_matches:
+                    count = min(self.page_size, job.max_matches - start)
+                    match_ids = await riot_service.get_recent_matches(puuid, count, user["region"], start=start)
+                    if not match_ids:
+                        break
+                    job.pages += 1
+                    job.match_ids_seen += len(match_ids)
+                    newest_match_id = newest_match_id or match_ids[0]
+
+                    existing = await asyncio.to_thread(_existing_match_ids, match_ids)
+                    job.already_stored += len(existing)
+                    pending = [match_id for match_id in match_ids if match_id not in existing]
+
+                    rows = await self._download_rows(job, pending, puuid, user["id"], user["region"])
+                    # Una transacción por página, no por fila
+                    job.upserted += await asyncio.to_thread(_write_rows, rows)
+
+                    start += len(match_ids)
+                    if len(match_ids) < count:
+                        break
+
+                if newest_match_id:
+                    await self._advance_watermark(user["id"], newest_match_id, user["region"])
+
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            print(f"Error in match backfill for user {job.user_id}: {e}")
+        finally:
+            job.finished_at = time.monotonic()
+
+    async def sync(self, user_id: int) -> Dict:
+        """Ingest only the matches newer than the user's watermark
+
+        Uses match-v5 `startTime` so each refresh transfers just the new IDs.
+        Without a watermark only the latest page is ingested; older history
+        is the backfill's job.
+        """
+        job = BackfillJob(user_id, self.max_matches)
+        job.status = "running"
+        job.started_at = time.monotonic()
+        try:
+            user = await asyncio.to_thread(_load_user, user_id)
+            if not user:
+                raise LookupError("User not found")
+            watermark = await asyncio.to_thread(_load_watermark, user_id)
+
+            account = await riot_service.get_summoner_by_riot_id(user["riot_id"], user["tag_line"], user["region"])
+            if not account:
+                raise LookupError("Summoner not found")
+            puuid = account["puuid"]
+
+            start_time = watermark["last_match_start_time"] if watermark else None
+            last_match_id = watermark["last_match_id"] if watermark else None
+
+            new_match_ids: List[str] = []
+            start = 0
+            while len(new_match_ids) < job.max_matches:
+                match_ids = await riot_service.get_recent_matches(
+                    puuid, self.page_size, user["region"], start=start, start_time=start_time
+                )
+                if not match_ids:
+                    break
+                job.pages += 1
+                job.match_ids_seen += len(match_ids)
+
+                reached_watermark = last_match_id in match_ids
+                if reached_watermark:
+                    match_ids = match_ids[:match_ids.index(last_match_id)]
+                new_match_ids.extend(match_ids)
+
+                if reached_watermark or start_time is None or len(match_ids) < self.page_size:
+                    break
+                start += len(match_ids)
+
+            existing = await asyncio.to_thread(_existing_match_ids, new_match_ids) if new_match_ids else set()
+            job.already_stored = len(existing)
+            pending = [match_id for match_id in new_match_ids if match_id not in existing]
+
+            rows = await self._download_rows(job, pending, puuid, user["id"], user["region"])
+            job.upserted = await asyncio.to_thread(_write_rows, rows)
+            job.new_match_ids = new_match_ids
+
+            if new_match_ids:
+                await self._advance_watermark(user["id"], new_match_ids[0], user["region"])
+            else:
+                await asyncio.to_thread(_save_watermark, user["id"], None, None)
+            job.status = "completed"
+        finally:
+            job.finished_at = time.monotonic()
+        return job.progress()
+
+    async def close(self):
+        tasks = [job.task for job in self.jobs.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Singleton instance
+match_backfill = MatchBackfillService(
+    concurrency=settings.BACKFILL_CONCURRENCY,
+    page_size=settings.BACKFILL_PAGE_SIZE,
+    max_matches=settings.BACKFILL_MAX_MATCHES
+)
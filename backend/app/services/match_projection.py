@@ -0,0 +1,128 @@
+import json
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+# Campos del participante que leen el análisis de IA y las estadísticas de jungla
+# (los mismos que guarda compact_match.ParticipantStats)
+JUNGLE_STAT_FIELDS: Tuple[str, ...] = (
+    "puuid",
+    "championName",
+    "teamPosition",
+    "win",
+    "kills",
+    "deaths",
+    "assists",
+    "totalMinionsKilled",
+    "neutralMinionsKilled",
+    "visionScore",
+    "dragonKills",
+    "baronKills",
+    "objectivesStolen",
+    "turretKills",
+    "champLevel",
+    "challenges.riftHeraldTakedowns",
+)
+
+# Claves escalares de `info` (no existen dentro de participants ni teams)
+MATCH_INFO_FIELDS: Tuple[str, ...] = (
+    "gameCreation",
+    "gameDuration",
+    "gameEndTimestamp",
+    "gameMode",
+    "gameStartTimestamp",
+    "gameVersion",
+    "endOfGameResult",
+)
+
+_PARTICIPANTS_ARRAY = re.compile(r'"participants"\s*:\s*\[\s*(?=\{)')
+_JSON_SCALAR = r'("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null)'
+_decoder = json.JSONDecoder()
+
+
+def _assign(target: Dict, path: str, value):
+    """Set a dotted path ("challenges.jungleCsBefore10Minutes") in a nested dict"""
+    *parents, leaf = path.split(".")
+    for key in parents:
+        target = target.setdefault(key, {})
+    target[leaf] = value
+
+
+def _pick(source: Dict, fields: Iterable[str]) -> Dict:
+    projected: Dict = {}
+    for path in fields:
+        value = source
+        for key in path.split("."):
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            _assign(projected, path, value)
+    return projected
+
+
+def _result(info: Dict, participant: Optional[Dict]) -> Dict:
+    # Misma forma que un payload match-v5, para que los consumidores no cambien
+    return {"info": {**info, "participants": [participant] if participant is not None else []}}
+
+
+def _info_scalar(text: str, key: str, start: int = 0, end: Optional[int] = None):
+    match = re.compile(rf'"{re.escape(key)}"\s*:\s*{_JSON_SCALAR}').search(text, start, len(text) if end is None else end)
+    return (True, json.loads(match.group(1))) if match else (False, None)
+
+
+def project_match(
+    raw: bytes,
+    puuid: str,
+    fields: Iterable[str] = JUNGLE_STAT_FIELDS,
+    info_fields: Iterable[str] = MATCH_INFO_FIELDS
+) -> Dict:
+    """Extract one participant's `fields` and the scalar `info_fields` from raw match-v5 JSON
+
+    The full object tree is never built: participant objects are decoded one
+    at a time until the requested puuid is found, the rest of the payload
+    (remaining players, teams) is skipped. The result keeps the match-v5
+    shape ({"info": {..., "participants": [player]}}); the list is empty if
+    the puuid did not play in the match. Fields may be dotted paths
+    ("challenges.jungleCsBefore10Minutes").
+    """
+    fields = tuple(fields)
+    text = raw.decode("utf-8")
+    array = _PARTICIPANTS_ARRAY.search(text)
+    found: Optional[Dict] = None
+    array_start = array.start() if array else len(text)
+    resume_at = len(text)
+
+    if array:
+        index = array.end()
+        while index < len(text):
+            participant, index = _decoder.raw_decode(text, index)
+            if participant.get("puuid") == puuid:
+                found = _pick(participant, fields)
+                resume_at = index
+                break
+            while text[index] in " \t\r\n,":
+                index += 1
+            if text[index] == "]":
+                resume_at = index
+                break
+
+    info: Dict = {}
+    for key in info_fields:
+        # Antes del array de participants, o después del participante encontrado
+        present, value = _info_scalar(text, key, end=array_start)
+        if not present:
+            present, value = _info_scalar(text, key, start=resume_at)
+        if present:
+            info[key] = value
+    return _result(info, found)
+
+
+def project_info(raw: bytes, info_fields: Iterable[str]) -> Dict:
+    """Only `info` scalars ({"info": {...}}), found by key without decoding any object"""
+    text = raw.decode("utf-8")
+    info: Dict = {}
+    for key in info_fields:
+        present, value = _info_scalar(text, key)
+        if present:
+            info[key] = value
+    return {"info": info}
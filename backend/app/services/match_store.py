@@ -0,0 +1,137 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+
+
+class MatchStore:
+    """Read-through store for finished match-v5 payloads
+
+    Finished matches are immutable, so the raw JSON bytes are kept forever in
+    a local SQLite file (zlib-compressed) with a byte-bounded in-memory LRU in
+    front of it.
+    """
+
+    def __init__(self, path: str, memory_limit_bytes: int):
+        self.path = path
+        self.memory_limit_bytes = memory_limit_bytes
+        self._lru: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lru_bytes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS match_payloads ("
+                "match_id TEXT PRIMARY KEY, "
+                "payload BLOB NOT NULL, "
+                "raw_size INTEGER NOT NULL, "
+                "stored_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _read(self, match_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload FROM match_payloads WHERE match_id = ?", (match_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _write(self, match_id: str, blob: bytes, raw_size: int):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR IGNORE INTO match_payloads (match_id, payload, raw_size, stored_at) "
+                "VALUES (?, ?, ?, ?)",
+                (match_id, blob, raw_size, time.time())
+            )
+            conn.commit()
+
+    def scan(self, after_rowid: int, limit: int) -> List[Tuple[int, bytes]]:
+        """(rowid, compressed payload) of matches stored after `after_rowid`, oldest first (blocking)"""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT rowid, payload FROM match_payloads WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (after_rowid, limit)
+            ).fetchall()
+
+    def _remember(self, match_id: str, raw: bytes):
+        if len(raw) > self.memory_limit_bytes:
+            return
+        previous = self._lru.pop(match_id, None)
+        if previous is not None:
+            self._lru_bytes -= len(previous)
+        self._lru[match_id] = raw
+        self._lru_bytes += len(raw)
+        while self._lru_bytes > self.memory_limit_bytes:
+            _, evicted = self._lru.popitem(last=False)
+            self._lru_bytes -= len(evicted)
+
+    async def get(self, match_id: str) -> Optional[bytes]:
+        """Return the raw match JSON bytes, or None if the match was never stored"""
+        raw = self._lru.get(match_id)
+        if raw is not None:
+            self._lru.move_to_end(match_id)
+            self.memory_hits += 1
+            return raw
+
+        blob = await asyncio.to_thread(self._read, match_id)
+        if blob is None:
+            self.misses += 1
+            return None
+
+        raw = zlib.decompress(blob)
+        self.disk_hits += 1
+        self._remember(match_id, raw)
+        return raw
+
+    async def put(self, match_id: str, raw: bytes):
+        """Store a finished match payload"""
+        self._remember(match_id, raw)
+        blob = zlib.compress(raw, 6)
+        await asyncio.to_thread(self._write, match_id, blob, len(raw))
+        self.writes += 1
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._lru),
+            "memory_bytes": self._lru_bytes,
+            "memory_limit_bytes": self.memory_limit_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+        }
+
+
+def is_finished_match(match_data: Dict) -> bool:
+    """Only completed games are immutable and safe to store forever"""
+    info = match_data.get("info", {})
+    if "endOfGameResult" in info:
+        return info["endOfGameResult"] == "GameComplete"
+    return bool(info.get("gameEndTimestamp"))
+
+
+# Singleton instance
+match_store = MatchStore(settings.MATCH_STORE_PATH, settings.MATCH_STORE_MEMORY_MB * 1024 * 1024)
@@ -0,0 +1,227 @@
+import asyncio
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+RETRY_STATUSES = {429, 500, 502, 503, 504, 529}
+
+_request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class UpstreamUnavailableError(Exception):
+    """An upstream call was not attempted or gave up (open circuit, exhausted deadline)"""
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit open for {host}, retry in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class DeadlineExceededError(UpstreamUnavailableError):
+    pass
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Bound every upstream call made inside the block to one shared time budget"""
+    if seconds is None:
+        token = _request_deadline.set(None)
+    else:
+        current = _request_deadline.get()
+        new_deadline = time.monotonic() + seconds
+        token = _request_deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def clear_deadline():
+    """Background tasks inherit the context of the request that created them; drop its budget"""
+    _request_deadline.set(None)
+
+
+def remaining_budget() -> Optional[float]:
+    current = _request_deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after consecutive failures, probes once after a cooldown"""
+
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def before_call(self):
+        if self.state == "closed":
+            return
+        elapsed = time.monotonic() - self.opened_at
+        if self.state == "open" and elapsed >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        raise CircuitOpenError(self.host, max(self.reset_timeout - elapsed, 0.0))
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened
+        }
+
+
+class UpstreamResilience:
+    """Bounded retries with jittered backoff, per-host circuit breakers and deadline budgets"""
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int,
+        backoff_base: float,
+        backoff_max: float,
+        failure_threshold: int,
+        reset_timeout: float
+    ):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+        # Contadores
+        self.calls = 0
+        self.retries = 0
+        self.rejected_open = 0
+        self.deadline_exceeded = 0
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    async def execute(
+        self,
+        host: str,
+        send: Callable[[Optional[float]], Awaitable[httpx.Response]],
+        retry_after_handled: bool = False
+    ) -> httpx.Response:
+        """Run `send(budget)` with retries; `budget` is the seconds left for this request, if bounded
+
+        With `retry_after_handled` the caller already waits out Retry-After
+        (the Riot scheduler does), so 429s are retried without sleeping here.
+        """
+        self.calls += 1
+        breaker = self.breaker(host)
+        error: Optional[Exception] = None
+        response: Optional[httpx.Response] = None
+
+        for attempt in range(1, self.max_attempts + 1):
+            budget = remaining_budget()
+            if budget is not None and budget <= 0:
+                self.deadline_exceeded += 1
+                raise DeadlineExceededError(f"Deadline exceeded calling {host}")
+            try:
+                breaker.before_call()
+            except CircuitOpenError:
+                if attempt > 1:
+                    # El circuito se abrió durante nuestros propios reintentos
+                    break
+                self.rejected_open += 1
+                raise
+
+            error = None
+            response = None
+            try:
+                response = await send(budget)
+            except DeadlineExceededError:
+                self.deadline_exceeded += 1
+                raise
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                breaker.record_failure()
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    # Un 429 es presión de cuota, no un host caído
+                    breaker.record_success()
+
+            if attempt == self.max_attempts:
+                break
+
+            delay = self._backoff(attempt)
+            if response is not None and response.status_code == 429:
+                retry_after = parse_retry_after(response)
+                if retry_after_handled:
+                    delay = 0.0
+                elif retry_after is not None:
+                    delay = retry_after
+
+            budget = remaining_budget()
+            if budget is not None and delay >= budget:
+                break
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+        if response is not None:
+            return response
+        raise error
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "rejected_open_circuit": self.rejected_open,
+            "deadline_exceeded": self.deadline_exceeded,
+            "circuits": {host: breaker.stats() for host, breaker in self._breakers.items()}
+        }
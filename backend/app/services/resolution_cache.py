@@ -0,0 +1,96 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class ResolutionCache:
+    """TTL cache with negative caching and single-flight loading
+
+    A loader returning None (a 404 upstream) is cached for `negative_ttl`.
+    Loader exceptions are never cached. Concurrent lookups of the same key
+    share one in-flight load, so N callers cause exactly one upstream call.
+    """
+
+    def __init__(self, name: str, ttl: float, negative_ttl: float, max_entries: int = 10000):
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        # Contadores
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _lookup(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Optional[Any]]]):
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+            # Invalidada mientras cargaba: el valor puede ser viejo, no se guarda
+            if self._inflight.get(key) is task:
+                self._store(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Return the cached value for `key` or load it once for every concurrent caller"""
+        found, value = self._lookup(key)
+        if found:
+            if value is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            # Una tarea aparte: si el primer cliente se desconecta, los demás siguen esperando el resultado
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable):
+        """Drop the cached value; a load already in flight is not stored either"""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "ttl_seconds": self.ttl,
+            "negative_ttl_seconds": self.negative_ttl,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced
+        }
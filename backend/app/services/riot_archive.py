@@ -0,0 +1,207 @@
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import httpx
+
+# El cuerpo se guarda ya decodificado, así que estos headers dejan de ser válidos
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+_RATE_LIMIT_HEADERS = {
+    "x-app-rate-limit", "x-app-rate-limit-count",
+    "x-method-rate-limit", "x-method-rate-limit-count"
+}
+
+RIOT_HTTP_MODES = ("live", "record", "replay")
+
+
+def archive_key(method: str, url: httpx.URL) -> str:
+    """Stable key for a request: method, host, path and sorted query (never the API key header)"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(url.params.multi_items()))
+    return f"{method} {url.host}{url.path}?{query}"
+
+
+class _RecordedResponse:
+    __slots__ = ("status", "headers", "body", "latency")
+
+    def __init__(self, status: int, headers: List[Tuple[str, str]], body: bytes, latency: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.latency = latency
+
+
+class RiotArchive:
+    """On-disk archive of upstream Riot responses (status, headers, body, latency)
+
+    Written by RecordingTransport and served back by ReplayTransport, so the
+    API can be exercised offline without spending the Riot key's rate budget.
+    Several recordings of the same request are replayed round-robin.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, List[_RecordedResponse]]] = None
+        self._cursor: Dict[str, int] = {}
+        self._load_lock = asyncio.Lock()
+
+        # Contadores
+        self.recorded = 0
+        self.replayed = 0
+        self.replay_misses = 0
+        self.injected_429 = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS riot_responses ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "request_key TEXT NOT NULL, "
+                "status INTEGER NOT NULL, "
+                "headers TEXT NOT NULL, "
+                "body BLOB NOT NULL, "
+                "latency REAL NOT NULL, "
+                "recorded_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_riot_responses_key ON riot_responses (request_key)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _write(self, key: str, status: int, headers: str, body: bytes, latency: float):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO riot_responses (request_key, status, headers, body, latency, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status, headers, body, latency, time.time())
+            )
+            conn.commit()
+
+    def _read_all(self) -> Dict[str, List[_RecordedResponse]]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT request_key, status, headers, body, latency FROM riot_responses ORDER BY id"
+            ).fetchall()
+        index: Dict[str, List[_RecordedResponse]] = {}
+        for key, status, headers, body, latency in rows:
+            index.setdefault(key, []).append(
+                _RecordedResponse(status, [tuple(h) for h in json.loads(headers)], body, latency)
+            )
+        return index
+
+    async def record(self, key: str, status: int, headers: List[Tuple[str, str]], body: bytes, latency: float):
+        await asyncio.to_thread(self._write, key, status, json.dumps(headers), body, latency)
+        self.recorded += 1
+
+    async def lookup(self, key: str) -> Optional[_RecordedResponse]:
+        """Next recording for `key` (round-robin), loading the whole archive on first use"""
+        if self._index is None:
+            async with self._load_lock:
+                if self._index is None:
+                    self._index = await asyncio.to_thread(self._read_all)
+        recordings = self._index.get(key)
+        if not recordings:
+            return None
+        position = self._cursor.get(key, 0)
+        self._cursor[key] = position + 1
+        return recordings[position % len(recordings)]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "replay_misses": self.replay_misses,
+            "injected_429": self.injected_429,
+            "archived_requests": len(self._index) if self._index is not None else None
+        }
+
+
+def _replayable_headers(headers: httpx.Headers) -> List[Tuple[str, str]]:
+    return [(k, v) for k, v in headers.multi_items() if k.lower() not in _DROPPED_HEADERS]
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Pass requests through to the real transport and archive every response"""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, archive: RiotArchive):
+        self.inner = inner
+        self.archive = archive
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self.inner.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        latency = time.monotonic() - started
+
+        headers = _replayable_headers(response.headers)
+        await self.archive.record(archive_key(request.method, request.url), response.status_code, headers, body, latency)
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve archived responses with optional latency scaling and injected 429s
+
+    Recorded rate-limit headers are dropped so the scheduler only applies the
+    configured RIOT_APP_RATE_LIMIT; raise it to benchmark at full speed.
+    Requests that were never recorded get a 404 marked with X-Replay-Miss.
+    """
+
+    def __init__(
+        self,
+        archive: RiotArchive,
+        latency_scale: float = 1.0,
+        inject_429_rate: float = 0.0,
+        retry_after: float = 1.0
+    ):
+        self.archive = archive
+        self.latency_scale = latency_scale
+        self.inject_429_rate = inject_429_rate
+        self.retry_after = retry_after
+
+    async def _delay(self, request: httpx.Request, latency: float):
+        if latency <= 0:
+            return
+        read_timeout = request.extensions.get("timeout", {}).get("read")
+        if read_timeout is not None and latency > read_timeout:
+            await asyncio.sleep(read_timeout)
+            raise httpx.ReadTimeout("Replayed latency exceeded the read timeout", request=request)
+        await asyncio.sleep(latency)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.inject_429_rate and random.random() < self.inject_429_rate:
+            self.archive.injected_429 += 1
+            return httpx.Response(
+                429,
+                headers={"Retry-After": str(self.retry_after), "X-Rate-Limit-Type": "method"},
+                request=request
+            )
+
+        recording = await self.archive.lookup(archive_key(request.method, request.url))
+        if recording is None:
+            self.archive.replay_misses += 1
+            return httpx.Response(404, headers={"X-Replay-Miss": "1"}, request=request)
+
+        await self._delay(request, recording.latency * self.latency_scale)
+        self.archive.replayed += 1
+        headers = [(k, v) for k, v in recording.headers if k.lower() not in _RATE_LIMIT_HEADERS]
+        return httpx.Response(recording.status, headers=headers, content=recording.body, request=request)
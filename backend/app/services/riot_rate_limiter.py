@@ -0,0 +1,295 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+
+class Priority(IntEnum):
+    """Scheduling lanes, lower value is served first"""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+_current_priority: ContextVar[Priority] = ContextVar("riot_priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def riot_priority(priority: Priority):
+    """Run every Riot call made inside the block (and its child tasks) in the given lane"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def parse_rate_limits(header: Optional[str]) -> List[Tuple[int, int]]:
+    """Parse Riot's "20:1,100:120" format into (value, window_seconds) pairs"""
+    if not header:
+        return []
+    pairs = []
+    for item in header.split(","):
+        try:
+            value, window = item.strip().split(":")
+            pairs.append((int(value), int(window)))
+        except ValueError:
+            continue
+    return pairs
+
+
+class TokenBucket:
+    """Token bucket for one Riot limit: `limit` requests every `window` seconds"""
+
+    def __init__(self, limit: int, window: int):
+        self.limit = limit
+        self.window = window
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(float(self.limit), self.tokens + elapsed * self.limit / self.window)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.window / self.limit
+
+    def consume(self):
+        self.tokens -= 1
+
+    def sync(self, count: int, now: float):
+        """Reconcile with the count Riot reports for the current window"""
+        self._refill(now)
+        self.tokens = min(self.tokens, float(self.limit - count))
+
+
+class RateLimitGroup:
+    """All buckets of one application or method limit plus any Retry-After block"""
+
+    def __init__(self, limits: Optional[List[Tuple[int, int]]] = None):
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.blocked_until = 0.0
+        if limits:
+            self.update_limits(limits)
+
+    def update_limits(self, limits: List[Tuple[int, int]]):
+        for value, window in limits:
+            bucket = self.buckets.get(window)
+            if bucket is None:
+                self.buckets[window] = TokenBucket(value, window)
+            elif bucket.limit != value:
+                bucket.limit = value
+
+    def sync_counts(self, counts: List[Tuple[int, int]], now: float):
+        for count, window in counts:
+            bucket = self.buckets.get(window)
+            if bucket is not None:
+                bucket.sync(count, now)
+
+    def wait_time(self, now: float) -> float:
+        wait = max(self.blocked_until - now, 0.0)
+        for bucket in self.buckets.values():
+            wait = max(wait, bucket.wait_time(now))
+        return wait
+
+    def consume(self):
+        for bucket in self.buckets.values():
+            bucket.consume()
+
+
+class _HostLane:
+    """Pending requests for one routing host (la1, americas, ...)"""
+
+    def __init__(self, app_limits: List[Tuple[int, int]]):
+        self.app = RateLimitGroup(app_limits)
+        self.methods: Dict[str, RateLimitGroup] = {}
+        self.queue: List[Tuple[int, int, str, asyncio.Future]] = []
+
+    def method(self, method: str) -> RateLimitGroup:
+        group = self.methods.get(method)
+        if group is None:
+            group = self.methods[method] = RateLimitGroup()
+        return group
+
+    def dispatch(self, now: float) -> Optional[float]:
+        """Grant every request that fits now; return the time until the next one might"""
+        next_wait = None
+        waiting = []
+        blocked_methods = set()
+
+        for entry in sorted(self.queue):
+            priority, seq, method, future = entry
+            if future.done():
+                continue
+
+            app_wait = self.app.wait_time(now)
+            if app_wait > 0:
+                # Nadie puede salir antes que el de mayor prioridad
+                waiting.append(entry)
+                next_wait = app_wait if next_wait is None else min(next_wait, app_wait)
+                continue
+
+            group = self.method(method)
+            method_wait = group.wait_time(now)
+            if method in blocked_methods or method_wait > 0:
+                blocked_methods.add(method)
+                waiting.append(entry)
+                if method_wait > 0:
+                    next_wait = method_wait if next_wait is None else min(next_wait, method_wait)
+                continue
+
+            self.app.consume()
+            group.consume()
+            future.set_result(None)
+
+        heapq.heapify(waiting)
+        self.queue = waiting
+        return next_wait
+
+
+class RiotRequestScheduler:
+    """Central async scheduler that keeps every Riot call inside app and method limits"""
+
+    def __init__(self, default_app_limits: str, wait_samples: int = 1000):
+        self.default_app_limits = parse_rate_limits(default_app_limits)
+        self._lanes: Dict[str, _HostLane] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        # Métricas
+        self.granted: Dict[str, int] = {p.name: 0 for p in Priority}
+        self.total_wait: Dict[str, float] = {p.name: 0.0 for p in Priority}
+        self.max_wait: Dict[str, float] = {p.name: 0.0 for p in Priority}
+        self.throttled_responses = 0
+        self._recent_waits: Deque[float] = deque(maxlen=wait_samples)
+
+    def _lane(self, host: str) -> _HostLane:
+        lane = self._lanes.get(host)
+        if lane is None:
+            lane = self._lanes[host] = _HostLane(self.default_app_limits)
+        return lane
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            next_wait = None
+            for lane in self._lanes.values():
+                wait = lane.dispatch(now)
+                if wait is not None:
+                    next_wait = wait if next_wait is None else min(next_wait, wait)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=next_wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def acquire(self, host: str, method: str, priority: Optional[Priority] = None):
+        """Wait until a request to `method` on `host` fits in the rate limits"""
+        if priority is None:
+            priority = _current_priority.get()
+        self._ensure_dispatcher()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._lane(host).queue, (int(priority), next(self._seq), method, future))
+        self._wakeup.set()
+
+        started = time.monotonic()
+        await future
+        waited = time.monotonic() - started
+
+        self.granted[priority.name] += 1
+        self.total_wait[priority.name] += waited
+        self.max_wait[priority.name] = max(self.max_wait[priority.name], waited)
+        self._recent_waits.append(waited)
+
+    def on_response(self, host: str, method: str, response: httpx.Response):
+        """Learn limits and counts from Riot's headers and honor Retry-After"""
+        lane = self._lane(host)
+        group = lane.method(method)
+        now = time.monotonic()
+        headers = response.headers
+
+        app_limits = parse_rate_limits(headers.get("X-App-Rate-Limit"))
+        if app_limits:
+            lane.app.update_limits(app_limits)
+            lane.app.sync_counts(parse_rate_limits(headers.get("X-App-Rate-Limit-Count")), now)
+
+        method_limits = parse_rate_limits(headers.get("X-Method-Rate-Limit"))
+        if method_limits:
+            group.update_limits(method_limits)
+            group.sync_counts(parse_rate_limits(headers.get("X-Method-Rate-Limit-Count")), now)
+
+        if response.status_code == 429:
+            self.throttled_responses += 1
+            try:
+                retry_after = float(headers.get("Retry-After", "1"))
+            except ValueError:
+                retry_after = 1.0
+            blocked = lane.app if headers.get("X-Rate-Limit-Type") == "application" else group
+            blocked.blocked_until = max(blocked.blocked_until, now + retry_after)
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def close(self):
+        """Stop the dispatcher and fail anything still queued"""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for lane in self._lanes.values():
+            for _, _, _, future in lane.queue:
+                if not future.done():
+                    future.cancel()
+            lane.queue = []
+
+    def stats(self) -> Dict:
+        """Queue depth per host and lane, and wait times per lane"""
+        queues = {}
+        for host, lane in self._lanes.items():
+            depth = {p.name: 0 for p in Priority}
+            for priority, _, _, future in lane.queue:
+                if not future.done():
+                    depth[Priority(priority).name] += 1
+            queues[host] = {
+                "queued": depth,
+                "app_limits": {w: b.limit for w, b in lane.app.buckets.items()},
+                "method_limits": {
+                    m: {w: b.limit for w, b in g.buckets.items()} for m, g in lane.methods.items()
+                }
+            }
+
+        waits = sorted(self._recent_waits)
+        return {
+            "hosts": queues,
+            "granted": dict(self.granted),
+            "avg_wait_seconds": {
+                name: round(self.total_wait[name] / count, 4) if count else 0.0
+                for name, count in self.granted.items()
+            },
+            "max_wait_seconds": {name: round(value, 4) for name, value in self.max_wait.items()},
+            "p95_wait_seconds": round(waits[int(len(waits) * 0.95) - 1], 4) if waits else 0.0,
+            "throttled_responses": self.throttled_responses
+        }
@@ -1,177 +1,376 @@
+import asyncio
+import json
 import httpx
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Iterable, Optional, List
 from app.core.config import settings
+from app.core.regions import resolve_region
+from app.services.http_pool import HostPoolGroup
+from app.services.riot_rate_limiter import RiotRequestScheduler
+from app.services.match_store import match_store, is_finished_match
+from app.services.match_projection import JUNGLE_STAT_FIELDS, project_info, project_match
+from app.services.compact_match import (
+    CompactMatch, CompactMatchCache, decode_compact_match, project_compact_match
+)
+from app.services.cpu_pool import cpu_pool
+from app.services.resolution_cache import ResolutionCache
+from app.services.riot_archive import RIOT_HTTP_MODES, RecordingTransport, ReplayTransport, RiotArchive
+from app.services.resilience import DeadlineExceededError, UpstreamResilience, UpstreamUnavailableError
 
 
 class RiotAPIService:
     def __init__(self):
         self.api_key = settings.RIOT_API_KEY
-        self.region_config = {
-            "las": {
-                "platform": "la1",
-                "regional": "americas"
-            }
-        }
         self.headers = {
             "X-Riot-Token": self.api_key
         }
+        self.mode = settings.RIOT_HTTP_MODE.lower()
+        if self.mode not in RIOT_HTTP_MODES:
+            raise ValueError(f"RIOT_HTTP_MODE must be one of {RIOT_HTTP_MODES}, got '{settings.RIOT_HTTP_MODE}'")
+        self.archive = RiotArchive(settings.RIOT_ARCHIVE_PATH) if self.mode != "live" else None
+        # Un pool (y un carril del scheduler) por host de routing: la1, americas, euw1, ...
+        self.http = HostPoolGroup(
+            "riot",
+            max_connections=settings.RIOT_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.RIOT_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.RIOT_HTTP_KEEPALIVE_EXPIRY,
+            timeout=settings.RIOT_HTTP_TIMEOUT,
+            http2=settings.HTTP2_ENABLED,
+            headers=self.headers,
+            wrap_transport=self._wrap_transport if self.archive is not None else None
+        )
+        self.scheduler = RiotRequestScheduler(settings.RIOT_APP_RATE_LIMIT)
+        self.resilience = UpstreamResilience(
+            "riot",
+            max_attempts=settings.UPSTREAM_MAX_ATTEMPTS,
+            backoff_base=settings.UPSTREAM_BACKOFF_BASE,
+            backoff_max=settings.UPSTREAM_BACKOFF_MAX,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_SECONDS
+        )
+        self.match_store = match_store
+        self.compact_matches = CompactMatchCache(settings.COMPACT_MATCH_CACHE_SIZE)
+        # Riot ID -> cuenta (PUUID) y PUUID -> summoner casi nunca cambian
+        self.account_cache = ResolutionCache(
+            "account-by-riot-id", settings.RIOT_ID_CACHE_TTL, settings.RIOT_NEGATIVE_CACHE_TTL
+        )
+        self.summoner_cache = ResolutionCache(
+            "summoner-by-puuid", settings.SUMMONER_CACHE_TTL, settings.RIOT_NEGATIVE_CACHE_TTL
+        )
+
+    def _wrap_transport(self, real_transport: Callable[[], httpx.AsyncBaseTransport]) -> httpx.AsyncBaseTransport:
+        if self.mode == "record":
+            return RecordingTransport(real_transport(), self.archive)
+        return ReplayTransport(
+            self.archive,
+            latency_scale=settings.RIOT_REPLAY_LATENCY_SCALE,
+            inject_429_rate=settings.RIOT_REPLAY_429_RATE,
+            retry_after=settings.RIOT_REPLAY_RETRY_AFTER
+        )
+
+    async def open(self):
+        """Open the Riot connection pools for the default region"""
+        route = resolve_region(settings.DEFAULT_USER_REGION)
+        await self.http.open([
+            httpx.URL(url).host for url in {route.platform_url, route.regional_url, route.account_url}
+        ])
+
+    async def close(self):
+        """Close every Riot connection pool"""
+        await self.scheduler.close()
+        await self.http.close()
+        self.match_store.close()
+        if self.archive is not None:
+            self.archive.close()
+
+    async def _get(self, url: str, method: str, params: Optional[Dict] = None) -> httpx.Response:
+        """Send a GET through the resilience layer, the rate-limit scheduler and the shared pool"""
+        host = httpx.URL(url).host
+
+        async def send(budget: Optional[float]) -> httpx.Response:
+            try:
+                await asyncio.wait_for(self.scheduler.acquire(host, method), timeout=budget)
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError(f"Deadline exceeded waiting for Riot rate limit on {host}")
+            timeout = settings.RIOT_HTTP_TIMEOUT if budget is None else min(settings.RIOT_HTTP_TIMEOUT, budget)
+            response = await self.http.get(url, params=params, timeout=timeout)
+            self.scheduler.on_response(host, method, response)
+            return response
+
+        # El scheduler ya espera el Retry-After antes del siguiente intento
+        return await self.resilience.execute(host, send, retry_after_handled=True)
 
     def get_platform_url(self, region: str = "las") -> str:
-        platform = self.region_config.get(region, {}).get("platform", "la1")
-        return f"https://{platform}.api.riotgames.com"
+        return resolve_region(region).platform_url
 
     def get_regional_url(self, region: str = "las") -> str:
-        regional = self.region_config.get(region, {}).get("regional", "americas")
-        return f"https://{regional}.api.riotgames.com"
+        return resolve_region(region).regional_url
+
+    def get_account_url(self, region: str = "las") -> str:
+        return resolve_region(region).account_url
 
     async def get_summoner_by_riot_id(self, riot_id: str, tag_line: str, region: str = "las") -> Optional[Dict]:
         """Get summoner information by Riot ID for LAS region"""
-        url = f"{self.get_regional_url(region)}/riot/account/v1/accounts/by-riot-id/{riot_id}/{tag_line}"
+        # Los Riot IDs no distinguen mayúsculas
+        key = (resolve_region(region).account, riot_id.strip().lower(), tag_line.strip().lower())
+        return await self.account_cache.get_or_load(
+            key, lambda: self._fetch_account_by_riot_id(riot_id, tag_line, region)
+        )
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                print(f"Error getting summoner: {e}")
-                if e.response.status_code == 404:
-                    return None
-                raise e
+    async def _fetch_account_by_riot_id(self, riot_id: str, tag_line: str, region: str) -> Optional[Dict]:
+        url = f"{self.get_account_url(region)}/riot/account/v1/accounts/by-riot-id/{riot_id}/{tag_line}"
+
+        try:
+            response = await self._get(url, "account-v1.by-riot-id")
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            print(f"Error getting summoner: {e}")
+            if e.response.status_code == 404:
+                return None
+            raise e
 
     async def get_summoner_by_puuid(self, puuid: str, region: str = "las") -> Optional[Dict]:
         """Get summoner details by PUUID for LAS region"""
         # Ensure PUUID is properly formatted (no extra characters)
         clean_puuid = puuid.strip()
+        key = (resolve_region(region).platform, clean_puuid)
+
+        try:
+            return await self.summoner_cache.get_or_load(
+                key, lambda: self._fetch_summoner_by_puuid(clean_puuid, region)
+            )
+        except UpstreamUnavailableError:
+            raise
+        except httpx.HTTPStatusError as e:
+            print(f"❌ HTTP Error getting summoner by PUUID: {e}")
+            print(f"📋 Response text: {e.response.text if e.response else 'No response'}")
+            return None
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+            return None
+
+    async def _fetch_summoner_by_puuid(self, clean_puuid: str, region: str) -> Optional[Dict]:
+        """Returns None only for a 404 (cached as negative); other errors raise"""
         url = f"{self.get_platform_url(region)}/lol/summoner/v4/summoners/by-puuid/{clean_puuid}"
 
         print(f"🔍 Requesting summoner data from: {url}")
         print(f"🆔 PUUID length: {len(clean_puuid)}")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                print(f"📊 Response status: {response.status_code}")
-
-                if response.status_code == 404:
-                    print("⚠️ 404 Error - This might be due to:")
-                    print("   1. PUUID format issue")
-                    print("   2. Account not found on LAS platform")
-                    print("   3. API rate limiting")
-                    print(f"   4. PUUID: {clean_puuid}")
-                    return None
-
-                response.raise_for_status()
-                data = response.json()
-                print(f"✅ Summoner data retrieved successfully")
-                return data
-
-            except httpx.HTTPStatusError as e:
-                print(f"❌ HTTP Error getting summoner by PUUID: {e}")
-                print(f"📋 Response text: {e.response.text if e.response else 'No response'}")
-                return None
-            except Exception as e:
-                print(f"❌ Unexpected error: {e}")
-                return None
+        response = await self._get(url, "summoner-v4.by-puuid")
+        print(f"📊 Response status: {response.status_code}")
+
+        if response.status_code == 404:
+            print("⚠️ 404 Error - This might be due to:")
+            print("   1. PUUID format issue")
+            print("   2. Account not found on LAS platform")
+            print("   3. API rate limiting")
+            print(f"   4. PUUID: {clean_puuid}")
+            return None
+
+        response.raise_for_status()
+        data = response.json()
+        print(f"✅ Summoner data retrieved successfully")
+        return data
 
     async def get_rank_info(self, summoner_id: str, region: str = "las") -> Optional[List[Dict]]:
         """Get ranked information for a summoner in LAS"""
         url = f"{self.get_platform_url(region)}/lol/league/v4/entries/by-summoner/{summoner_id}"
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                rank_data = response.json()
-                print(f"✅ Rank data retrieved: {rank_data}")  # Debug
-                return rank_data
-            except httpx.HTTPStatusError as e:
-                print(f"Error getting rank info: {e}")
-                return None
+        try:
+            response = await self._get(url, "league-v4.entries-by-summoner")
+            response.raise_for_status()
+            rank_data = response.json()
+            print(f"✅ Rank data retrieved: {rank_data}")  # Debug
+            return rank_data
+        except httpx.HTTPStatusError as e:
+            print(f"Error getting rank info: {e}")
+            return None
 
-    async def get_recent_matches(self, puuid: str, count: int = 20, region: str = "las") -> Optional[List[str]]:
-        """Get recent match IDs for a player in LAS"""
+    async def get_recent_matches(
+            self,
+            puuid: str,
+            count: int = 20,
+            region: str = "las",
+            start: int = 0,
+            start_time: Optional[int] = None
+    ) -> Optional[List[str]]:
+        """Get recent match IDs for a player in LAS (newest first, paged with `start`)
+
+        `start_time` (epoch seconds) restricts the list to games started at or
+        after it, so incremental syncs only transfer new IDs.
+        """
         url = f"{self.get_regional_url(region)}/lol/match/v5/matches/by-puuid/{puuid}/ids"
         params = {
+            "start": start,
             "count": count,
             "queue": 420  # Solo ranked solo/duo
         }
+        if start_time is not None:
+            params["startTime"] = start_time
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers, params=params)
-                response.raise_for_status()
-                matches = response.json()
-                print(f"✅ Found {len(matches)} recent matches")  # Debug
-                return matches
-            except httpx.HTTPStatusError as e:
-                print(f"Error getting recent matches: {e}")
-                return None
+        try:
+            response = await self._get(url, "match-v5.ids-by-puuid", params=params)
+            response.raise_for_status()
+            matches = response.json()
+            print(f"✅ Found {len(matches)} recent matches")  # Debug
+            return matches
+        except httpx.HTTPStatusError as e:
+            print(f"Error getting recent matches: {e}")
+            return None
+
+    async def get_match_raw(self, match_id: str, region: str = "las") -> Optional[bytes]:
+        """Raw match-v5 JSON bytes
+
+        Finished matches are immutable: after the first download they are
+        served from the local match store without touching the network.
+        """
+        raw = await self.match_store.get(match_id)
+        if raw is not None:
+            return raw
+
+        url = f"{self.get_regional_url(region)}/lol/match/v5/matches/{match_id}"
+
+        try:
+            response = await self._get(url, "match-v5.match")
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            print(f"Error getting match details: {e}")
+            return None
+
+        raw = response.content
+        if is_finished_match(project_info(raw, ("endOfGameResult", "gameEndTimestamp"))):
+            await self.match_store.put(match_id, raw)
+        return raw
 
     async def get_match_details(self, match_id: str, region: str = "las") -> Optional[Dict]:
         """Get detailed match information for LAS"""
-        url = f"{self.get_regional_url(region)}/lol/match/v5/matches/{match_id}"
+        raw = await self.get_match_raw(match_id, region)
+        if raw is None:
+            return None
+        return json.loads(raw)
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                print(f"Error getting match details: {e}")
-                return None
+    async def get_match_projection(
+            self,
+            match_id: str,
+            puuid: str,
+            fields: Iterable[str] = JUNGLE_STAT_FIELDS,
+            region: str = "las"
+    ) -> Optional[Dict]:
+        """One participant's `fields` plus the match info scalars, without decoding the whole match"""
+        raw = await self.get_match_raw(match_id, region)
+        if raw is None:
+            return None
+        return await cpu_pool.run(project_match, raw, puuid, tuple(fields))
+
+    async def get_compact_match(self, match_id: str, region: str = "las") -> Optional[CompactMatch]:
+        """Compact view of a match; finished matches stay in an in-memory LRU"""
+        match = self.compact_matches.get(match_id)
+        if match is not None:
+            return match
+
+        raw = await self.get_match_raw(match_id, region)
+        if raw is None:
+            return None
+        match = (await cpu_pool.run(decode_compact_match, raw)).interned()
+        if match.finished:
+            self.compact_matches.put(match)
+        return match
+
+    async def get_jungle_stats(self, match_id: str, puuid: str, region: str = "las") -> Optional[CompactMatch]:
+        """One player's jungle stats: from the compact cache, else projected from the stored match"""
+        match = self.compact_matches.get(match_id)
+        if match is not None:
+            return match.only(puuid)
+
+        raw = await self.match_store.get(match_id)
+        if raw is not None:
+            # Proyectar un participante cuesta menos que mandar el payload al pool y volver
+            return project_compact_match(match_id, raw, puuid)
+
+        # Primera vez que se ve la partida: se descarga y queda en la caché compacta
+        match = await self.get_compact_match(match_id, region)
+        return match.only(puuid) if match else None
 
     async def get_current_game(self, summoner_id: str, region: str = "las") -> Optional[Dict]:
         """Get current game information for active game tracking"""
         url = f"{self.get_platform_url(region)}/lol/spectator/v4/active-games/by-summoner/{summoner_id}"
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    return None
-                print(f"Error getting current game: {e}")
+        try:
+            response = await self._get(url, "spectator-v4.active-games")
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
                 return None
+            print(f"Error getting current game: {e}")
+            return None
 
     async def get_complete_summoner_info(self, riot_id: str, tag_line: str, region: str = "las") -> Optional[Dict]:
-        """Get complete summoner information including rank"""
+        """Get complete summoner information including rank
+
+        Only the account lookup is required. Summoner -> rank and the recent
+        matches list run concurrently afterwards, and a failure in either
+        branch degrades that field (listed in "errors") instead of the result.
+        """
+        # 1. Get account info (PUUID); everything else depends on it
         try:
-            # 1. Get account info (PUUID)
             account_data = await self.get_summoner_by_riot_id(riot_id, tag_line, region)
-            if not account_data:
-                return None
+        except UpstreamUnavailableError:
+            # Circuito abierto o deadline agotado: no es un "no encontrado"
+            raise
+        except Exception as e:
+            print(f"Error getting complete summoner info: {e}")
+            return None
+        if not account_data:
+            return None
 
-            puuid = account_data.get("puuid")
+        puuid = account_data.get("puuid")
+        errors: Dict[str, str] = {}
 
-            # 2. Get summoner details (ID, level, etc.)
+        async def summoner_and_rank():
+            # 2. Summoner details (ID, level, etc.) -> 3. rank, que necesita el summoner ID
             summoner_data = await self.get_summoner_by_puuid(puuid, region)
             if not summoner_data:
-                return None
-
-            summoner_id = summoner_data.get("id")
-
-            # 3. Get rank information
-            rank_data = await self.get_rank_info(summoner_id, region)
+                errors["summoner"] = "unavailable"
+                errors["rank"] = "skipped: summoner unavailable"
+                return None, None
+            try:
+                rank_data = await self.get_rank_info(summoner_data.get("id"), region)
+            except Exception as e:
+                errors["rank"] = str(e)
+                return summoner_data, None
+            if rank_data is None:
+                errors["rank"] = "unavailable"
+            return summoner_data, rank_data
 
-            # 4. Get recent matches
-            recent_matches = await self.get_recent_matches(puuid, 20, region)
+        # 4. Recent matches only need the PUUID, so they run alongside 2-3
+        summoner_branch, recent_matches = await asyncio.gather(
+            summoner_and_rank(),
+            self.get_recent_matches(puuid, 20, region),
+            return_exceptions=True
+        )
 
-            # 5. Combine all data
-            complete_info = {
-                "account": account_data,
-                "summoner": summoner_data,
-                "rank": rank_data,
-                "recent_matches": recent_matches or []
-            }
+        if isinstance(summoner_branch, BaseException):
+            errors["summoner"] = str(summoner_branch)
+            errors["rank"] = "skipped: summoner unavailable"
+            summoner_branch = (None, None)
+        summoner_data, rank_data = summoner_branch
 
-            return complete_info
+        if isinstance(recent_matches, BaseException):
+            errors["recent_matches"] = str(recent_matches)
+            recent_matches = None
+        elif recent_matches is None:
+            errors["recent_matches"] = "unavailable"
 
-        except Exception as e:
-            print(f"Error getting complete summoner info: {e}")
-            return None
+        # 5. Combine all data
+        return {
+            "account": account_data,
+            "summoner": summoner_data,
+            "rank": rank_data,
+            "recent_matches": recent_matches or [],
+            "degraded": bool(errors),
+            "errors": errors
+        }
 
 
 # Singleton instance
@@ -0,0 +1,215 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.models.game_session import GameSession
+from app.models.session_stats import ALL_CHAMPIONS, STAT_SUM_COLUMNS, UserStatDaily, UserStatTotal
+
+# Columnas de game_sessions que alimentan los agregados
+SESSION_STAT_FIELDS: Tuple[str, ...] = (
+    "user_id", "champion_name", "won", "kills", "deaths", "assists", "cs_score",
+    "jungle_cs", "vision_score", "game_duration", "objectives_secured", "started_at",
+)
+OBJECTIVE_COLUMNS = ("dragons", "barons", "heralds", "objectives_stolen", "turrets")
+MAX_WINDOW_DAYS = 365
+REBUILD_BATCH_SIZE = 1000
+UPSERT_BATCH_SIZE = 500
+
+Executor = Union[Session, Connection]
+Sums = Dict[str, int]
+
+
+def _utc_day(started_at: datetime) -> date:
+    # SQLite devuelve datetimes sin zona, guardados en UTC
+    if started_at.tzinfo is not None:
+        started_at = started_at.astimezone(timezone.utc)
+    return started_at.date()
+
+
+def contribution(row: Mapping) -> Sums:
+    """What one game session adds to every aggregate row it belongs to"""
+    objectives = row.get("objectives_secured") or {}
+    sums = {
+        "games": 1,
+        "wins": 1 if row.get("won") else 0,
+        "kills": row.get("kills") or 0,
+        "deaths": row.get("deaths") or 0,
+        "assists": row.get("assists") or 0,
+        "cs": row.get("cs_score") or 0,
+        "jungle_cs": row.get("jungle_cs") or 0,
+        "vision_score": row.get("vision_score") or 0,
+        "duration_seconds": row.get("game_duration") or 0,
+    }
+    for column in OBJECTIVE_COLUMNS:
+        value = objectives.get(column) if isinstance(objectives, dict) else None
+        sums[column] = int(value) if isinstance(value, (int, float)) else 0
+    return sums
+
+
+def _accumulate(rows: Iterable[Mapping], sign: int, totals: Dict, daily: Dict):
+    for row in rows:
+        sums = contribution(row)
+        day = _utc_day(row["started_at"])
+        for champion in (row["champion_name"], ALL_CHAMPIONS):
+            total_key = (row["user_id"], champion)
+            daily_key = (row["user_id"], champion, day)
+            for column, value in sums.items():
+                totals[total_key][column] += sign * value
+                daily[daily_key][column] += sign * value
+
+
+def _dialect_insert(db: Executor):
+    bind = db.get_bind() if isinstance(db, Session) else db
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _add_sums(db: Executor, model, key_columns: Tuple[str, ...], deltas: Dict[tuple, Sums]):
+    rows = [
+        {**dict(zip(key_columns, key)), **{column: sums.get(column, 0) for column in STAT_SUM_COLUMNS}}
+        for key, sums in deltas.items()
+        if any(sums.values())
+    ]
+    if not rows:
+        return
+    insert = _dialect_insert(db)
+    # Lotes: SQLite limita la cantidad de parámetros por sentencia
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(model).values(rows[start:start + UPSERT_BATCH_SIZE])
+        # Suma atómica en la fila existente: escritores concurrentes no se pisan
+        changes = {column: getattr(model, column) + stmt.excluded[column] for column in STAT_SUM_COLUMNS}
+        if hasattr(model, "updated_at"):
+            changes["updated_at"] = func.now()
+        db.execute(stmt.on_conflict_do_update(index_elements=list(key_columns), set_=changes))
+    users = {key[0] for key in deltas}
+    db.execute(delete(model).where(model.user_id.in_(users), model.games <= 0))
+
+
+def apply_session_changes(db: Executor, old_rows: Iterable[Mapping], new_rows: Iterable[Mapping]):
+    """Move aggregates from the `old_rows` versions of some sessions to `new_rows`
+
+    Old versions are subtracted and new ones added, so inserts (no old
+    row), updates (champion, result or day may change) and deletes (no new
+    row) all cost a handful of upserts regardless of history size. Runs in
+    the caller's transaction.
+    """
+    totals: Dict[tuple, Sums] = defaultdict(lambda: defaultdict(int))
+    daily: Dict[tuple, Sums] = defaultdict(lambda: defaultdict(int))
+    _accumulate(old_rows, -1, totals, daily)
+    _accumulate(new_rows, 1, totals, daily)
+    _add_sums(db, UserStatTotal, ("user_id", "champion_name"), totals)
+    _add_sums(db, UserStatDaily, ("user_id", "champion_name", "day"), daily)
+
+
+def stored_session_rows(db: Session, match_ids: List[str]) -> List[Dict]:
+    """Current aggregate-relevant columns of these sessions (read before an upsert)"""
+    if not match_ids:
+        return []
+    columns = [GameSession.match_id] + [getattr(GameSession, field) for field in SESSION_STAT_FIELDS]
+    result = db.execute(select(*columns).where(GameSession.match_id.in_(match_ids)))
+    return [dict(row._mapping) for row in result]
+
+
+def rebuild_aggregates(db: Session, user_id: Optional[int] = None) -> Dict:
+    """Recompute the aggregate tables from game_sessions (one user or everyone)"""
+    for model in (UserStatTotal, UserStatDaily):
+        stmt = delete(model)
+        if user_id is not None:
+            stmt = stmt.where(model.user_id == user_id)
+        db.execute(stmt)
+
+    totals: Dict[tuple, Sums] = defaultdict(lambda: defaultdict(int))
+    daily: Dict[tuple, Sums] = defaultdict(lambda: defaultdict(int))
+    columns = [GameSession.id] + [getattr(GameSession, field) for field in SESSION_STAT_FIELDS]
+    sessions = 0
+    last_id = 0
+    while True:
+        stmt = select(*columns).where(GameSession.id > last_id).order_by(GameSession.id).limit(REBUILD_BATCH_SIZE)
+        if user_id is not None:
+            stmt = stmt.where(GameSession.user_id == user_id)
+        batch = [dict(row._mapping) for row in db.execute(stmt)]
+        if not batch:
+            break
+        _accumulate(batch, 1, totals, daily)
+        sessions += len(batch)
+        last_id = batch[-1]["id"]
+
+    _add_sums(db, UserStatTotal, ("user_id", "champion_name"), totals)
+    _add_sums(db, UserStatDaily, ("user_id", "champion_name", "day"), daily)
+    return {"sessions": sessions, "total_rows": len(totals), "daily_rows": len(daily)}
+
+
+def summarize(sums: Optional[Mapping]) -> Dict:
+    """Rates derived from additive sums (winrate, KDA, per-minute and per-game stats)"""
+    sums = {column: (sums or {}).get(column) or 0 for column in STAT_SUM_COLUMNS}
+    games = sums["games"]
+    minutes = sums["duration_seconds"] / 60
+
+    def per_game(value: int) -> float:
+        return round(value / games, 2) if games else 0.0
+
+    def per_minute(value: int) -> float:
+        return round(value / minutes, 2) if minutes else 0.0
+
+    return {
+        "games": games,
+        "wins": sums["wins"],
+        "losses": games - sums["wins"],
+        "winrate": round(sums["wins"] / games * 100, 1) if games else 0.0,
+        "kda": round((sums["kills"] + sums["assists"]) / max(sums["deaths"], 1), 2),
+        "avg_kills": per_game(sums["kills"]),
+        "avg_deaths": per_game(sums["deaths"]),
+        "avg_assists": per_game(sums["assists"]),
+        "cs_per_min": per_minute(sums["cs"]),
+        "jungle_cs_per_min": per_minute(sums["jungle_cs"]),
+        "vision_per_min": per_minute(sums["vision_score"]),
+        "avg_game_minutes": round(minutes / games, 1) if games else 0.0,
+        "objectives_per_game": {column: per_game(sums[column]) for column in OBJECTIVE_COLUMNS},
+    }
+
+
+def window_start(days: int, today: Optional[date] = None) -> date:
+    """First UTC day of a rolling window of `days` days ending today"""
+    today = today or datetime.now(timezone.utc).date()
+    return today - timedelta(days=min(max(days, 1), MAX_WINDOW_DAYS) - 1)
+
+
+# --- Escrituras ORM (db.add / cambios de atributos) -------------------------
+# Los upserts masivos del backfill no disparan eventos de mapper: llaman
+# apply_session_changes directamente.
+
+def _current_row(target: GameSession) -> Dict:
+    return {field: getattr(target, field) for field in SESSION_STAT_FIELDS}
+
+
+def _stored_row(connection: Connection, session_id: int) -> Optional[Dict]:
+    # La fila en la base: los atributos expirados no guardan su valor anterior
+    columns = [getattr(GameSession, field) for field in SESSION_STAT_FIELDS]
+    row = connection.execute(select(*columns).where(GameSession.id == session_id)).first()
+    return dict(row._mapping) if row is not None else None
+
+
+@event.listens_for(GameSession, "after_insert")
+def _session_inserted(mapper, connection, target):
+    apply_session_changes(connection, [], [_current_row(target)])
+
+
+@event.listens_for(GameSession, "before_update")
+def _session_updating(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in SESSION_STAT_FIELDS):
+        return
+    old = _stored_row(connection, target.id)
+    apply_session_changes(connection, [old] if old else [], [_current_row(target)])
+
+
+@event.listens_for(GameSession, "before_delete")
+def _session_deleting(mapper, connection, target):
+    old = _stored_row(connection, target.id)
+    if old:
+        apply_session_changes(connection, [old], [])
@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Request, Response
+from app.core.champions import Champion, champion_index, normalize_champion_name
+from app.core.config import settings
+from app.services.resilience import clear_deadline
+
+
+class StaticDataError(RuntimeError):
+    """No usable patch file in the static data directory"""
+
+
+def _champion_key(name: str) -> str:
+    # Key de Data Dragon normalizada ("Wukong" y "MonkeyKing" -> monkeyking); nombres desconocidos, solo normalizados
+    champion = champion_index.by_name(name, fuzzy=False)
+    return normalize_champion_name(champion.key if champion else name)
+
+
+def _patch_version(filename: str) -> Optional[Tuple[int, ...]]:
+    # "14.24.json" -> (14, 24); cualquier otro archivo se ignora
+    stem, ext = os.path.splitext(filename)
+    if ext != ".json":
+        return None
+    try:
+        return tuple(int(part) for part in stem.split("."))
+    except ValueError:
+        return None
+
+
+class StaticResource:
+    """A response body serialized once, with its strong ETag"""
+    __slots__ = ("body", "etag")
+
+    def __init__(self, payload: Any):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+
+class StaticSnapshot:
+    """One patch file, parsed once; responses are built the first time they are asked for"""
+
+    def __init__(self, path: str, data: Dict, modified_at: float):
+        self.path = path
+        self.patch = str(data["patch"])
+        self.season = str(data.get("season", ""))
+        self.last_updated = datetime.fromtimestamp(modified_at, tz=timezone.utc).isoformat()
+        self.champions: Dict[str, Dict] = {_champion_key(name): entry for name, entry in data.get("champions", {}).items()}
+        self.objective_timers = StaticResource({
+            "timers": data["objective_timers"],
+            "season": self.season,
+            "patch": self.patch,
+            "last_updated": self.last_updated
+        })
+
+    def champion_metadata(self, champion_name: str) -> Tuple[Optional[Champion], Dict]:
+        """Champion (name, key or with typos) and its patch metadata: difficulty, build, runes"""
+        champion = champion_index.by_name(champion_name)
+        key = normalize_champion_name(champion.key) if champion else normalize_champion_name(champion_name)
+        return champion, self.champions.get(key, {})
+
+
+class StaticDataStore:
+    """Patch-versioned game data (objective timers, camp respawns, champion metadata)
+
+    The newest `<patch>.json` in `directory` is loaded once and served as
+    pre-serialized bytes with strong ETags, so a revalidation with
+    If-None-Match costs a string compare and a 304. A watcher task checks
+    the directory every `reload_interval` seconds and swaps in a new patch
+    file (or an edited one) without a restart; a file that fails to parse
+    is reported and the previous snapshot keeps being served.
+    """
+
+    def __init__(self, directory: str, reload_interval: float, max_age: int):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self.max_age = max_age
+        self._snapshot: Optional[StaticSnapshot] = None
+        self._source: Optional[Tuple[str, float]] = None  # (archivo, mtime) cargado
+        self._failed: Optional[Tuple[str, float]] = None  # último archivo que no se pudo leer
+        self._watcher: Optional[asyncio.Task] = None
+
+        # Métricas
+        self.loads = 0
+        self.reload_errors = 0
+        self.last_error: Optional[str] = None
+        self.not_modified = 0
+        self.full_responses = 0
+
+    def _newest_file(self) -> Tuple[str, float]:
+        candidates = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    version = _patch_version(entry.name)
+                    if version is not None and entry.is_file():
+                        candidates.append((version, entry.path, entry.stat().st_mtime))
+        except FileNotFoundError:
+            raise StaticDataError(f"Static data directory not found: {self.directory}")
+        if not candidates:
+            raise StaticDataError(f"No patch data file in {self.directory}")
+        _, path, modified_at = max(candidates)
+        return path, modified_at
+
+    def load(self) -> bool:
+        """Load the newest patch file if it is not the one being served; True if swapped"""
+        source = self._newest_file()
+        if source == self._source or source == self._failed:
+            return False
+        path, modified_at = source
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = StaticSnapshot(path, json.load(f), modified_at)
+        except (OSError, ValueError, KeyError) as e:
+            # No se reintenta el mismo archivo hasta que cambie
+            self._failed = source
+            self.last_error = f"Could not load {os.path.basename(path)}: {e!r}"
+            raise StaticDataError(self.last_error) from e
+        # Reemplazo atómico: los requests en curso terminan con el snapshot anterior
+        self._snapshot = snapshot
+        self._source = source
+        self.loads += 1
+        return True
+
+    @property
+    def snapshot(self) -> StaticSnapshot:
+        """The patch being served; StaticDataError while no file has loaded"""
+        if self._snapshot is None:
+            self.load()
+            if self._snapshot is None:
+                # El archivo más nuevo ya falló y no cambió desde entonces
+                raise StaticDataError(self.last_error or f"No usable patch data file in {self.directory}")
+        return self._snapshot
+
+    async def open(self):
+        """Load the current patch and start watching for new files (app lifespan)"""
+        try:
+            self.load()
+        except StaticDataError as e:
+            # La API arranca igual; los endpoints de datos estáticos responden 503 hasta que aparezca un archivo
+            self.last_error = str(e)
+            print(f"Static game data unavailable: {e}")
+        if self._watcher is None and self.reload_interval > 0:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def close(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+
+    async def _watch(self):
+        clear_deadline()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                if self.load():
+                    print(f"Static game data reloaded: patch {self._snapshot.patch}")
+            except Exception as e:
+                self.reload_errors += 1
+                self.last_error = str(e)
+                print(f"Static game data reload failed, keeping patch {self._snapshot.patch if self._snapshot else '-'}: {e}")
+
+    def response(self, request: Request, resource: StaticResource) -> Response:
+        """200 with the pre-serialized body, or 304 when the client already has it"""
+        headers = {
+            "ETag": resource.etag,
+            "Cache-Control": f"public, max-age={self.max_age}"
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, resource.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        self.full_responses += 1
+        return Response(content=resource.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            "directory": self.directory,
+            "patch": snapshot.patch if snapshot else None,
+            "file": os.path.basename(snapshot.path) if snapshot else None,
+            "last_updated": snapshot.last_updated if snapshot else None,
+            "watching": self._watcher is not None,
+            "loads": self.loads,
+            "reload_errors": self.reload_errors,
+            "last_error": self.last_error,
+            "not_modified": self.not_modified,
+            "full_responses": self.full_responses,
+            "champion_index": champion_index.stats()
+        }
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match usa comparación débil: W/"x" coincide con "x"
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+# Singleton instance
+static_data = StaticDataStore(
+    directory=settings.STATIC_DATA_DIR,
+    reload_interval=settings.STATIC_DATA_RELOAD_INTERVAL,
+    max_age=settings.STATIC_DATA_MAX_AGE
+)
@@ -0,0 +1,350 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, tuple_, update
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.jungle_timer import JungleTimer, active_timers_query
+from app.schemas.jungle_timer import JungleTimerResponse
+from app.services.resilience import clear_deadline
+from app.services.resolution_cache import ResolutionCache
+
+WARNING = "warning"
+SPAWN = "spawn"
+CANCELLED = "cancelled"
+
+
+def _epoch(moment: datetime) -> float:
+    # SQLite devuelve datetimes sin zona, guardados en UTC
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+class _ActiveTimer:
+    __slots__ = ("id", "session_id", "objective_type", "objective_name", "respawn_time", "respawn_at", "version")
+
+    def __init__(self, timer: JungleTimer):
+        self.id = timer.id
+        self.session_id = timer.game_session_id
+        self.objective_type = timer.objective_type
+        self.objective_name = timer.objective_name
+        self.respawn_time = timer.respawn_time  # valor de la fila, para el UPDATE condicional
+        self.respawn_at = _epoch(timer.respawn_time)
+        self.version = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "timer_id": self.id,
+            "session_id": self.session_id,
+            "objective_type": self.objective_type,
+            "objective_name": self.objective_name,
+            "respawn_time": _iso(self.respawn_at),
+            "seconds_left": round(max(self.respawn_at - time.time(), 0.0), 1)
+        }
+
+
+class TimerEngine:
+    """Every active objective timer in one min-heap, fired by a single task
+
+    Heap entries are (fire_at, seq, timer_id, version, kind); each timer
+    has a warning entry `warning_seconds` before its respawn and a spawn
+    entry at it. Rescheduling or cancelling bumps the timer's version and
+    leaves the old entries in the heap to be skipped when they surface, so
+    every operation is O(log n) and an idle tick costs one peek. The task
+    sleeps exactly until the earliest entry and is woken when an earlier
+    one is pushed.
+
+    State changes (a timer spawning or being cancelled) are not committed
+    one by one: they are queued and written in one UPDATE per flush
+    (write-behind), every `flush_interval` or as soon as `flush_batch`
+    changes are pending.
+    """
+
+    def __init__(self, warning_seconds: float, flush_interval: float, flush_batch: int, subscriber_queue: int):
+        self.warning_seconds = warning_seconds
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.subscriber_queue = subscriber_queue
+        self._heap: List[Tuple[float, int, int, int, str]] = []
+        self._seq = 0
+        self._timers: Dict[int, _ActiveTimer] = {}
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_now: Optional[asyncio.Event] = None
+        self._pending: Dict[int, Tuple[int, datetime]] = {}  # timer -> (partida, respawn_time), a marcar is_active=False
+        self._scheduler: Optional[asyncio.Task] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+        # Métricas
+        self.fired = {WARNING: 0, SPAWN: 0, CANCELLED: 0}
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stale_skipped = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.flush_errors = 0
+        self.events_dropped = 0
+
+    # --- Ciclo de vida ------------------------------------------------------
+
+    async def open(self):
+        """Load active timers from the database and start the scheduler (app lifespan)"""
+        if self._scheduler is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        async with AsyncSessionLocal() as db:
+            timers = await db.scalars(select(JungleTimer).where(JungleTimer.is_active == True))
+            now = time.time()
+            for timer in timers:
+                if timer.respawn_time is not None and _epoch(timer.respawn_time) <= now:
+                    # Reapareció con el servidor apagado: sin evento, solo se persiste
+                    self._pending[timer.id] = (timer.game_session_id, timer.respawn_time)
+                else:
+                    self.schedule(timer)
+        self._scheduler = asyncio.create_task(self._run_scheduler())
+        self._flusher = asyncio.create_task(self._run_flusher())
+
+    async def close(self):
+        """Stop the tasks and write every pending state change"""
+        tasks = [task for task in (self._scheduler, self._flusher) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._scheduler = self._flusher = None
+        await self.flush()
+        self._heap.clear()
+        self._timers.clear()
+
+    # --- Programación -------------------------------------------------------
+
+    def _push(self, fire_at: float, timer: _ActiveTimer, kind: str):
+        self._seq += 1
+        heapq.heappush(self._heap, (fire_at, self._seq, timer.id, timer.version, kind))
+        if self._heap[0][1] == self._seq and self._wakeup is not None:
+            # Nuevo mínimo: el scheduler recalcula cuánto dormir
+            self._wakeup.set()
+
+    def schedule(self, timer: JungleTimer) -> Optional[Dict]:
+        """Track a timer row (new or rescheduled); returns its live state"""
+        if timer.respawn_time is None or not timer.is_active:
+            self.cancel(timer.id, notify=False)
+            return None
+        active = self._timers.get(timer.id)
+        if active is None:
+            active = _ActiveTimer(timer)
+            self._timers[timer.id] = active
+        else:
+            active.version += 1
+            active.respawn_time = timer.respawn_time
+            active.respawn_at = _epoch(timer.respawn_time)
+        self._pending.pop(timer.id, None)
+        warn_at = active.respawn_at - self.warning_seconds
+        if warn_at > time.time():
+            self._push(warn_at, active, WARNING)
+        self._push(active.respawn_at, active, SPAWN)
+        self._compact()
+        return active.to_dict()
+
+    def cancel(self, timer_id: int, notify: bool = True) -> bool:
+        """Stop tracking a timer and persist it as inactive"""
+        active = self._timers.pop(timer_id, None)
+        if active is None:
+            return False
+        self.fired[CANCELLED] += 1
+        self._mark_inactive(active)
+        if notify:
+            self._publish(CANCELLED, active, 0.0)
+        self._compact()
+        return True
+
+    def _compact(self):
+        # Entradas obsoletas (reprogramadas/canceladas): reconstruir si son mayoría
+        if len(self._heap) > 64 and len(self._heap) > 4 * max(len(self._timers), 1):
+            self._heap = [
+                entry for entry in self._heap
+                if entry[2] in self._timers and self._timers[entry[2]].version == entry[3]
+            ]
+            heapq.heapify(self._heap)
+
+    async def _run_scheduler(self):
+        clear_deadline()
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, _, timer_id, version, kind = heapq.heappop(self._heap)
+                active = self._timers.get(timer_id)
+                if active is None or active.version != version:
+                    self.stale_skipped += 1
+                    continue
+                self._fire(active, kind, now - fire_at)
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, active: _ActiveTimer, kind: str, lag: float):
+        self.fired[kind] += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        if kind == SPAWN:
+            del self._timers[active.id]
+            self._mark_inactive(active)
+        self._publish(kind, active, lag)
+
+    # --- Suscriptores -------------------------------------------------------
+
+    def subscribe(self, session_id: int) -> asyncio.Queue:
+        """Queue of warning/spawn/cancelled events for one game session"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue)
+        self._subscribers.setdefault(session_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, session_id: int, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[session_id]
+
+    def _publish(self, kind: str, active: _ActiveTimer, lag: float):
+        subscribers = self._subscribers.get(active.session_id)
+        if not subscribers:
+            return
+        event = {"event": kind, **active.to_dict(), "fired_at": _iso(time.time()), "lag_ms": round(lag * 1000, 1)}
+        for queue in subscribers:
+            if queue.full():
+                # Cliente lento: se descarta el evento más viejo
+                queue.get_nowait()
+                self.events_dropped += 1
+            queue.put_nowait(event)
+
+    def active_timers(self, session_id: int) -> List[Dict]:
+        """Live state of a session's active timers, next respawn first"""
+        timers = [t for t in self._timers.values() if t.session_id == session_id]
+        return [t.to_dict() for t in sorted(timers, key=lambda t: (t.respawn_at, t.id))]
+
+    # --- Write-behind -------------------------------------------------------
+
+    def _mark_inactive(self, active: _ActiveTimer):
+        self._pending[active.id] = (active.session_id, active.respawn_time)
+        if len(self._pending) >= self.flush_batch and self._flush_now is not None:
+            self._flush_now.set()
+
+    async def flush(self) -> int:
+        """Write pending state changes in one UPDATE; kept for the next flush on error
+
+        A timer can be rescheduled while the UPDATE is in flight (the
+        request commits its new row and calls `schedule` in between), so
+        the write is conditional on the respawn_time the engine marked,
+        and timers that are tracked again once it commits get
+        is_active=True re-asserted.
+        """
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(JungleTimer)
+                    .where(tuple_(JungleTimer.id, JungleTimer.respawn_time).in_(
+                        [(timer_id, respawn_time) for timer_id, (_, respawn_time) in batch.items()]
+                    ))
+                    .values(is_active=False)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                # Reprogramados durante la escritura: la fila vuelve a quedar activa
+                revived = [timer_id for timer_id in batch if timer_id in self._timers]
+                if revived:
+                    await db.execute(
+                        update(JungleTimer)
+                        .where(JungleTimer.id.in_(revived))
+                        .values(is_active=True)
+                        .execution_options(synchronize_session=False)
+                    )
+                    await db.commit()
+        except Exception:
+            self.flush_errors += 1
+            # Reprogramados mientras tanto siguen activos
+            for timer_id, pending in batch.items():
+                if timer_id not in self._timers:
+                    self._pending.setdefault(timer_id, pending)
+            raise
+        for session_id in {session_id for session_id, _ in batch.values()}:
+            next_timers_cache.invalidate(session_id)
+        self.flushes += 1
+        self.rows_written += len(batch)
+        return len(batch)
+
+    async def _run_flusher(self):
+        clear_deadline()
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # Se reintenta en el próximo intervalo
+                pass
+
+    def stats(self) -> Dict:
+        fired = sum(self.fired[kind] for kind in (WARNING, SPAWN))
+        return {
+            "running": self._scheduler is not None,
+            "active_timers": len(self._timers),
+            "heap_entries": len(self._heap),
+            "next_fire_in_seconds": round(self._heap[0][0] - time.time(), 3) if self._heap else None,
+            "sessions_subscribed": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "fired": dict(self.fired),
+            "stale_skipped": self.stale_skipped,
+            "avg_lag_ms": round(self.total_lag / fired * 1000, 2) if fired else 0.0,
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "events_dropped": self.events_dropped,
+            "pending_writes": len(self._pending),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "avg_rows_per_flush": round(self.rows_written / self.flushes, 1) if self.flushes else 0.0,
+            "flush_errors": self.flush_errors
+        }
+
+
+# "Próximos timers" por partida desde la base; se invalida en cada escritura
+next_timers_cache = ResolutionCache("next-timers", settings.NEXT_TIMERS_CACHE_TTL, settings.NEXT_TIMERS_CACHE_TTL)
+
+
+async def next_active_timers(session_id: int, limit: int) -> List[Dict]:
+    """Next `limit` active timers of a session (index range scan, cached per session)
+
+    The cache holds the first NEXT_TIMERS_MAX rows already serialized, so
+    repeated polls of any smaller `limit` cost a dict lookup.
+    """
+    async def load() -> List[Dict]:
+        async with AsyncSessionLocal() as db:
+            timers = await db.scalars(active_timers_query(session_id).limit(settings.NEXT_TIMERS_MAX))
+            return [JungleTimerResponse.model_validate(timer).model_dump(mode="json") for timer in timers]
+
+    timers = await next_timers_cache.get_or_load(session_id, load)
+    return timers[:limit]
+
+
+# Singleton instance
+timer_engine = TimerEngine(
+    warning_seconds=settings.TIMER_WARNING_SECONDS,
+    flush_interval=settings.TIMER_FLUSH_INTERVAL,
+    flush_batch=settings.TIMER_FLUSH_BATCH,
+    subscriber_queue=settings.TIMER_SUBSCRIBER_QUEUE
+)
@@ -0,0 +1,88 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class InvalidCursorError(ValueError):
+    """Continuation token that was tampered with or belongs to another listing"""
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    next_cursor: Optional[str] = None
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(keys: Sequence[InstrumentedAttribute], values: Sequence) -> str:
+    """Opaque token for "continue after the row with these key values" """
+    payload = {"k": [key.key for key in keys], "v": [_dump(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(keys: Sequence[InstrumentedAttribute], token: str) -> List:
+    """Key values stored in `token`; InvalidCursorError if it was not issued for `keys`"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        names, values = payload["k"], payload["v"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if names != [key.key for key in keys] or not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursorError("Pagination cursor does not belong to this listing")
+    # Con un NULL la comparación de tuplas es NULL y no devuelve filas
+    if any(value is None for value in values):
+        raise InvalidCursorError("Invalid pagination cursor")
+    try:
+        return [_load(value) for value in values]
+    except (TypeError, ValueError):
+        raise InvalidCursorError("Invalid pagination cursor")
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence[InstrumentedAttribute],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False
+) -> Page:
+    """One page of `stmt` by keyset on `keys` (its ORDER BY, last key unique, none nullable)
+
+    With a cursor the query seeks straight to the next row through the
+    index instead of reading and discarding `skip` rows. `skip` is kept for
+    callers that still page by offset; it is ignored when a cursor is given.
+    One extra row is fetched to know whether another page exists.
+    """
+    if cursor:
+        after = decode_cursor(keys, cursor)
+        row, bound = tuple_(*keys), tuple_(*after)
+        stmt = stmt.where(row < bound if descending else row > bound)
+    elif skip:
+        stmt = stmt.offset(skip)
+    rows = (await db.scalars(stmt.limit(limit + 1))).all()
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(keys, [getattr(last, key.key) for key in keys])
+    return Page(items=items, next_cursor=next_cursor)
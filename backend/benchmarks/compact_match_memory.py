@@ -0,0 +1,136 @@
+"""Memory benchmark: N cached matches as decoded dicts vs CompactMatch
+
+Uso (desde backend/):
+    python benchmarks/compact_match_memory.py --matches 10000
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.compact_match import CompactMatch  # noqa: E402
+
+CHAMPIONS = ["Graves", "Kindred", "Khazix", "LeeSin", "Viego", "Hecarim", "Ahri", "Jinx", "Thresh", "Garen"]
+POSITIONS = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+
+def _participant(rng: random.Random, puuid: str, index: int) -> dict:
+    # Un participante real de match-v5 tiene ~150 claves más ~125 en challenges
+    participant = {f"stat{k}": rng.randint(0, 50000) for k in range(130)}
+    participant.update({
+        "puuid": puuid,
+        "championName": rng.choice(CHAMPIONS),
+        "teamPosition": POSITIONS[index % 5],
+        "riotIdGameName": f"Player{rng.randint(0, 10**6)}",
+        "win": index < 5,
+        "kills": rng.randint(0, 20),
+        "deaths": rng.randint(0, 15),
+        "assists": rng.randint(0, 25),
+        "totalMinionsKilled": rng.randint(0, 300),
+        "neutralMinionsKilled": rng.randint(0, 250),
+        "visionScore": rng.randint(0, 80),
+        "dragonKills": rng.randint(0, 4),
+        "baronKills": rng.randint(0, 2),
+        "objectivesStolen": rng.randint(0, 1),
+        "turretKills": rng.randint(0, 5),
+        "champLevel": rng.randint(6, 18),
+        "challenges": {f"challenge{k}": rng.random() * 100 for k in range(125)},
+        "perks": {
+            "statPerks": {"defense": 5001, "flex": 5008, "offense": 5005},
+            "styles": [
+                {"description": "primaryStyle", "style": 8000, "selections": [
+                    {"perk": 8010 + k, "var1": rng.randint(0, 500), "var2": 0, "var3": 0} for k in range(4)
+                ]}
+            ]
+        },
+    })
+    participant["challenges"]["riftHeraldTakedowns"] = rng.randint(0, 2)
+    return participant
+
+
+def build_payload(rng: random.Random, match_number: int, puuids: list) -> bytes:
+    match_id = f"LA1_{1500000000 + match_number}"
+    players = rng.sample(puuids, 10)
+    match = {
+        "metadata": {"dataVersion": "2", "matchId": match_id, "participants": players},
+        "info": {
+            "endOfGameResult": "GameComplete",
+            "gameCreation": 1700000000000 + match_number,
+            "gameDuration": rng.randint(900, 2400),
+            "gameEndTimestamp": 1700000002000 + match_number,
+            "gameMode": "CLASSIC",
+            "gameStartTimestamp": 1700000001000 + match_number,
+            "gameVersion": "14.10.584.7543",
+            "participants": [_participant(rng, puuid, i) for i, puuid in enumerate(players)],
+            "queueId": 420,
+            "teams": [{"teamId": 100, "win": True}, {"teamId": 200, "win": False}]
+        }
+    }
+    return json.dumps(match, separators=(",", ":")).encode()
+
+
+def deep_size(root) -> int:
+    """Bytes reachable from `root`, counting shared objects (interned strings, small ints) once"""
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif hasattr(obj, "__slots__"):
+            stack.extend(getattr(obj, slot) for slot in obj.__slots__)
+    return total
+
+
+def measure(label: str, count: int, build) -> int:
+    gc.collect()
+    started = time.perf_counter()
+    cache = [build(i) for i in range(count)]
+    elapsed = time.perf_counter() - started
+    held = deep_size(cache)
+    print(
+        f"{label:<14} {count:>6} matches  {held / 2**20:9.1f} MiB held  "
+        f"{held / count / 1024:8.1f} KiB/match  built in {elapsed:6.1f}s"
+    )
+    del cache
+    return held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=2000, help="distinct puuids across all matches")
+    parser.add_argument("--templates", type=int, default=64, help="distinct payloads generated up front")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    puuids = [f"{rng.getrandbits(256):064x}{rng.getrandbits(56):014x}" for _ in range(args.players)]
+
+    # Se generan fuera de la medición; cada partida solo cambia su matchId
+    templates = [build_payload(rng, i, puuids) for i in range(args.templates)]
+
+    def payload(i: int) -> bytes:
+        template = templates[i % len(templates)]
+        return template.replace(b"LA1_%d" % (1500000000 + i % len(templates)), b"LA1_%d" % (2500000000 + i), 1)
+
+    dict_bytes = measure("dict", args.matches, lambda i: json.loads(payload(i)))
+    compact_bytes = measure("CompactMatch", args.matches, lambda i: CompactMatch.from_match(json.loads(payload(i))))
+    print(f"CompactMatch uses {compact_bytes / dict_bytes:.1%} of the dict form ({dict_bytes / compact_bytes:.0f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Concurrent request throughput: sync Session (before) vs AsyncSession (after)
+
+Lanza N requests concurrentes contra los endpoints de usuarios en proceso
+(ASGI, sin red) y mide requests/s, latencias y el lag máximo del event loop
+mientras tanto. "sync" replica el handler anterior (db.query dentro de un
+`async def`); "async" usa el router actual con get_async_db.
+
+Con --writer-lock-ms un hilo aparte toma periódicamente un lock exclusivo
+de SQLite (como un backfill escribiendo): ahí el handler síncrono espera el
+lock dentro del event loop y el async no.
+
+Con concurrencia mayor que el pool síncrono (5 + 10 overflow) la variante
+"sync" se bloquea: el checkout espera dentro del event loop a conexiones que
+solo se devuelven cuando el loop ejecuta el cierre de otras sesiones. Por
+eso la concurrencia por defecto queda por debajo de ese límite.
+
+Uso (desde backend/):
+    python benchmarks/db_throughput.py --requests 5000 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--writer-lock-ms", type=int, default=0,
+                        help="hold an exclusive write lock this long every 100 ms")
+    parser.add_argument("--endpoint", choices=["get", "list"], default="get",
+                        help="get = /users/{id}, list = /users/?limit=100")
+    return parser.parse_args()
+
+
+args = parse_args()
+# La base del benchmark nunca es la de la app
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI, HTTPException  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from app.api.endpoints import users  # noqa: E402
+from app.database import SessionLocal, async_engine, get_db, init_db  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.user import UserResponse  # noqa: E402
+
+app = FastAPI()
+app.include_router(users.router, prefix="/async/users")
+
+
+@app.get("/sync/users/", response_model=list[UserResponse])
+async def legacy_get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return db.query(User).filter(User.is_active == True).offset(skip).limit(limit).all()
+
+
+@app.get("/sync/users/{user_id}", response_model=UserResponse)
+async def legacy_get_user(user_id: int, db: Session = Depends(get_db)):
+    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+def seed(count: int):
+    init_db()
+    db = SessionLocal()
+    try:
+        db.add_all(
+            User(riot_id=f"Bench{i}#{i}", summoner_name=f"Bench{i}", tag_line=str(i))
+            for i in range(count)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def contend_writes(stop: threading.Event, hold_seconds: float):
+    # Un escritor que bloquea a los lectores mientras dura su transacción
+    conn = sqlite3.connect(_db_file, timeout=30, isolation_level=None)
+    try:
+        while not stop.is_set():
+            conn.execute("BEGIN EXCLUSIVE")
+            time.sleep(hold_seconds)
+            conn.execute("COMMIT")
+            time.sleep(0.1)
+    finally:
+        conn.close()
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list):
+    # Cuánto tarda el loop en atender un sleep de 1 ms
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        samples.append(time.perf_counter() - started - 0.001)
+
+
+async def run(variant: str) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    lag = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            path = f"/{variant}/users/{i % args.users + 1}" if args.endpoint == "get" else f"/{variant}/users/?limit=100"
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        await one(0)  # calentar conexiones y caches de SQLAlchemy
+        latencies.clear()
+
+        stop = asyncio.Event()
+        writer_stop = threading.Event()
+        writer = None
+        if args.writer_lock_ms:
+            writer = threading.Thread(target=contend_writes, args=(writer_stop, args.writer_lock_ms / 1000))
+            writer.start()
+        lag_task = asyncio.create_task(measure_loop_lag(stop, lag))
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(one(i) for i in range(args.requests)))
+        finally:
+            elapsed = time.perf_counter() - started
+            stop.set()
+            writer_stop.set()
+            await lag_task
+            if writer is not None:
+                writer.join()
+
+    latencies.sort()
+    return {
+        "variant": variant,
+        "rps": args.requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_loop_lag_ms": max(lag, default=0.0) * 1000
+    }
+
+
+async def main():
+    seed(args.users)
+    print(
+        f"{args.requests} x {args.endpoint} requests, concurrency {args.concurrency}, "
+        f"{args.users} users, writer lock {args.writer_lock_ms} ms"
+    )
+    for variant in ("sync", "async"):
+        result = await run(variant)
+        print(
+            f"{result['variant']:<6} {result['rps']:8.0f} req/s  p50 {result['p50_ms']:7.2f} ms  "
+            f"p95 {result['p95_ms']:7.2f} ms  max loop lag {result['max_loop_lag_ms']:7.2f} ms"
+        )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,18 +1,47 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
-from app.database import init_db
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.database import async_engine, init_db
 from app.api.routes import api_router
 from app.core.config import settings
+from app.services.riot_service import riot_service
+from app.services.claude_service import claude_service
+from app.services.live_game_poller import live_game_poller
+from app.services.match_backfill import match_backfill
+from app.services.cpu_pool import cpu_pool
+from app.services.timer_engine import timer_engine
+from app.services.static_data import StaticDataError, static_data
+from app.services.champion_stats import champion_stats
+from app.services.resilience import CircuitOpenError, UpstreamUnavailableError, deadline
+from app.core.regions import UnknownRegionError
+from app.utils.pagination import InvalidCursorError
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     init_db()
+    await static_data.open()
+    await cpu_pool.open()
+    await riot_service.open()
+    await claude_service.open()
+    await timer_engine.open()
+    await champion_stats.open()
     yield
     # Shutdown
-    pass
+    await champion_stats.close()
+    await timer_engine.close()
+    await live_game_poller.close()
+    await match_backfill.close()
+    await claude_service.close()
+    await riot_service.close()
+    await cpu_pool.close()
+    await static_data.close()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="LoL Jungle Assistant API",
@@ -28,8 +57,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # paginación de /users/
 )
 
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    """Give every request one time budget shared by all its upstream calls"""
+    with deadline(settings.REQUEST_DEADLINE_SECONDS):
+        return await call_next(request)
+
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailableError):
+    headers = {}
+    if isinstance(exc, CircuitOpenError):
+        headers["Retry-After"] = str(int(exc.retry_in) + 1)
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers=headers)
+
+@app.exception_handler(PoolTimeoutError)
+async def database_pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # Todas las conexiones ocupadas durante DB_POOL_TIMEOUT: sobrecarga, no un error del cliente
+    return JSONResponse(status_code=503, content={"detail": "Database busy, try again"}, headers={"Retry-After": "1"})
+
+@app.exception_handler(UnknownRegionError)
+async def unknown_region_handler(request: Request, exc: UnknownRegionError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(RequestValidationError)
+async def request_validation_handler(request: Request, exc: RequestValidationError):
+    # Un campo RiotRegion desconocido en el body responde 400 como el query param `region`
+    region_errors = [
+        err["ctx"]["error"] for err in exc.errors()
+        if isinstance(err.get("ctx", {}).get("error"), UnknownRegionError)
+    ]
+    if region_errors and len(region_errors) == len(exc.errors()):
+        return JSONResponse(status_code=400, content={"detail": str(region_errors[0])})
+    return await request_validation_exception_handler(request, exc)
+
+@app.exception_handler(StaticDataError)
+async def static_data_unavailable_handler(request: Request, exc: StaticDataError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 # Incluir rutas
 app.include_router(api_router, prefix="/api/v1")
 
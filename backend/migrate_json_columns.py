@@ -0,0 +1,122 @@
+"""Move JSON-in-Text columns to JSON and fill the indexed child tables
+
+Idempotente: se puede correr de nuevo en cualquier momento. En PostgreSQL
+convierte las columnas a JSONB; en SQLite el almacenamiento no cambia
+(JSON es TEXT) pero los valores que no eran JSON válido se guardan como
+string JSON. Después reconstruye game_session_objectives y
+user_preferred_champions a partir de las columnas.
+
+Uso (desde backend/):
+    python migrate_json_columns.py
+"""
+import json
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine, init_db
+from app.models.game_session import replace_objectives_statements
+from app.models.user import replace_preferred_champions_statements
+
+# (tabla, columna)
+JSON_COLUMNS: List[Tuple[str, str]] = [
+    ("game_sessions", "objectives_secured"),
+    ("game_sessions", "ai_suggestions"),
+    ("users", "preferred_jungle_champions"),
+]
+BATCH_SIZE = 500
+
+
+def _normalize(value):
+    """Stored value -> (JSON text, parsed); invalid JSON is kept as a JSON string"""
+    if value is None or not isinstance(value, str):
+        return (None if value is None else json.dumps(value)), value
+    try:
+        return value, json.loads(value)
+    except ValueError:
+        return json.dumps(value), value
+
+
+def _rows(db: Session, sql: str) -> Iterable[Tuple]:
+    last_id = 0
+    while True:
+        batch = db.execute(text(sql), {"last_id": last_id, "limit": BATCH_SIZE}).all()
+        if not batch:
+            return
+        yield from batch
+        last_id = batch[-1][0]
+
+
+def text_json_columns() -> List[Tuple[str, str]]:
+    """Columns still stored as plain text (always all of them on SQLite)"""
+    if engine.dialect.name != "postgresql":
+        return JSON_COLUMNS
+    inspector = inspect(engine)
+    pending = []
+    for table, column in JSON_COLUMNS:
+        current = next(c for c in inspector.get_columns(table) if c["name"] == column)
+        if current["type"].__class__.__name__ != "JSONB":
+            pending.append((table, column))
+    return pending
+
+
+def normalize_values(db: Session, columns: List[Tuple[str, str]]):
+    for table, column in columns:
+        fixed = 0
+        for row_id, value in _rows(db, f"SELECT id, {column} FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit"):
+            stored, _ = _normalize(value)
+            if stored != value:
+                db.execute(text(f"UPDATE {table} SET {column} = :value WHERE id = :id"), {"value": stored, "id": row_id})
+                fixed += 1
+        if fixed:
+            print(f"{table}.{column}: {fixed} non-JSON values stored as JSON strings")
+
+
+def convert_postgres_columns(db: Session, columns: List[Tuple[str, str]]):
+    for table, column in columns:
+        db.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb"))
+        print(f"{table}.{column} -> JSONB")
+
+
+def rebuild_child_tables(db: Session):
+    sessions = 0
+    pending: Dict[int, object] = {}
+    for session_id, value in _rows(db, "SELECT id, objectives_secured FROM game_sessions WHERE id > :last_id ORDER BY id LIMIT :limit"):
+        _, objectives = _normalize(value)
+        pending[session_id] = objectives if isinstance(objectives, dict) else None
+        if len(pending) >= BATCH_SIZE:
+            for statement in replace_objectives_statements(pending):
+                db.execute(statement)
+            sessions += len(pending)
+            pending = {}
+    for statement in replace_objectives_statements(pending):
+        db.execute(statement)
+    sessions += len(pending)
+
+    users = 0
+    for user_id, value in _rows(db, "SELECT id, preferred_jungle_champions FROM users WHERE id > :last_id ORDER BY id LIMIT :limit"):
+        _, champions = _normalize(value)
+        for statement in replace_preferred_champions_statements(user_id, champions if isinstance(champions, list) else None):
+            db.execute(statement)
+        users += 1
+    print(f"Rebuilt objectives for {sessions} sessions and preferred champions for {users} users")
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    try:
+        columns = text_json_columns()
+        normalize_values(db, columns)
+        if engine.dialect.name == "postgresql":
+            convert_postgres_columns(db, columns)
+        rebuild_child_tables(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
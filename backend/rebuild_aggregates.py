@@ -0,0 +1,40 @@
+"""Recompute user_stat_totals and user_stat_daily from game_sessions
+
+Los agregados se mantienen solos en cada escritura; esto es para la
+primera carga después de actualizar, o si se editaron sesiones por fuera
+de la app.
+
+Uso (desde backend/):
+    python rebuild_aggregates.py
+    python rebuild_aggregates.py --user-id 1
+"""
+import argparse
+import time
+from app.database import SessionLocal, init_db
+from app.services.session_aggregates import rebuild_aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, default=None, help="only this user (default: everyone)")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = rebuild_aggregates(db, args.user_id)
+        db.commit()
+        print(
+            f"Rebuilt {result['total_rows']} total rows and {result['daily_rows']} daily rows "
+            f"from {result['sessions']} sessions in {time.perf_counter() - started:.1f}s"
+        )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import asyncio
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, init_db
-from app.models.user import User
+from app.models.user import User, replace_preferred_champions_statements
 from app.services.riot_service import riot_service
 
 
+PREFERRED_CHAMPIONS = ["Graves", "Kindred", "Kha'Zix", "Nidalee", "Hecarim", "Viego"]
+
+
 async def setup_not_alet_user():
     """Setup inicial para el usuario Not Alet con datos básicos pero funcionales"""
     init_db()
@@ -55,7 +58,9 @@ async def setup_not_alet_user():
             existing_user.rank_tier = rank_tier
             existing_user.rank_division = rank_division
             existing_user.league_points = league_points
-            existing_user.preferred_jungle_champions = '["Graves", "Kindred", "Kha\'Zix", "Nidalee", "Hecarim", "Viego"]'
+            existing_user.preferred_jungle_champions = PREFERRED_CHAMPIONS
+            for statement in replace_preferred_champions_statements(existing_user.id, PREFERRED_CHAMPIONS):
+                db.execute(statement)
 
             db.commit()
             user = existing_user
@@ -68,10 +73,13 @@ async def setup_not_alet_user():
                 rank_tier=rank_tier,
                 rank_division=rank_division,
                 league_points=league_points,
-                preferred_jungle_champions='["Graves", "Kindred", "Kha\'Zix", "Nidalee", "Hecarim", "Viego"]'
+                preferred_jungle_champions=PREFERRED_CHAMPIONS
             )
 
             db.add(user)
+            db.flush()
+            for statement in replace_preferred_champions_statements(user.id, PREFERRED_CHAMPIONS):
+                db.execute(statement)
             db.commit()
             db.refresh(user)
 
@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+
+# La configuración se lee al importar app.*: bases temporales antes de cualquier import
+_TMP = tempfile.mkdtemp(prefix="lol-jungle-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+os.environ.setdefault("MATCH_STORE_PATH", os.path.join(_TMP, "match_store.db"))
+os.environ.setdefault("CPU_POOL_MODE", "inline")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--postgres-url",
+        default=os.environ.get("TEST_POSTGRES_URL"),
+        help="scratch PostgreSQL database for the query plan tests (skipped when unset)"
+    )
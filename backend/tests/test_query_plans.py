@@ -0,0 +1,114 @@
+"""The hot queries must keep using their composite indexes
+
+Cada consulta se planifica sobre el esquema de los modelos en una base
+vacía: tiene que usar el índice esperado y no ordenar aparte. SQLite en
+memoria corre siempre; PostgreSQL solo con --postgres-url (o
+TEST_POSTGRES_URL) apuntando a una base de prueba, donde se crean las tablas.
+"""
+import json
+from datetime import date, datetime
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+from sqlalchemy import Select, create_engine, func, select, text, tuple_
+from sqlalchemy.engine import Connection
+
+from app.database import Base, sync_database_url
+from app.models import match_sync  # noqa: F401  -- registra las tablas referenciadas
+from app.models.game_session import GameSession, user_sessions_query
+from app.models.jungle_timer import active_timers_query
+from app.models.session_stats import UserStatDaily
+from app.models.user import UserPreferredChampion
+
+# (descripción, consulta, índices que debe usar; el nombre de una PK cambia según la base)
+CHECKS: List[Tuple[str, Callable[[], Select], Tuple[str, ...]]] = [
+    ("sessions for user ordered by started_at",
+     lambda: user_sessions_query(1).limit(20),
+     ("ix_game_sessions_user_started",)),
+    ("sessions for user on champion",
+     lambda: user_sessions_query(1, "Graves").limit(20),
+     ("ix_game_sessions_user_champion_started",)),
+    ("sessions for user after a cursor",
+     lambda: user_sessions_query(1).where(
+         tuple_(GameSession.started_at, GameSession.id) < tuple_(datetime(2024, 1, 1), 100)
+     ).limit(20),
+     ("ix_game_sessions_user_started",)),
+    ("sessions for user where an objective was secured",
+     lambda: user_sessions_query(1, objective_type="barons").limit(20),
+     ("ix_game_sessions_user_started", "sqlite_autoindex_game_session_objectives_1|game_session_objectives_pkey")),
+    ("users with a preferred champion",
+     lambda: select(UserPreferredChampion.user_id).where(UserPreferredChampion.champion_name == "Graves"),
+     ("ix_user_preferred_champions_champion",)),
+    ("stats window for user",
+     lambda: select(func.sum(UserStatDaily.games)).where(
+         UserStatDaily.user_id == 1, UserStatDaily.champion_name == "", UserStatDaily.day >= date(2024, 1, 1)
+     ),
+     ("sqlite_autoindex_user_stat_daily_1|user_stat_daily_pkey",)),
+    ("active timers for session by respawn_time",
+     lambda: active_timers_query(1).limit(5),
+     ("ix_jungle_timers_session_active_respawn",)),
+    ("backfill dedup by match_id",
+     lambda: select(GameSession.match_id).where(GameSession.match_id.in_(["LA1_1", "LA1_2"])),
+     ("ix_game_sessions_match_id",)),
+]
+
+
+def sqlite_plan(conn: Connection, stmt: Select) -> Tuple[List[str], bool, str]:
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    details = [row[-1] for row in rows]
+    used = [d for d in details if d.startswith(("SEARCH", "SCAN"))]
+    sorts = any("TEMP B-TREE" in d for d in details)
+    return used, sorts, "\n".join(details)
+
+
+def _walk(node: Dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def postgres_plan(conn: Connection, stmt: Select) -> Tuple[List[str], bool, str]:
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    # Con tablas vacías el planner prefiere un seq scan; se lo prohíbe para ver el índice elegido
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = list(_walk(plan[0]["Plan"]))
+    used = [f"{n['Node Type']} USING INDEX {n['Index Name']}" for n in nodes if "Index Name" in n]
+    used += [n["Node Type"] for n in nodes if n["Node Type"] == "Seq Scan"]
+    sorts = any(n["Node Type"] in ("Sort", "Incremental Sort") for n in nodes)
+    return used, sorts, json.dumps(plan, indent=1)
+
+
+@pytest.fixture(scope="module", params=["sqlite", "postgresql"])
+def plan_connection(request):
+    if request.param == "sqlite":
+        url = "sqlite://"
+    else:
+        url = request.config.getoption("--postgres-url")
+        if not url:
+            pytest.skip("PostgreSQL plans need --postgres-url or TEST_POSTGRES_URL")
+    engine = create_engine(sync_database_url(url))
+    Base.metadata.create_all(bind=engine)
+    explain = postgres_plan if engine.dialect.name == "postgresql" else sqlite_plan
+    with engine.connect() as conn:
+        yield conn, explain
+    engine.dispose()
+
+
+@pytest.mark.parametrize("description, build, index_names", CHECKS, ids=[check[0] for check in CHECKS])
+def test_query_uses_index(plan_connection, description, build, index_names):
+    conn, explain = plan_connection
+    with conn.begin():
+        used, sorts, plan = explain(conn, build())
+    # "a|b": cualquiera de los dos nombres (SQLite | PostgreSQL)
+    missing = [
+        expected for expected in index_names
+        if not any(alternative in step.split() for step in used for alternative in expected.split("|"))
+    ]
+    assert not missing and not sorts, (
+        f"{description}: expected {', '.join(index_names)} without a separate sort, got "
+        f"{'; '.join(used) or '-'}{' + sort' if sorts else ''}\n{plan}"
+    )
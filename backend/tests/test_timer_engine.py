@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+import main
+from app.database import SessionLocal, init_db
+from app.models.game_session import GameSession
+from app.models.user import User
+
+
+def _game_session() -> int:
+    init_db()
+    db = SessionLocal()
+    try:
+        user = User(riot_id="tz#test", summoner_name="tz", tag_line="test")
+        db.add(user)
+        db.commit()
+        game_session = GameSession(
+            user_id=user.id, match_id="LA1_TZ", champion_name="Graves",
+            game_mode="CLASSIC", started_at=datetime.now(timezone.utc)
+        )
+        db.add(game_session)
+        db.commit()
+        return game_session.id
+    finally:
+        db.close()
+
+
+def test_offset_timer_survives_reload():
+    """A timer sent with a -03:00 offset keeps its respawn after the engine reloads it from the database"""
+    session_id = _game_session()
+    las = timezone(timedelta(hours=-3))
+    now = datetime.now(las)
+    timer = {
+        "objective_type": "dragon",
+        "objective_name": "Ocean Dragon",
+        "spawn_time": now.isoformat(),
+        "respawn_time": (now + timedelta(minutes=5)).isoformat()
+    }
+
+    with TestClient(main.app) as client:
+        created = client.post(f"/api/v1/jungle-timers/?session_id={session_id}", json=timer)
+        assert created.status_code == 200
+        timer_id = created.json()["id"]
+
+    # Segundo arranque: el motor carga los timers activos desde la base
+    with TestClient(main.app) as client:
+        live = client.get(f"/api/v1/jungle-timers/live?session_id={session_id}").json()["timers"]
+        assert [t["timer_id"] for t in live] == [timer_id]
+        assert 280 <= live[0]["seconds_left"] <= 300
+        stored = client.get(f"/api/v1/jungle-timers/{timer_id}").json()
+        assert stored["is_active"] is True
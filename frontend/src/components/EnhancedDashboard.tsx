@@ -40,11 +40,21 @@ const EnhancedDashboard: React.FC = () => {
 
   useEffect(() => {
     loadUserData();
-    checkLiveGame();
-    const interval = setInterval(checkLiveGame, 30000);
-    return () => clearInterval(interval);
   }, []);
 
+  useEffect(() => {
+    if (!userData) return;
+    // Stream SSE: el backend comparte un único poller por jugador entre todas las pestañas
+    const source = new EventSource(
+      `/api/v1/jungle/live-game/${userData.riot_id}/${userData.tag_line}/stream?region=${userData.region}`
+    );
+    source.addEventListener('live-game', (event) => {
+      const data = JSON.parse((event as MessageEvent).data);
+      setLiveGameStatus(data.in_game ? 'in_game' : 'not_in_game');
+    });
+    return () => source.close();
+  }, [userData]);
+
   const loadUserData = async () => {
     try {
       setLoading(true);
@@ -152,18 +162,6 @@ const EnhancedDashboard: React.FC = () => {
     }
   };
 
-  const checkLiveGame = async () => {
-    if (!userData) return;
-
-    try {
-      const response = await fetch(`/api/v1/jungle/live-game/${userData.riot_id}/${userData.tag_line}?region=${userData.region}`);
-      const data = await response.json();
-      setLiveGameStatus(data.in_game ? 'in_game' : 'not_in_game');
-    } catch (error) {
-      setLiveGameStatus('not_in_game');
-    }
-  };
-
   const calculateWinrate = () => {
     if (matchHistory.length === 0) return 0;
     const wins = matchHistory.filter(match => match.result === 'Victory').length;